@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+관리자 통계 일별 집계 배치 작업
+다운로드 내역, 포인트 거래, 파일 업로드를 날짜별로 집계해 관리자 페이지가 읽는 집계 테이블을 갱신합니다.
+기본은 마지막으로 다 집계한 날의 다음 날부터 오늘까지만 다시 집계합니다.
+
+사용 예:
+    python analytics_job.py            # 새 날짜만 집계
+    python analytics_job.py --full     # 전체 내역으로 다시 집계
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+def main():
+    parser = argparse.ArgumentParser(description="관리자 통계 일별 집계 배치 작업")
+    parser.add_argument('--full', action='store_true', help="워터마크를 무시하고 전체 내역으로 다시 집계")
+    args = parser.parse_args()
+    
+    from modules.monitoring.analytics import AnalyticsManager
+    
+    result = AnalyticsManager().refresh(full=args.full)
+    print(f"📈 통계 집계: {result['since']} 이후 {result['days']:,}일 ({result['seconds']:.2f}초)")
+
+if __name__ == "__main__":
+    main()
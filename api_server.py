@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+꿀파일 JSON API 서버
+Streamlit 앱(app.py)과 같은 DB/업로드 디렉토리를 공유하는 별도 프로세스로 실행합니다.
+
+사용 예:
+    python api_server.py --host 0.0.0.0 --port 8600
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from config.settings import Config
+
+def main():
+    parser = argparse.ArgumentParser(description="꿀파일 JSON API 서버")
+    parser.add_argument('--host', default=Config.API_HOST)
+    parser.add_argument('--port', type=int, default=Config.API_PORT)
+    parser.add_argument('--workers', type=int, default=Config.API_WORKERS, help="블로킹 DB/파일 작업용 스레드 수")
+    args = parser.parse_args()
+    
+    Config.ensure_directories()
+    
+    from database.models import db
+    from modules.api.server import run_api_server
+    from modules.monitoring.metrics import start_metrics_server
+    from modules.monitoring.db_instrumentation import install_db_instrumentation
+    from modules.monitoring.slow_query import install_slow_query_log
+    
+    if Config.METRICS_ENABLED:
+        install_db_instrumentation(db)
+        start_metrics_server()
+    if Config.SLOW_QUERY_LOG_ENABLED:
+        install_slow_query_log(db)
+    
+    print(f"🍯 API 서버를 시작합니다: http://{args.host}:{args.port}/api/health")
+    run_api_server(args.host, args.port, args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import streamlit as st
 import os
 import sys
 from pathlib import Path
+from time import perf_counter
 
 # 프로젝트 루트를 Python path에 추가
 project_root = Path(__file__).parent
@@ -11,11 +12,15 @@ sys.path.insert(0, str(project_root))
 from config.settings import Config
 from modules.auth.auth_manager import AuthManager, show_login_page, require_auth
 from modules.ui.components import (
-    show_ghibli_header, show_ghibli_navigation, show_ghibli_file_list, 
+    show_ghibli_header, show_ghibli_navigation, show_ghibli_file_list_fragment, 
     show_ghibli_upload_form, show_ghibli_user_stats, show_ghibli_point_management,
-    show_ghibli_download_history
+    show_ghibli_download_history, show_ghibli_admin_page
 )
 from modules.point_system.point_manager import PointManager
+from modules.monitoring.metrics import RERUN_SECONDS, start_metrics_server
+from modules.monitoring.db_instrumentation import install_db_instrumentation
+from modules.monitoring.rerun_profiler import rerun_profiler
+from modules.monitoring.slow_query import install_slow_query_log
 
 # Streamlit 페이지 설정
 st.set_page_config(
@@ -25,188 +30,16 @@ st.set_page_config(
     initial_sidebar_state="collapsed"  # 사이드바 축소
 )
 
-# 지브리 스타일 CSS
+# 지브리 스타일 CSS (static/ghibli.css, 프로세스당 한 번만 읽음)
+GHIBLI_CSS_PATH = project_root / 'static' / 'ghibli.css'
+
+@st.cache_resource(show_spinner=False)
+def _ghibli_css_markup():
+    return f"<style>\n{GHIBLI_CSS_PATH.read_text(encoding='utf-8')}</style>"
+
 def load_ghibli_css():
-    st.markdown("""
-    <style>
-    /* 전체 앱 배경 */
-    .main .block-container {
-        padding-top: 1rem;
-        padding-bottom: 2rem;
-        max-width: 100%;
-        background: linear-gradient(135deg, #E8F5E8, #F1F8E9);
-    }
-    
-    /* 지브리 색상 변수 */
-    :root {
-        --ghibli-green-dark: #1B5E20;
-        --ghibli-green-medium: #2E7D32;
-        --ghibli-green-light: #4CAF50;
-        --ghibli-green-bg: #C8E6C9;
-        --ghibli-yellow: #FFE082;
-        --ghibli-orange: #FF9800;
-        --ghibli-brown: #8D6E63;
-        --ghibli-cream: #FFF8E1;
-    }
-    
-    /* 메인 헤더 스타일 */
-    .ghibli-header {
-        background: linear-gradient(135deg, #A5D6A7, #81C784);
-        padding: 20px;
-        border-radius: 25px;
-        border: 3px solid #4CAF50;
-        margin-bottom: 20px;
-        box-shadow: 0 4px 12px rgba(76, 175, 80, 0.3);
-    }
-    
-    /* 버튼 스타일 */
-    .stButton > button {
-        background: linear-gradient(135deg, #66BB6A, #4CAF50) !important;
-        color: white !important;
-        border: 2px solid #2E7D32 !important;
-        border-radius: 20px !important;
-        font-weight: bold !important;
-        box-shadow: 0 3px 6px rgba(46, 125, 50, 0.3) !important;
-        transition: all 0.3s ease !important;
-        font-family: 'Comic Sans MS', cursive !important;
-    }
-    
-    .stButton > button:hover {
-        background: linear-gradient(135deg, #4CAF50, #388E3C) !important;
-        transform: translateY(-2px) !important;
-        box-shadow: 0 6px 12px rgba(46, 125, 50, 0.4) !important;
-    }
-    
-    /* Primary 버튼 스타일 */
-    .stButton > button[kind="primary"] {
-        background: linear-gradient(135deg, #FFE082, #FFCC02) !important;
-        color: #E65100 !important;
-        border: 2px solid #FFA000 !important;
-    }
-    
-    .stButton > button[kind="primary"]:hover {
-        background: linear-gradient(135deg, #FFCC02, #FF9800) !important;
-    }
-    
-    /* 입력 필드 스타일 */
-    .stTextInput > div > div > input {
-        border: 2px solid #81C784 !important;
-        border-radius: 15px !important;
-        background: #F8FFF8 !important;
-        font-family: 'Comic Sans MS', cursive !important;
-    }
-    
-    .stTextInput > div > div > input:focus {
-        border-color: #4CAF50 !important;
-        box-shadow: 0 0 10px rgba(76, 175, 80, 0.3) !important;
-    }
-    
-    /* 셀렉트박스 스타일 */
-    .stSelectbox > div > div > div {
-        border: 2px solid #81C784 !important;
-        border-radius: 15px !important;
-        background: #F8FFF8 !important;
-        font-family: 'Comic Sans MS', cursive !important;
-    }
-    
-    /* 메트릭 카드 스타일 */
-    [data-testid="metric-container"] {
-        background: linear-gradient(135deg, #FFE082, #FFCC02) !important;
-        border: 3px solid #FFA000 !important;
-        border-radius: 20px !important;
-        padding: 15px !important;
-        box-shadow: 0 4px 8px rgba(255, 160, 0, 0.3) !important;
-    }
-    
-    [data-testid="metric-container"] > div {
-        color: #E65100 !important;
-        font-weight: bold !important;
-        font-family: 'Comic Sans MS', cursive !important;
-    }
-    
-    /* 성공 메시지 */
-    .stSuccess {
-        background: linear-gradient(135deg, #C8E6C9, #A5D6A7) !important;
-        border: 2px solid #4CAF50 !important;
-        border-radius: 15px !important;
-        color: #1B5E20 !important;
-    }
-    
-    /* 에러 메시지 */
-    .stError {
-        background: linear-gradient(135deg, #FFCDD2, #F8BBD9) !important;
-        border: 2px solid #F44336 !important;
-        border-radius: 15px !important;
-    }
-    
-    /* 정보 메시지 */
-    .stInfo {
-        background: linear-gradient(135deg, #E1F5FE, #B3E5FC) !important;
-        border: 2px solid #03A9F4 !important;
-        border-radius: 15px !important;
-    }
-    
-    /* 경고 메시지 */
-    .stWarning {
-        background: linear-gradient(135deg, #FFF3E0, #FFE0B2) !important;
-        border: 2px solid #FF9800 !important;
-        border-radius: 15px !important;
-    }
-    
-    /* 확장 가능한 섹션 */
-    .streamlit-expanderHeader {
-        background: linear-gradient(135deg, #C8E6C9, #A5D6A7) !important;
-        border: 2px solid #4CAF50 !important;
-        border-radius: 15px !important;
-        color: #1B5E20 !important;
-        font-weight: bold !important;
-        font-family: 'Comic Sans MS', cursive !important;
-    }
-    
-    .streamlit-expanderContent {
-        background: #F1F8E9 !important;
-        border: 2px solid #8BC34A !important;
-        border-top: none !important;
-        border-radius: 0 0 15px 15px !important;
-    }
-    
-    /* 파일 업로더 스타일 */
-    .stFileUploader > div {
-        border: 3px dashed #81C784 !important;
-        border-radius: 20px !important;
-        background: linear-gradient(135deg, #E8F5E8, #F1F8E9) !important;
-        padding: 20px !important;
-    }
-    
-    /* 다운로드 버튼 스타일 */
-    .stDownloadButton > button {
-        background: linear-gradient(135deg, #FFCC02, #FF9800) !important;
-        color: #E65100 !important;
-        border: 2px solid #F57F17 !important;
-        border-radius: 20px !important;
-        font-weight: bold !important;
-        font-family: 'Comic Sans MS', cursive !important;
-    }
-    
-    /* 제목 스타일 */
-    h1, h2, h3 {
-        color: #2E7D32 !important;
-        font-family: 'Comic Sans MS', cursive !important;
-        text-shadow: 2px 2px 4px rgba(46, 125, 50, 0.2) !important;
-    }
-    
-    /* 사이드바 스타일 (사용하지 않지만 대비) */
-    .css-1d391kg {
-        background: linear-gradient(180deg, #E8F5E8, #C8E6C9) !important;
-    }
-    
-    /* 캡션 텍스트 */
-    .caption {
-        color: #558B2F !important;
-        font-style: italic !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    """지브리 스타일 CSS 적용 (요소는 재실행마다 보내야 하므로 읽은 문자열만 재사용)"""
+    st.markdown(_ghibli_css_markup(), unsafe_allow_html=True)
 
 def show_point_management():
     """포인트 관리 페이지"""
@@ -308,7 +141,8 @@ def show_ghibli_main_app():
     category, search_query = show_ghibli_header()
     
     # 네비게이션 메뉴
-    menu = show_ghibli_navigation()
+    auth = AuthManager()
+    menu = show_ghibli_navigation(is_admin=auth.is_admin())
     
     # 현재 페이지 상태 관리
     if 'current_page' not in st.session_state:
@@ -328,11 +162,10 @@ def show_ghibli_main_app():
     
     # 메뉴에 따른 페이지 표시
     if menu == "🏠 마을 광장":
-        # 메인 페이지 - 파일 목록
-        show_ghibli_file_list(
+        # 메인 페이지 - 파일 목록 (페이지는 프래그먼트가 세션 상태에서 읽음)
+        show_ghibli_file_list_fragment(
             category=category,
-            search_query=search_query,
-            page=st.session_state.current_page
+            search_query=search_query
         )
     
     elif menu == "📤 나무 심기":
@@ -346,22 +179,55 @@ def show_ghibli_main_app():
     
     elif menu == "📜 수집 일지":
         show_ghibli_download_history()
+    
+    elif menu == "🔧 관리자":
+        show_ghibli_admin_page()
 
-def main():
-    """메인 함수"""
+@st.cache_resource(show_spinner=False)
+def init_process():
+    """디렉토리, 데이터베이스, 모니터링 준비 (프로세스당 1회, 이후 세션/재실행은 건너뜀)"""
     # 필요한 디렉토리 생성
     Config.ensure_directories()
     
     # 데이터베이스 초기화
     from database.models import db
     
-    # 인증 확인
-    auth = AuthManager()
+    # 모니터링
+    if Config.METRICS_ENABLED:
+        install_db_instrumentation(db)
+        start_metrics_server()
+    if Config.SLOW_QUERY_LOG_ENABLED:
+        install_slow_query_log(db)
+    return True
+
+def main():
+    """메인 함수"""
+    init_process()
     
-    if not auth.is_authenticated():
-        show_login_page()
-    else:
-        show_ghibli_main_app()
+    with rerun_profiler.profile() as tags:
+        started = perf_counter()
+        try:
+            # 인증 확인
+            auth = AuthManager()
+            
+            authenticated = auth.is_authenticated()
+            auth.sync_session_cookie()
+            
+            if not authenticated:
+                show_login_page()
+            else:
+                show_ghibli_main_app()
+        finally:
+            user = st.session_state.get('user')
+            page = st.session_state.get('current_menu', '로그인') if user else '로그인'
+            RERUN_SECONDS.observe(perf_counter() - started, page=page)
+            
+            tags['page'] = page
+            tags['user_id'] = user['id'] if user else None
+            # 예전 링크에 남은 세션 ID(sid)는 프로파일 기록에 남기지 않음
+            query_params = st.query_params.to_dict()
+            query_params.pop('sid', None)
+            tags['query_params'] = query_params
 
 if __name__ == "__main__":
     main()
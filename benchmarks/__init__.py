@@ -0,0 +1 @@
+# benchmarks 패키지 초기화
\ No newline at end of file
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+bcrypt 비용(BCRYPT_ROUNDS) 선택 벤치마크
+비용별로 비밀번호 검증 1회 지연시간과, 작업자 풀을 거친 동시 로그인(로그인 폭주)의
+대기 포함 지연시간을 측정해 목표 지연시간을 넘지 않는 가장 높은 비용을 추천합니다.
+
+사용 예:
+    python benchmarks/bcrypt_cost.py --target-ms 250
+    python benchmarks/bcrypt_cost.py --min-rounds 10 --max-rounds 14 --storm 32 --workers 4
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import bcrypt
+from benchmarks.run_benchmarks import percentile
+from modules.auth.password_hasher import PasswordHasher
+
+PASSWORD = 'bench-password'
+
+def measure_verify(rounds, samples):
+    """해당 비용의 해시를 samples번 검증한 지연시간(ms) 목록"""
+    hashed = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds=rounds))
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        bcrypt.checkpw(PASSWORD.encode('utf-8'), hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings), hashed.decode('ascii')
+
+def measure_storm(rounds, hashed, logins, workers):
+    """logins개의 동시 로그인을 작업자 풀로 검증했을 때 요청별 지연시간(ms) 목록"""
+    hasher = PasswordHasher(rounds=rounds, workers=workers, max_pending=logins, queue_timeout=600)
+    
+    def login(_):
+        started = time.perf_counter()
+        hasher.verify(PASSWORD, hashed)
+        return (time.perf_counter() - started) * 1000
+    
+    # 로그인 요청을 동시에 보내는 Streamlit/API 스레드 역할
+    with ThreadPoolExecutor(max_workers=logins) as clients:
+        return sorted(clients.map(login, range(logins)))
+
+def main():
+    parser = argparse.ArgumentParser(description="bcrypt 비용 선택 벤치마크")
+    parser.add_argument('--target-ms', type=float, default=250.0, help="검증 1회 p95 목표 지연시간 (ms)")
+    parser.add_argument('--min-rounds', type=int, default=10)
+    parser.add_argument('--max-rounds', type=int, default=14)
+    parser.add_argument('--samples', type=int, default=5, help="비용별 검증 반복 횟수")
+    parser.add_argument('--storm', type=int, default=0, help="동시 로그인 수 (0이면 폭주 측정 생략)")
+    parser.add_argument('--workers', type=int, default=0, help="폭주 측정 작업자 수 (0이면 PASSWORD_HASH_WORKERS)")
+    parser.add_argument('--json', dest='json_output', help="결과를 JSON으로 저장할 경로")
+    args = parser.parse_args()
+    
+    workers = args.workers or PasswordHasher().workers
+    results = []
+    
+    print(f"{'비용':>4} {'검증 p50':>10} {'검증 p95':>10}" + (f" {'폭주 p50':>10} {'폭주 p95':>10}" if args.storm else ''))
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        timings, hashed = measure_verify(rounds, args.samples)
+        result = {
+            'rounds': rounds,
+            'verify_p50_ms': round(percentile(timings, 50), 2),
+            'verify_p95_ms': round(percentile(timings, 95), 2)
+        }
+        line = f"{rounds:>4} {result['verify_p50_ms']:>8.1f}ms {result['verify_p95_ms']:>8.1f}ms"
+        
+        if args.storm:
+            storm = measure_storm(rounds, hashed, args.storm, workers)
+            result['storm_p50_ms'] = round(percentile(storm, 50), 2)
+            result['storm_p95_ms'] = round(percentile(storm, 95), 2)
+            line += f" {result['storm_p50_ms']:>8.1f}ms {result['storm_p95_ms']:>8.1f}ms"
+        
+        results.append(result)
+        print(line)
+        
+        # 비용이 1 오를 때마다 시간이 두 배이므로 목표를 크게 넘으면 중단
+        if result['verify_p50_ms'] > args.target_ms * 2:
+            break
+    
+    within = [r for r in results if r['verify_p95_ms'] <= args.target_ms]
+    recommended = max(within, key=lambda r: r['rounds'])['rounds'] if within else args.min_rounds
+    
+    print(f"\n✅ 추천 BCRYPT_ROUNDS={recommended} (검증 p95 ≤ {args.target_ms:.0f}ms)")
+    if args.storm:
+        print(f"   동시 로그인 {args.storm}건, 작업자 {workers}개 기준 대기 포함 지연시간은 위 '폭주' 열 참고")
+    print("   비용을 바꾸면 기존 해시는 각 사용자의 다음 로그인 때 자동으로 재해시됩니다.")
+    
+    if args.json_output:
+        output = Path(args.json_output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps({
+            'target_ms': args.target_ms,
+            'workers': workers,
+            'storm': args.storm,
+            'recommended_rounds': recommended,
+            'results': results
+        }, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"📄 결과 저장: {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+벤치마크용 합성 데이터셋 생성기
+스크래치 DB와 업로드 디렉토리에 사용자, 파일, 포인트 거래, 다운로드 내역을 채웁니다.
+
+사용 예:
+    python benchmarks/dataset.py --users 100000 --db /tmp/bench/webhard.db --uploads /tmp/bench/uploads
+"""
+
+import os
+import sys
+import time
+import uuid
+import random
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+BENCH_PASSWORD = 'bench-password'
+BATCH_SIZE = 10000
+
+# 검색 벤치마크에서 찾을 수 있도록 파일명에 섞는 단어들
+NAME_WORDS = [
+    'drama', 'movie', 'episode', 'season', 'final', 'remaster', 'trailer', 'soundtrack',
+    'report', 'manual', 'lecture', 'project', 'backup', 'photo', 'album', 'setup',
+    '드라마', '영화', '강의', '자료', '음악', '사진', '게임', '애니'
+]
+
+def configure_environment(db_path, upload_path):
+    """설정 모듈을 임포트하기 전에 스크래치 DB/업로드 경로 지정"""
+    os.environ['DB_PATH'] = str(db_path)
+    os.environ['UPLOAD_PATH'] = str(upload_path)
+    # 목록 결과 캐시를 끄고 매번 실제 조회(LIKE 검색 + COUNT)를 잼
+    os.environ['FILE_LIST_CACHE_SECONDS'] = '0'
+    
+    from config.settings import Config
+    Config.FILE_LIST_CACHE_SECONDS = 0
+    if not any(Config.ALLOWED_EXTENSIONS):
+        Config.ALLOWED_EXTENSIONS = list(Config.FILE_TYPE_MAPPING.keys())
+    
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    Path(upload_path).mkdir(parents=True, exist_ok=True)
+
+def _file_types():
+    from config.settings import Config
+    return list(Config.FILE_TYPE_MAPPING.keys())
+
+def _timestamp(rng, now, days):
+    moment = now - timedelta(seconds=rng.randint(0, days * 86400))
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+def _batched(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _insert_rows(conn, table, columns, rows):
+    placeholders = ', '.join('?' for _ in columns)
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    count = 0
+    for batch in _batched(rows):
+        conn.executemany(sql, batch)
+        count += len(batch)
+    return count
+
+def generate_dataset(users, files=None, downloads=None, charges=None, blob_files=1000,
+                     blob_size=4096, history_days=365, seed=42, log=print):
+    """합성 데이터셋 생성 후 생성된 행 수를 dict로 반환
+    
+    포인트 거래는 업로드 보너스(파일당 1건), 다운로드 결제(다운로드당 1건),
+    포인트 충전(charges건)으로 구성되며 users.points와 항상 일치하도록 계산됩니다.
+    """
+    from config.settings import Config
+    from database.models import db
+    
+    files = users // 2 if files is None else files
+    downloads = users * 3 if downloads is None else downloads
+    charges = users if charges is None else charges
+    
+    rng = random.Random(seed)
+    now = datetime.now()
+    file_types = _file_types()
+    started = time.perf_counter()
+    
+    # 템플릿 사용자를 만들어 스키마에 상관없이 나머지 사용자 행을 복제
+    template_id = db.create_user('bench_user_0', 'bench_user_0@bench.local', BENCH_PASSWORD)
+    if not template_id:
+        raise RuntimeError("이미 데이터가 있는 DB입니다. 빈 스크래치 DB를 지정하세요.")
+    
+    conn = db.get_connection()
+    try:
+        template = dict(conn.execute('SELECT * FROM users WHERE id = ?', (template_id,)).fetchone())
+        user_columns = [c for c in template if c not in ('id', 'username', 'email', 'created_at', 'points')]
+        columns = ['username', 'email', 'created_at', 'points'] + user_columns
+        
+        def user_rows():
+            for i in range(1, users):
+                yield ([f'bench_user_{i}', f'bench_user_{i}@bench.local',
+                        _timestamp(rng, now, history_days), Config.INITIAL_POINTS]
+                       + [template[c] for c in user_columns])
+        
+        _insert_rows(conn, 'users', columns, user_rows())
+        user_ids = [row[0] for row in conn.execute('SELECT id FROM users ORDER BY id')]
+        log(f"👤 사용자 {len(user_ids):,}명 생성")
+        
+        balances = {user_id: Config.INITIAL_POINTS for user_id in user_ids}
+        
+        # 파일
+        file_meta = []
+        
+        def file_rows():
+            for i in range(files):
+                file_type = rng.choice(file_types)
+                name = f"{rng.choice(NAME_WORDS)}_{rng.choice(NAME_WORDS)}_{i}.{file_type}"
+                file_uuid = str(uuid.UUID(int=rng.getrandbits(128)))
+                uploader_id = rng.choice(user_ids)
+                created_at = _timestamp(rng, now, history_days)
+                file_meta.append((uploader_id, created_at))
+                file_size = blob_size if i < blob_files else rng.randint(1024, 50 * 1024 * 1024)
+                yield (file_uuid, name, f"{file_uuid}.{file_type}", file_size,
+                       file_type, Config.FILE_TYPE_MAPPING.get(file_type, 'other'), uploader_id, created_at)
+        
+        _insert_rows(conn, 'files',
+                     ['file_uuid', 'original_name', 'stored_name', 'file_size', 'file_type',
+                      'category', 'uploader_id', 'created_at'],
+                     file_rows())
+        file_rows_db = conn.execute('SELECT id, stored_name, price FROM files ORDER BY id').fetchall()
+        log(f"📁 파일 {len(file_rows_db):,}개 생성")
+        
+        # 업로드 보너스 거래
+        def bonus_rows():
+            for (file_id, _, _), (uploader_id, created_at) in zip(file_rows_db, file_meta):
+                balances[uploader_id] += Config.UPLOAD_BONUS_POINTS
+                yield (uploader_id, 'earn', Config.UPLOAD_BONUS_POINTS, '파일 업로드 보너스', file_id, created_at)
+        
+        tx_columns = ['user_id', 'transaction_type', 'amount', 'description', 'file_id', 'created_at']
+        transactions = _insert_rows(conn, 'point_transactions', tx_columns, bonus_rows())
+        
+        # 포인트 충전 거래
+        def charge_rows():
+            for _ in range(charges):
+                user_id = rng.choice(user_ids)
+                amount = rng.choice((100, 500, 1000))
+                balances[user_id] += amount
+                yield (user_id, 'earn', amount, '포인트 충전', None, _timestamp(rng, now, history_days))
+        
+        transactions += _insert_rows(conn, 'point_transactions', tx_columns, charge_rows())
+        
+        # 다운로드 내역과 결제 거래
+        download_counts = {}
+        download_rows = []
+        
+        def spend_rows():
+            for _ in range(downloads if file_rows_db else 0):
+                user_id = rng.choice(user_ids)
+                file_id, _, price = rng.choice(file_rows_db)
+                price = price if price is not None else Config.DOWNLOAD_COST_POINTS
+                created_at = _timestamp(rng, now, history_days)
+                balances[user_id] -= price
+                download_counts[file_id] = download_counts.get(file_id, 0) + 1
+                download_rows.append((user_id, file_id, price, created_at))
+                yield (user_id, 'spend', price, '파일 다운로드', file_id, created_at)
+        
+        transactions += _insert_rows(conn, 'point_transactions', tx_columns, spend_rows())
+        _insert_rows(conn, 'download_history', ['user_id', 'file_id', 'points_spent', 'download_at'],
+                     download_rows)
+        log(f"💰 포인트 거래 {transactions:,}건, 📜 다운로드 내역 {len(download_rows):,}건 생성")
+        
+        for batch in _batched(((count, file_id) for file_id, count in download_counts.items())):
+            conn.executemany('UPDATE files SET download_count = ? WHERE id = ?', batch)
+        for batch in _batched(((points, user_id) for user_id, points in balances.items())):
+            conn.executemany('UPDATE users SET points = ? WHERE id = ?', batch)
+        
+        conn.commit()
+    finally:
+        conn.close()
+    
+    # 업로드 디렉토리에 실제 파일 일부 생성
+    upload_path = Path(Config.UPLOAD_PATH)
+    payload = rng.getrandbits(8 * blob_size).to_bytes(blob_size, 'little')
+    for _, stored_name, _ in file_rows_db[:blob_files]:
+        (upload_path / stored_name).write_bytes(payload)
+    
+    elapsed = time.perf_counter() - started
+    log(f"✅ 데이터셋 생성 완료 ({elapsed:.1f}초)")
+    
+    return {
+        'users': len(user_ids),
+        'files': len(file_rows_db),
+        'point_transactions': transactions,
+        'download_history': len(download_rows),
+        'blob_files': min(blob_files, len(file_rows_db)),
+        'seed': seed
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="웹하드 벤치마크 데이터셋 생성기")
+    parser.add_argument('--users', type=int, default=10000, help="사용자 수 (10k~1M)")
+    parser.add_argument('--files', type=int, default=None, help="파일 수 (기본: 사용자 수의 절반)")
+    parser.add_argument('--downloads', type=int, default=None, help="다운로드 내역 수 (기본: 사용자 수 x 3)")
+    parser.add_argument('--charges', type=int, default=None, help="포인트 충전 거래 수 (기본: 사용자 수)")
+    parser.add_argument('--blob-files', type=int, default=1000, help="실제로 디스크에 만들 파일 수")
+    parser.add_argument('--blob-size', type=int, default=4096, help="디스크에 만들 파일 크기 (바이트)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', default='bench_data/webhard.db', help="스크래치 DB 경로")
+    parser.add_argument('--uploads', default='bench_data/uploads/', help="스크래치 업로드 디렉토리")
+    args = parser.parse_args()
+    
+    configure_environment(args.db, args.uploads)
+    generate_dataset(args.users, files=args.files, downloads=args.downloads, charges=args.charges,
+                     blob_files=args.blob_files, blob_size=args.blob_size, seed=args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+웹하드 동시성 부하 테스트
+여러 워커 프로세스가 같은 DB와 업로드 디렉토리에 FileManager/PointManager 작업을
+동시에 실행하고, 처리량/지연시간/잠금 오류율과 포인트 장부 정합성을 보고합니다.
+
+사용 예:
+    python benchmarks/load_test.py --workers 8 --duration 30 --mix download=60,list=25,upload=10,stats=5
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import multiprocessing
+from pathlib import Path
+from datetime import datetime
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.dataset import configure_environment, generate_dataset, NAME_WORDS
+from benchmarks.run_benchmarks import BenchUpload, summarize, count_rows
+
+DEFAULT_MIX = 'download=60,list=20,search=5,upload=10,stats=5'
+OPERATIONS = ('download', 'list', 'search', 'upload', 'stats', 'history')
+
+def parse_mix(text):
+    """'download=60,list=30' 형식의 작업 비율 파싱"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"알 수 없는 작업입니다: {name} (가능: {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+def _is_lock_error(message):
+    return 'locked' in message or 'busy' in message
+
+def _build_operations(rng, user_count, file_ids, worker_id):
+    from config.settings import Config
+    from modules.file_manager.file_manager import FileManager
+    from modules.point_system.point_manager import PointManager
+    
+    file_manager = FileManager()
+    point_manager = PointManager()
+    categories = list(Config.CATEGORIES.keys())
+    payload = b'load test upload payload\n' * 1024
+    upload_seq = [0]
+    
+    def download():
+        return point_manager.process_download_payment(rng.randint(1, user_count), rng.choice(file_ids))
+    
+    def list_files():
+        file_manager.get_files_list(category=rng.choice(categories), limit=10, offset=rng.randint(0, 20) * 10)
+        return True, ''
+    
+    def search():
+        file_manager.get_files_list(search_query=rng.choice(NAME_WORDS), limit=10)
+        return True, ''
+    
+    def upload():
+        upload_seq[0] += 1
+        name = f'load_{worker_id}_{upload_seq[0]}.txt'
+        return file_manager.save_uploaded_file(BenchUpload(name, payload), rng.randint(1, user_count))
+    
+    def stats():
+        point_manager.get_user_statistics(rng.randint(1, user_count))
+        return True, ''
+    
+    def history():
+        point_manager.get_point_history(rng.randint(1, user_count))
+        return True, ''
+    
+    return {
+        'download': download, 'list': list_files, 'search': search,
+        'upload': upload, 'stats': stats, 'history': history
+    }
+
+def worker_main(worker_id, db_path, upload_path, mix, duration, seed, start_event, results):
+    """워커 프로세스: 작업 비율에 따라 duration초 동안 작업 실행"""
+    configure_environment(db_path, upload_path)
+    from database.models import db
+    
+    conn = db.get_connection()
+    try:
+        user_count = conn.execute('SELECT MAX(id) FROM users').fetchone()[0]
+        file_ids = [row[0] for row in conn.execute('SELECT id FROM files WHERE is_active = 1')]
+    finally:
+        conn.close()
+    
+    rng = random.Random(seed + worker_id)
+    operations = _build_operations(rng, user_count, file_ids, worker_id)
+    names = list(mix.keys())
+    weights = list(mix.values())
+    
+    stats = {name: {'latencies': [], 'ok': 0, 'failed': 0, 'locked': 0, 'errors': {}} for name in names}
+    
+    start_event.wait()
+    deadline = time.monotonic() + duration
+    
+    while time.monotonic() < deadline:
+        name = rng.choices(names, weights)[0]
+        record = stats[name]
+        started = time.perf_counter_ns()
+        
+        try:
+            success, message = operations[name]()
+        except Exception as e:
+            success, message = False, f"{type(e).__name__}: {e}"
+        
+        record['latencies'].append(time.perf_counter_ns() - started)
+        
+        if success:
+            record['ok'] += 1
+            continue
+        
+        record['failed'] += 1
+        if _is_lock_error(message):
+            record['locked'] += 1
+        key = message[:80]
+        record['errors'][key] = record['errors'].get(key, 0) + 1
+    
+    results.put((worker_id, stats))
+
+def check_consistency(db):
+    """포인트 장부와 잔액, 다운로드 카운트 정합성 검사"""
+    from config.settings import Config
+    
+    conn = db.get_connection()
+    try:
+        drift_rows = conn.execute('''
+            SELECT u.id, u.points,
+                   ? + COALESCE(SUM(CASE WHEN pt.transaction_type = 'earn' THEN pt.amount END), 0)
+                     - COALESCE(SUM(CASE WHEN pt.transaction_type = 'spend' THEN pt.amount END), 0) AS ledger
+            FROM users u
+            LEFT JOIN point_transactions pt ON pt.user_id = u.id
+            GROUP BY u.id
+            HAVING u.points != ledger
+        ''', (Config.INITIAL_POINTS,)).fetchall()
+        
+        negative = conn.execute('SELECT COUNT(*) FROM users WHERE points < 0').fetchone()[0]
+        
+        count_mismatch = conn.execute('''
+            SELECT COUNT(*) FROM files f
+            LEFT JOIN (SELECT file_id, COUNT(*) AS n FROM download_history GROUP BY file_id) dh
+                   ON dh.file_id = f.id
+            WHERE f.download_count != COALESCE(dh.n, 0)
+        ''').fetchone()[0]
+        
+        spend_count = conn.execute('''
+            SELECT COUNT(*) FROM point_transactions
+            WHERE transaction_type = 'spend' AND file_id IS NOT NULL
+        ''').fetchone()[0]
+        history_count = conn.execute('SELECT COUNT(*) FROM download_history').fetchone()[0]
+    finally:
+        conn.close()
+    
+    return {
+        'balance_drift_users': len(drift_rows),
+        'balance_drift_examples': [
+            {'user_id': row[0], 'points': row[1], 'ledger': row[2]} for row in drift_rows[:10]
+        ],
+        'negative_balances': negative,
+        'download_count_mismatches': count_mismatch,
+        'spend_transactions': spend_count,
+        'download_history_rows': history_count,
+        'consistent': not drift_rows and not negative and not count_mismatch and spend_count == history_count
+    }
+
+def aggregate(worker_stats, wall_seconds):
+    """워커별 결과를 작업별로 합산"""
+    merged = {}
+    for stats in worker_stats:
+        for name, record in stats.items():
+            target = merged.setdefault(name, {'latencies': [], 'ok': 0, 'failed': 0, 'locked': 0, 'errors': {}})
+            target['latencies'].extend(record['latencies'])
+            for key in ('ok', 'failed', 'locked'):
+                target[key] += record[key]
+            for message, count in record['errors'].items():
+                target['errors'][message] = target['errors'].get(message, 0) + count
+    
+    report = {}
+    total_ops = 0
+    for name, record in merged.items():
+        count = len(record['latencies'])
+        total_ops += count
+        if not count:
+            continue
+        
+        latency = summarize(record['latencies'])
+        report[name] = {
+            'ops': count,
+            'throughput_per_sec': round(count / wall_seconds, 2),
+            'p50_ms': latency['p50_ms'],
+            'p95_ms': latency['p95_ms'],
+            'p99_ms': latency['p99_ms'],
+            'max_ms': latency['max_ms'],
+            'ok': record['ok'],
+            'failed': record['failed'],
+            'lock_errors': record['locked'],
+            'lock_error_rate': round(record['locked'] / count, 4),
+            'top_errors': sorted(record['errors'].items(), key=lambda item: -item[1])[:5]
+        }
+    
+    return report, total_ops
+
+def main():
+    parser = argparse.ArgumentParser(description="웹하드 동시성 부하 테스트")
+    parser.add_argument('--workers', type=int, default=4, help="워커 프로세스 수")
+    parser.add_argument('--duration', type=float, default=15.0, help="측정 시간 (초)")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="작업 비율 (예: download=60,list=30,upload=10)")
+    parser.add_argument('--users', type=int, default=10000, help="새 데이터셋의 사용자 수")
+    parser.add_argument('--data-dir', default='bench_data/load', help="스크래치 DB/업로드 디렉토리")
+    parser.add_argument('--fresh', action='store_true', help="기존 스크래치 DB를 지우고 다시 생성")
+    parser.add_argument('--seed', type=int, default=11)
+    parser.add_argument('--output', default='bench_results/load_latest.json', help="JSON 리포트 경로")
+    args = parser.parse_args()
+    
+    mix = parse_mix(args.mix)
+    data_dir = Path(args.data_dir)
+    db_path = data_dir / 'webhard.db'
+    upload_path = data_dir / 'uploads'
+    
+    if args.fresh:
+        for suffix in ('', '-wal', '-shm'):
+            Path(f'{db_path}{suffix}').unlink(missing_ok=True)
+    
+    needs_dataset = not db_path.exists()
+    configure_environment(db_path, upload_path)
+    
+    from database.models import db
+    
+    if needs_dataset:
+        print(f"🌱 {args.users:,}명 규모의 데이터셋을 생성합니다...")
+        generate_dataset(args.users)
+    
+    before = check_consistency(db)
+    if not before['consistent']:
+        print("⚠️ 부하 테스트 전부터 장부가 일치하지 않습니다. --fresh로 다시 생성하는 것을 권장합니다.")
+    
+    start_event = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(
+            target=worker_main,
+            args=(i, str(db_path), str(upload_path), mix, args.duration, args.seed, start_event, results)
+        )
+        for i in range(args.workers)
+    ]
+    
+    for worker in workers:
+        worker.start()
+    
+    # 모든 워커가 준비될 시간을 조금 준 뒤 동시에 출발
+    time.sleep(1.0)
+    print(f"🚀 워커 {args.workers}개로 {args.duration:.0f}초 동안 부하를 겁니다... ({args.mix})")
+    started = time.monotonic()
+    start_event.set()
+    
+    worker_stats = [results.get(timeout=args.duration + 300)[1] for _ in workers]
+    wall_seconds = time.monotonic() - started
+    for worker in workers:
+        worker.join()
+    
+    operations, total_ops = aggregate(worker_stats, wall_seconds)
+    consistency = check_consistency(db)
+    
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'workers': args.workers,
+        'duration_sec': round(wall_seconds, 2),
+        'mix': mix,
+        'dataset': count_rows(db),
+        'total_ops': total_ops,
+        'throughput_per_sec': round(total_ops / wall_seconds, 2),
+        'operations': operations,
+        'consistency': consistency
+    }
+    
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    
+    print(f"\n📊 전체 처리량: {report['throughput_per_sec']:.1f} ops/s ({total_ops:,}건)")
+    print(f"{'작업':<10} {'ops/s':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'실패':>7} {'잠금오류율':>10}")
+    for name, stats in operations.items():
+        print(f"{name:<10} {stats['throughput_per_sec']:>9.1f} {stats['p50_ms']:>8.2f}ms {stats['p95_ms']:>8.2f}ms "
+              f"{stats['p99_ms']:>8.2f}ms {stats['failed']:>7} {stats['lock_error_rate']:>9.2%}")
+    
+    print("\n🔍 장부 정합성 검사")
+    print(f"  잔액 불일치 사용자: {consistency['balance_drift_users']}")
+    print(f"  음수 잔액 사용자: {consistency['negative_balances']}")
+    print(f"  다운로드 카운트 불일치 파일: {consistency['download_count_mismatches']}")
+    print(f"  결제 거래 / 다운로드 내역: {consistency['spend_transactions']} / {consistency['download_history_rows']}")
+    print(f"\n📄 리포트 저장: {output}")
+    
+    if not consistency['consistent']:
+        print("❌ 장부 정합성 검사 실패")
+        sys.exit(1)
+    print("✅ 장부 정합성 검사 통과")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+파일 목록 렌더링 벤치마크
+페이지 크기별로 파일 목록 한 페이지가 만드는 Streamlit 요소(delta) 수와 렌더링 시간을
+한 번에 그리는 현재 방식과 행마다 markdown/버튼을 보내던 이전 방식으로 비교합니다.
+
+사용 예:
+    python benchmarks/render_file_list.py
+    python benchmarks/render_file_list.py --sizes 10,20,50,100 --runs 20 --json bench_results/render.json
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.dataset import configure_environment, NAME_WORDS
+from benchmarks.run_benchmarks import summarize
+
+# AppTest로 실행할 스크립트 (session_state로 받은 합성 파일 목록을 렌더링)
+RENDER_SCRIPT = """
+import sys
+import time
+sys.path.insert(0, {root!r})
+import streamlit as st
+from modules.file_manager.file_manager import FileManager
+from modules.ui.components import (render_ghibli_file_list_html, get_file_statuses,
+                                   show_ghibli_file_actions, FILE_STATUS_BADGES)
+
+started = time.perf_counter_ns()
+files = st.session_state.bench_files
+user = st.session_state.bench_user
+downloaded_ids = st.session_state.bench_downloaded
+statuses = get_file_statuses(files, user, downloaded_ids)
+format_size = FileManager().format_file_size
+
+if st.session_state.bench_mode == 'batched':
+    st.markdown(render_ghibli_file_list_html(files, len(files), 0, statuses, format_size),
+                unsafe_allow_html=True)
+    show_ghibli_file_actions(files, statuses)
+else:
+    # 이전 방식: 헤더 2개 + 행마다 여는 markdown, 버튼/배지, 닫는 markdown
+    st.markdown('<div>header</div>', unsafe_allow_html=True)
+    st.markdown('<div>table header</div>', unsafe_allow_html=True)
+    for i, file in enumerate(files):
+        st.markdown(f"<div><div>{{i + 1}}</div><div>{{file['original_name']}}</div>"
+                    f"<div>{{format_size(file['file_size'])}}</div><div>{{file['price']}}P</div><div>",
+                    unsafe_allow_html=True)
+        if statuses[file['id']] in ('download', 'redownload'):
+            st.button("✨ 수확", key=f"down_{{file['id']}}")
+        else:
+            st.markdown(FILE_STATUS_BADGES[statuses[file['id']]], unsafe_allow_html=True)
+        st.markdown("</div></div></div>", unsafe_allow_html=True)
+
+st.session_state.bench_render_ns = time.perf_counter_ns() - started
+"""
+
+def make_files(count):
+    """합성 파일 목록 (내 파일/받은 파일/살 수 있는 파일/비싼 파일이 섞이도록)"""
+    files = []
+    for i in range(count):
+        files.append({
+            'id': i + 1,
+            'original_name': f"{NAME_WORDS[i % len(NAME_WORDS)]}_{i:05d} <final>.mp4",
+            'uploader_name': f"bench_user_{i % 7}",
+            'uploader_id': 1 if i % 10 == 0 else 2,
+            'created_at': '2024-01-01 12:00:00',
+            'category': 'movie',
+            'file_size': 1024 * 1024 * (i + 1),
+            'price': 10 if i % 5 else 5000
+        })
+    return files
+
+def count_elements(node):
+    """렌더링 트리의 말단 요소 수 (브라우저로 보내는 delta 수와 같음)"""
+    children = getattr(node, 'children', None)
+    if not children:
+        return 1
+    values = children.values() if isinstance(children, dict) else children
+    return sum(count_elements(child) for child in values)
+
+def run_mode(mode, files, runs):
+    from streamlit.testing.v1 import AppTest
+    
+    timings = []
+    deltas = 0
+    for _ in range(runs):
+        at = AppTest.from_string(RENDER_SCRIPT.format(root=str(project_root)), default_timeout=60)
+        at.session_state['bench_files'] = files
+        at.session_state['bench_user'] = {'id': 1, 'points': 1000}
+        at.session_state['bench_downloaded'] = {file['id'] for file in files[::3]}
+        at.session_state['bench_mode'] = mode
+        
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        
+        # AppTest 대기 시간을 빼고 스크립트 안에서 잰 렌더링 시간만 사용
+        timings.append(at.session_state['bench_render_ns'])
+        deltas = count_elements(at.main)
+    return deltas, summarize(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="파일 목록 렌더링 벤치마크")
+    parser.add_argument('--sizes', default='10,20,50,100', help="페이지 크기 목록")
+    parser.add_argument('--runs', type=int, default=10, help="크기/방식별 실행 횟수")
+    parser.add_argument('--data-dir', default='bench_data', help="스크래치 DB/업로드 디렉토리")
+    parser.add_argument('--json', dest='json_output', help="결과를 JSON으로 저장할 경로")
+    args = parser.parse_args()
+    
+    data_dir = Path(args.data_dir)
+    configure_environment(data_dir / 'webhard.db', data_dir / 'uploads')
+    
+    from modules.file_manager.file_manager import FileManager
+    from modules.ui.components import render_ghibli_file_list_html, get_file_statuses
+    
+    format_size = FileManager().format_file_size
+    results = []
+    
+    print(f"{'크기':>5} {'방식':<8} {'요소 수':>7} {'렌더링 p50':>11} {'렌더링 p95':>11} {'HTML 생성':>10}")
+    for size in [int(value) for value in args.sizes.split(',') if value.strip()]:
+        files = make_files(size)
+        statuses = get_file_statuses(files, {'id': 1, 'points': 1000}, set())
+        
+        # 한 페이지 HTML 생성만의 시간
+        started = time.perf_counter_ns()
+        for _ in range(100):
+            render_ghibli_file_list_html(files, size, 0, statuses, format_size)
+        build_ms = (time.perf_counter_ns() - started) / 100 / 1e6
+        
+        for mode in ('legacy', 'batched'):
+            deltas, stats = run_mode(mode, files, args.runs)
+            results.append({'size': size, 'mode': mode, 'deltas': deltas, 'render': stats,
+                            'html_build_ms': round(build_ms, 4) if mode == 'batched' else None})
+            build = f"{build_ms:>8.3f}ms" if mode == 'batched' else f"{'-':>10}"
+            print(f"{size:>5} {mode:<8} {deltas:>7} {stats['p50_ms']:>9.2f}ms {stats['p95_ms']:>9.2f}ms {build}")
+    
+    if args.json_output:
+        output = Path(args.json_output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps({'runs': args.runs, 'results': results}, ensure_ascii=False, indent=2),
+                          encoding='utf-8')
+        print(f"\n📄 결과 저장: {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+웹하드 매니저 벤치마크
+합성 데이터셋을 채운 스크래치 DB에서 주요 매니저 메서드의 지연시간을 측정하고
+실행 간 비교할 수 있는 JSON 리포트를 만듭니다.
+
+사용 예:
+    python benchmarks/run_benchmarks.py --users 100000 --output bench_results/base.json
+    python benchmarks/run_benchmarks.py --output bench_results/new.json --compare bench_results/base.json
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import platform
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.dataset import configure_environment, generate_dataset, BENCH_PASSWORD, NAME_WORDS
+
+class BenchUpload(io.BytesIO):
+    """Streamlit UploadedFile과 같은 인터페이스의 업로드 파일"""
+    
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+def percentile(sorted_values, pct):
+    """정렬된 값 목록에서 백분위수 계산 (최근접 순위)"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def summarize(samples_ns):
+    """나노초 측정값을 밀리초 통계로 요약"""
+    values = sorted(v / 1e6 for v in samples_ns)
+    total = sum(values)
+    return {
+        'count': len(values),
+        'min_ms': round(values[0], 4),
+        'mean_ms': round(total / len(values), 4),
+        'p50_ms': round(percentile(values, 50), 4),
+        'p95_ms': round(percentile(values, 95), 4),
+        'p99_ms': round(percentile(values, 99), 4),
+        'max_ms': round(values[-1], 4),
+        'ops_per_sec': round(len(values) / (total / 1000), 2) if total else 0.0
+    }
+
+def measure(func, iterations, warmup=3):
+    """func(i)를 반복 실행하며 지연시간 측정"""
+    for i in range(warmup):
+        func(i)
+    
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter_ns()
+        func(i)
+        samples.append(time.perf_counter_ns() - started)
+    return summarize(samples)
+
+def count_rows(db):
+    """데이터셋 크기 조회"""
+    conn = db.get_connection()
+    try:
+        return {
+            table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+            for table in ('users', 'files', 'point_transactions', 'download_history')
+        }
+    finally:
+        conn.close()
+
+def run_benchmarks(iterations=200, auth_iterations=20, seed=7, log=print):
+    """벤치마크 실행 후 {이름: 통계} 반환"""
+    from config.settings import Config
+    from database.models import db
+    from modules.file_manager.file_manager import FileManager
+    from modules.point_system.point_manager import PointManager
+    from modules.auth.password_hasher import password_hasher
+    
+    file_manager = FileManager()
+    point_manager = PointManager()
+    rng = random.Random(seed)
+    
+    conn = db.get_connection()
+    try:
+        user_count = conn.execute('SELECT MAX(id) FROM users').fetchone()[0] or 0
+        file_ids = [row[0] for row in conn.execute('SELECT id FROM files WHERE is_active = 1')]
+    finally:
+        conn.close()
+    
+    if not user_count or not file_ids:
+        raise RuntimeError("데이터셋이 비어 있습니다. 먼저 데이터를 생성하세요.")
+    
+    _, total_files = file_manager.get_files_list(limit=1)
+    categories = [c for c in Config.CATEGORIES if c != 'all']
+    deep_offset = max(0, int(total_files * 0.9) // 20 * 20)
+    upload_payload = b'benchmark upload payload\n' * 2048
+    
+    cases = {
+        'get_files_list.first_page': lambda i: file_manager.get_files_list(limit=20),
+        'get_files_list.category': lambda i: file_manager.get_files_list(
+            category=categories[i % len(categories)], limit=20),
+        'get_files_list.search': lambda i: file_manager.get_files_list(
+            search_query=NAME_WORDS[i % len(NAME_WORDS)], limit=20),
+        'get_files_list.deep_page': lambda i: file_manager.get_files_list(limit=20, offset=deep_offset),
+        'process_download_payment': lambda i: point_manager.process_download_payment(
+            rng.randint(1, user_count), rng.choice(file_ids)),
+        'get_user_statistics': lambda i: point_manager.get_user_statistics(rng.randint(1, user_count)),
+        'save_uploaded_file': lambda i: file_manager.save_uploaded_file(
+            BenchUpload(f'bench_upload_{i}.txt', upload_payload), rng.randint(1, user_count)),
+    }
+    
+    results = {}
+    for name, func in cases.items():
+        log(f"⏱️ {name} ...")
+        results[name] = measure(func, iterations)
+    
+    # 메트릭 계측 오버헤드 (호출 1000회 묶음, 예산: 1회당 2µs → 묶음당 2ms 이하)
+    from modules.monitoring.metrics import DB_QUERY_SECONDS, UPLOADS_TOTAL
+    
+    def observe_batch(i):
+        for _ in range(1000):
+            DB_QUERY_SECONDS.observe(0.001, statement='benchmark')
+    
+    def counter_batch(i):
+        for _ in range(1000):
+            UPLOADS_TOTAL.inc(result='benchmark')
+    
+    results['metrics.histogram_observe_x1000'] = measure(observe_batch, iterations)
+    results['metrics.counter_inc_x1000'] = measure(counter_batch, iterations)
+    
+    # bcrypt 비용이 커서 반복 횟수를 따로 지정 (앱과 같은 작업자 풀 경로)
+    log("⏱️ authenticate_user ...")
+    results['authenticate_user'] = measure(
+        lambda i: password_hasher.authenticate(f'bench_user_{rng.randint(0, user_count - 1)}', BENCH_PASSWORD),
+        auth_iterations, warmup=1)
+    
+    return results
+
+def build_report(results, dataset, args):
+    """실행 환경과 결과를 담은 리포트 생성"""
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'label': args.label,
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sqlite': sqlite3.sqlite_version,
+            'cpu_count': os.cpu_count()
+        },
+        'dataset': dataset,
+        'settings': {
+            'iterations': args.iterations,
+            'auth_iterations': args.auth_iterations
+        },
+        'results': results
+    }
+
+def compare_reports(baseline, current, threshold_pct=10.0, log=print):
+    """두 리포트의 p50/p95를 비교하고 회귀 항목 목록 반환"""
+    regressions = []
+    log(f"\n{'벤치마크':<32} {'기준 p50':>10} {'현재 p50':>10} {'변화':>8} {'기준 p95':>10} {'현재 p95':>10} {'변화':>8}")
+    
+    for name, current_stats in current['results'].items():
+        base_stats = baseline.get('results', {}).get(name)
+        if not base_stats:
+            log(f"{name:<32} {'(신규)':>10}")
+            continue
+        
+        changes = []
+        for key in ('p50_ms', 'p95_ms'):
+            base = base_stats[key]
+            changes.append((current_stats[key] - base) / base * 100 if base else 0.0)
+        
+        flag = ' ⚠️' if max(changes) > threshold_pct else ''
+        if flag:
+            regressions.append(name)
+        
+        log(f"{name:<32} {base_stats['p50_ms']:>10.3f} {current_stats['p50_ms']:>10.3f} {changes[0]:>+7.1f}% "
+            f"{base_stats['p95_ms']:>10.3f} {current_stats['p95_ms']:>10.3f} {changes[1]:>+7.1f}%{flag}")
+    
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="웹하드 매니저 벤치마크")
+    parser.add_argument('--users', type=int, default=10000, help="새 데이터셋의 사용자 수 (10k~1M)")
+    parser.add_argument('--data-dir', default='bench_data', help="스크래치 DB/업로드 디렉토리")
+    parser.add_argument('--fresh', action='store_true', help="기존 스크래치 DB를 지우고 다시 생성")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--auth-iterations', type=int, default=20)
+    parser.add_argument('--label', default='', help="리포트에 남길 실행 이름")
+    parser.add_argument('--output', default='bench_results/latest.json', help="JSON 리포트 경로")
+    parser.add_argument('--compare', help="비교할 기준 JSON 리포트")
+    parser.add_argument('--threshold', type=float, default=10.0, help="회귀로 표시할 변화율 (%%)")
+    args = parser.parse_args()
+    
+    data_dir = Path(args.data_dir)
+    db_path = data_dir / 'webhard.db'
+    
+    if args.fresh:
+        for suffix in ('', '-wal', '-shm'):
+            Path(f'{db_path}{suffix}').unlink(missing_ok=True)
+    
+    needs_dataset = not db_path.exists()
+    configure_environment(db_path, data_dir / 'uploads')
+    
+    from database.models import db
+    
+    if needs_dataset:
+        print(f"🌱 {args.users:,}명 규모의 데이터셋을 생성합니다...")
+        generate_dataset(args.users)
+    else:
+        print(f"♻️ 기존 데이터셋을 사용합니다: {db_path}")
+    
+    dataset = count_rows(db)
+    results = run_benchmarks(args.iterations, args.auth_iterations)
+    report = build_report(results, dataset, args)
+    
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"\n📄 리포트 저장: {output}")
+    
+    for name, stats in results.items():
+        print(f"  {name:<32} p50 {stats['p50_ms']:>9.3f}ms  p95 {stats['p95_ms']:>9.3f}ms  {stats['ops_per_sec']:>10.1f} ops/s")
+    
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        regressions = compare_reports(baseline, report, args.threshold)
+        if regressions:
+            print(f"\n⚠️ {len(regressions)}개 항목이 {args.threshold}% 이상 느려졌습니다: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
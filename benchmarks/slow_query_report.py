@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+느린 쿼리 로그 리포트
+SLOW_QUERY_LOG(JSONL)를 정규화된 SQL별로 묶어 누적 시간 순으로 보여주고
+files / download_history / point_transactions 전체 스캔을 표시합니다.
+
+사용 예:
+    python benchmarks/slow_query_report.py --log logs/slow_queries.jsonl --top 20
+    python benchmarks/slow_query_report.py --db database/webhard.db --fail-on-scan
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config.settings import Config
+from modules.monitoring.slow_query import read_slow_query_log, summarize_slow_queries
+
+def main():
+    parser = argparse.ArgumentParser(description="느린 쿼리 로그 리포트")
+    parser.add_argument('--log', default=Config.SLOW_QUERY_LOG, help="느린 쿼리 JSONL 로그 경로")
+    parser.add_argument('--db', default=Config.DB_PATH, help="실행 계획이 없는 문장을 다시 EXPLAIN 할 DB")
+    parser.add_argument('--top', type=int, default=20, help="표시할 문장 수")
+    parser.add_argument('--json', dest='json_output', help="요약을 JSON으로 저장할 경로")
+    parser.add_argument('--fail-on-scan', action='store_true', help="전체 스캔이 있으면 종료 코드 1")
+    args = parser.parse_args()
+    
+    entries = read_slow_query_log(args.log)
+    if not entries:
+        print(f"📭 느린 쿼리가 없습니다: {args.log}")
+        return
+    
+    db_path = args.db if args.db and Path(args.db).exists() else None
+    summary = summarize_slow_queries(entries, db_path)
+    scans = [group for group in summary if group['full_scans']]
+    
+    print(f"🐢 느린 쿼리 {len(entries):,}건, 고유 문장 {len(summary)}개 (누적 시간 순)\n")
+    for rank, group in enumerate(summary[:args.top], 1):
+        flag = f"  ⚠️ 전체 스캔: {', '.join(group['full_scans'])}" if group['full_scans'] else ''
+        print(f"{rank:>3}. {group['statement']:<28} {group['count']:>6}회  합계 {group['total_ms']:>10.1f}ms  "
+              f"평균 {group['avg_ms']:>8.1f}ms  최대 {group['max_ms']:>8.1f}ms  행 {group['max_rows']:>7}{flag}")
+        print(f"     {group['sql'][:160]}")
+        if group['params']:
+            print(f"     파라미터: ({group['params']})")
+        for detail in group['plan'] or ():
+            print(f"       └ {detail}")
+    
+    if args.json_output:
+        output = Path(args.json_output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"\n📄 요약 저장: {output}")
+    
+    if scans:
+        print(f"\n⚠️ 큰 테이블을 전체 스캔하는 문장 {len(scans)}개:")
+        for group in scans:
+            print(f"  - [{', '.join(group['full_scans'])}] {group['statement']}: {group['sql'][:120]}")
+        if args.fail_on_scan:
+            sys.exit(1)
+    else:
+        print("\n✅ files / download_history / point_transactions 전체 스캔 없음")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+앱 시작 시간 벤치마크
+app.py가 임포트하는 모듈별 임포트 시간(python -X importtime)과 새 프로세스에서 첫 화면이
+그려지기까지의 시간, 이미 떠 있는 프로세스에 새 세션이 접속했을 때의 렌더링 시간을 측정하고
+시작 시간 예산을 넘으면 종료 코드 1을 반환합니다.
+
+사용 예:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --budget-ms 1500 --session-budget-ms 150 --json bench_results/startup.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.dataset import configure_environment
+from benchmarks.run_benchmarks import summarize
+
+# AppTest로 실행할 스크립트 (app.py 한 번 실행 시간을 스크립트 안에서 잼)
+APP_SCRIPT = """
+import time
+import runpy
+import streamlit as st
+
+started = time.perf_counter_ns()
+runpy.run_path({app!r}, run_name='__main__')
+st.session_state.bench_render_ns = time.perf_counter_ns() - started
+"""
+
+def parse_importtime(stderr, top=15):
+    """-X importtime 출력에서 app.py가 직접 임포트한 모듈을 누적 시간 순으로 정리"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        entries.append({'module': name.strip(), 'depth': depth, 'self_ms': int(self_us) / 1000,
+                        'cumulative_ms': int(cumulative_us) / 1000})
+    
+    # 자식 임포트가 부모보다 먼저 출력되므로 app 바로 앞의 깊이 1 항목이 app.py가 직접 임포트한 모듈
+    app_index = max(index for index, entry in enumerate(entries) if entry['depth'] == 0 and entry['module'] == 'app')
+    start = app_index
+    while start > 0 and entries[start - 1]['depth'] > 0:
+        start -= 1
+    children = [entry for entry in entries[start:app_index] if entry['depth'] == 1]
+    children.sort(key=lambda entry: entry['cumulative_ms'], reverse=True)
+    return {
+        'total_ms': round(entries[app_index]['cumulative_ms'], 2),
+        'modules': app_index - start,
+        'top': [{'module': entry['module'], 'cumulative_ms': round(entry['cumulative_ms'], 2)}
+                for entry in children[:top]]
+    }
+
+def trace_imports(env, top):
+    """새 프로세스에서 app.py를 모듈로 임포트하며 임포트 시간 추적 (main()은 실행하지 않음)"""
+    code = f"import sys; sys.path.insert(0, {str(project_root)!r}); import app"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], env=env, cwd=str(project_root),
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr, top)
+
+def run_app(session_state=None, at=None):
+    """AppTest로 app.py를 한 번 실행하고 (AppTest, 스크립트 안에서 잰 ns) 반환"""
+    from streamlit.testing.v1 import AppTest
+    
+    if at is None:
+        at = AppTest.from_string(APP_SCRIPT.format(app=str(project_root / 'app.py')), default_timeout=60)
+        for key, value in (session_state or {}).items():
+            at.session_state[key] = value
+    
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return at, at.session_state['bench_render_ns']
+
+def child_main(args):
+    """새 프로세스 안에서 실행: 첫 렌더링(콜드)과 새 세션/재실행(웜) 측정 결과를 JSON으로 출력"""
+    started = time.perf_counter_ns()
+    import streamlit.testing.v1  # noqa: F401  (서버 프로세스가 세션 전에 임포트하는 부분)
+    streamlit_ns = time.perf_counter_ns() - started
+    
+    # 새 프로세스의 첫 요청 (로그인 화면, 앱 모듈 임포트와 프로세스 초기화 포함)
+    _, first_render_ns = run_app()
+    
+    result = {
+        'streamlit_import_ms': round(streamlit_ns / 1e6, 2),
+        'first_render_ms': round(first_render_ns / 1e6, 2),
+        'cold_start_ms': round((streamlit_ns + first_render_ns) / 1e6, 2),
+        'login_session': summarize([run_app()[1] for _ in range(args.runs)])
+    }
+    
+    # 로그인한 사용자의 새 세션과 같은 세션의 재실행 (메인 화면)
+    from database.models import db
+    from modules.auth.session_store import get_session_store
+    conn = db.get_connection()
+    try:
+        row = conn.execute('SELECT id FROM users WHERE username = ?', (args.user,)).fetchone()
+    finally:
+        conn.close()
+    
+    if row:
+        sid = get_session_store().create(row['id'])
+        sessions, reruns = [], []
+        for _ in range(args.runs):
+            at, render_ns = run_app({'sid': sid})
+            sessions.append(render_ns)
+            reruns.append(run_app(at=at)[1])
+        result['main_session'] = summarize(sessions)
+        result['main_rerun'] = summarize(reruns)
+        get_session_store().delete(sid)
+    
+    print(json.dumps(result))
+
+def main():
+    parser = argparse.ArgumentParser(description="앱 시작 시간 벤치마크")
+    parser.add_argument('--runs', type=int, default=10, help="웜 프로세스에서 새 세션 측정 횟수")
+    parser.add_argument('--processes', type=int, default=3, help="콜드 스타트 측정 프로세스 수 (중앙값 사용)")
+    parser.add_argument('--user', default='bench_user_1', help="메인 화면 측정에 사용할 사용자 (없으면 생략)")
+    parser.add_argument('--top', type=int, default=15, help="출력할 임포트 항목 수")
+    parser.add_argument('--budget-ms', type=float, help="콜드 스타트(streamlit 임포트 + 첫 렌더링) 예산")
+    parser.add_argument('--session-budget-ms', type=float, help="웜 프로세스의 새 세션 렌더링 p50 예산")
+    parser.add_argument('--data-dir', default='bench_data', help="스크래치 DB/업로드 디렉토리")
+    parser.add_argument('--json', dest='json_output', help="결과를 JSON으로 저장할 경로")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    data_dir = Path(args.data_dir)
+    configure_environment(data_dir / 'webhard.db', data_dir / 'uploads')
+    
+    if args.child:
+        child_main(args)
+        return
+    
+    env = dict(os.environ)
+    
+    print("📦 임포트 시간 (app.py, 누적 기준 상위)")
+    imports = trace_imports(env, args.top)
+    for entry in imports['top']:
+        print(f"  {entry['cumulative_ms']:>9.2f}ms  {entry['module']}")
+    print(f"  {imports['total_ms']:>9.2f}ms  합계 ({imports['modules']}개 모듈)")
+    
+    runs = []
+    for _ in range(max(1, args.processes)):
+        command = [sys.executable, str(Path(__file__).resolve()), '--child', '--runs', str(args.runs),
+                   '--user', args.user, '--data-dir', str(data_dir)]
+        result = subprocess.run(command, env=env, cwd=str(project_root), capture_output=True, text=True)
+        if result.returncode != 0:
+            print(result.stderr, file=sys.stderr)
+            sys.exit(2)
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    
+    runs.sort(key=lambda run: run['cold_start_ms'])
+    report = dict(runs[len(runs) // 2])
+    report['cold_start_samples_ms'] = [run['cold_start_ms'] for run in runs]
+    report['imports'] = imports
+    
+    print(f"\n🚀 콜드 스타트 (프로세스 {len(runs)}개 중앙값)")
+    print(f"  streamlit 임포트 {report['streamlit_import_ms']:>9.2f}ms")
+    print(f"  첫 렌더링        {report['first_render_ms']:>9.2f}ms")
+    print(f"  합계             {report['cold_start_ms']:>9.2f}ms")
+    
+    print(f"\n🔁 웜 프로세스 ({args.runs}회)")
+    for key, label in (('login_session', '새 세션 (로그인 화면)'), ('main_session', '새 세션 (메인 화면)'),
+                       ('main_rerun', '재실행 (메인 화면)')):
+        if key in report:
+            stats = report[key]
+            print(f"  {label:<18} p50 {stats['p50_ms']:>8.2f}ms  p95 {stats['p95_ms']:>8.2f}ms")
+    
+    failures = []
+    if args.budget_ms is not None and report['cold_start_ms'] > args.budget_ms:
+        failures.append(f"콜드 스타트 {report['cold_start_ms']:.0f}ms > 예산 {args.budget_ms:.0f}ms")
+    session_key = 'main_session' if 'main_session' in report else 'login_session'
+    if args.session_budget_ms is not None and report[session_key]['p50_ms'] > args.session_budget_ms:
+        failures.append(f"새 세션 p50 {report[session_key]['p50_ms']:.0f}ms > 예산 {args.session_budget_ms:.0f}ms")
+    report['budget'] = {'cold_start_ms': args.budget_ms, 'session_ms': args.session_budget_ms, 'failures': failures}
+    
+    if args.json_output:
+        output = Path(args.json_output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"\n📄 결과 저장: {output}")
+    
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("\n✅ 시작 시간 예산 이내")
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,16 @@ class Config:
     MAX_FILE_SIZE_MB = int(os.getenv('MAX_FILE_SIZE_MB', 500))
     ALLOWED_EXTENSIONS = os.getenv('ALLOWED_EXTENSIONS', '').split(',')
     
+    # 저장소 압축 설정 (off / gzip / zstd)
+    STORAGE_COMPRESSION = os.getenv('STORAGE_COMPRESSION', 'off').lower()
+    STORAGE_COMPRESSION_LEVEL = int(os.getenv('STORAGE_COMPRESSION_LEVEL', 6))
+    STORAGE_COMPRESSION_MIN_RATIO = float(os.getenv('STORAGE_COMPRESSION_MIN_RATIO', 0.9))
+    
+    # 인기 파일 메모리 캐시 설정
+    HOT_CACHE_MAX_MB = int(os.getenv('HOT_CACHE_MAX_MB', 64))
+    HOT_CACHE_MAX_FILE_MB = float(os.getenv('HOT_CACHE_MAX_FILE_MB', 2))
+    HOT_CACHE_ADMIT_AFTER = int(os.getenv('HOT_CACHE_ADMIT_AFTER', 2))
+    
     # 포인트 시스템 설정
     INITIAL_POINTS = int(os.getenv('INITIAL_POINTS', 1000))
     UPLOAD_BONUS_POINTS = int(os.getenv('UPLOAD_BONUS_POINTS', 50))
@@ -21,12 +31,123 @@ class Config:
     
     # 보안 설정
     SECRET_KEY = os.getenv('SECRET_KEY', 'change-this-in-production')
+    SECRET_KEY_ID = os.getenv('SECRET_KEY_ID', 'k1')
+    # 키 교체 후에도 기존 토큰을 검증할 이전 키 목록 (kid:secret,kid:secret)
+    SECRET_KEYS_PREVIOUS = os.getenv('SECRET_KEYS_PREVIOUS', '')
     SESSION_TIMEOUT_HOURS = int(os.getenv('SESSION_TIMEOUT_HOURS', 24))
     
+    # 비밀번호 해시 설정 (비용은 benchmarks/bcrypt_cost.py로 선택, 바꾸면 다음 로그인 때 재해시)
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+    # 동시에 bcrypt를 실행할 작업자 수 (0이면 CPU 코어 수의 절반)
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 0))
+    # 대기열 길이 (0이면 작업자 수 x 8)와 대기 제한 시간(초)
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 0))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 10))
+    
+    # 서버 측 세션 저장소 (sqlite: 앱 DB, redis: REDIS_URL) - 세션 쿠키로 여러 레플리카가 세션을 공유
+    SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'sqlite').lower()
+    REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    # 레플리카별 세션 읽기 캐시 유지 시간 (다른 레플리카의 로그아웃은 이 시간 안에 반영)
+    SESSION_CACHE_SECONDS = int(os.getenv('SESSION_CACHE_SECONDS', 30))
+    SESSION_TOUCH_INTERVAL_SECONDS = int(os.getenv('SESSION_TOUCH_INTERVAL_SECONDS', 300))
+    # 세션 쿠키 (API 서버의 /api/session이 HttpOnly로 설정 - Streamlit과 같은 도메인의 프록시 뒤에 둬야 함)
+    SESSION_COOKIE_NAME = os.getenv('SESSION_COOKIE_NAME', 'webhard_sid')
+    SESSION_COOKIE_SECURE = os.getenv('SESSION_COOKIE_SECURE', 'true').lower() == 'true'
+    SESSION_COOKIE_SAMESITE = os.getenv('SESSION_COOKIE_SAMESITE', 'Strict')
+    # 로그인 후 세션 쿠키로 바꿀 1회용 티켓 유효 시간(초)
+    SESSION_TICKET_SECONDS = int(os.getenv('SESSION_TICKET_SECONDS', 60))
+    
+    # 모니터링 설정
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+    METRICS_PORT = int(os.getenv('METRICS_PORT', 9108))
+    
+    # 재실행 프로파일링 설정 (느린 재실행만 저장)
+    PROFILE_RERUNS = os.getenv('PROFILE_RERUNS', 'false').lower() == 'true'
+    PROFILE_SLOW_RERUN_MS = int(os.getenv('PROFILE_SLOW_RERUN_MS', 500))
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles/')
+    PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', 200))
+    
+    # 느린 쿼리 로그 설정 (임계값 이상 걸린 SQL과 실행 계획 기록)
+    SLOW_QUERY_LOG_ENABLED = os.getenv('SLOW_QUERY_LOG_ENABLED', 'true').lower() == 'true'
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 100))
+    SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', 'logs/slow_queries.jsonl')
+    
+    # JSON API 서버 설정 (api_server.py)
+    API_HOST = os.getenv('API_HOST', '127.0.0.1')
+    API_PORT = int(os.getenv('API_PORT', 8600))
+    API_WORKERS = int(os.getenv('API_WORKERS', 16))
+    API_TOKEN_TTL_HOURS = int(os.getenv('API_TOKEN_TTL_HOURS', 24))
+    # 브라우저가 접근할 API 서버 주소 (설정하면 일괄 다운로드를 API가 스트리밍)
+    API_PUBLIC_URL = os.getenv('API_PUBLIC_URL', '').rstrip('/')
+    BULK_DOWNLOAD_MAX_FILES = int(os.getenv('BULK_DOWNLOAD_MAX_FILES', 50))
+    # API 서버가 없을 때 Streamlit이 메모리에서 조립하는 일괄 다운로드 ZIP의 최대 합계 크기
+    BULK_DOWNLOAD_INLINE_MAX_MB = int(os.getenv('BULK_DOWNLOAD_INLINE_MAX_MB', 100))
+    # API 서버가 없을 때 브라우저 세션별로 보관하는 준비된 다운로드 내용 (재실행 시 재읽기 방지)
+    DOWNLOAD_SESSION_CACHE_MB = int(os.getenv('DOWNLOAD_SESSION_CACHE_MB', 64))
+    
+    # 다운로드 토큰 설정 (결제 후 발급, DB 조회 없이 검증)
+    DOWNLOAD_TOKEN_TTL_MINUTES = int(os.getenv('DOWNLOAD_TOKEN_TTL_MINUTES', 30))
+    DOWNLOAD_TOKEN_ENFORCE_IP = os.getenv('DOWNLOAD_TOKEN_ENFORCE_IP', 'true').lower() == 'true'
+    TOKEN_REVOCATION_REFRESH_SECONDS = int(os.getenv('TOKEN_REVOCATION_REFRESH_SECONDS', 30))
+    
+    # 검색 설정 (자동완성 색인은 프로세스 메모리에 유지)
+    SEARCH_SUGGEST_LIMIT = int(os.getenv('SEARCH_SUGGEST_LIMIT', 8))
+    SEARCH_INDEX_REFRESH_SECONDS = int(os.getenv('SEARCH_INDEX_REFRESH_SECONDS', 30))
+    SEARCH_INDEX_REBUILD_SECONDS = int(os.getenv('SEARCH_INDEX_REBUILD_SECONDS', 600))
+    # 같은 목록/검색 조회를 이 시간 동안 DB 대신 캐시로 응답 (재실행마다 LIKE/COUNT 방지)
+    FILE_LIST_CACHE_SECONDS = float(os.getenv('FILE_LIST_CACHE_SECONDS', 5))
+    
+    # 인기 순위 (다운로드마다 증분 갱신하는 시간 감쇠 점수, 반감기를 바꾸면 점수 재계산 필요)
+    TRENDING_DAY_HALF_LIFE_HOURS = float(os.getenv('TRENDING_DAY_HALF_LIFE_HOURS', 6))
+    TRENDING_WEEK_HALF_LIFE_HOURS = float(os.getenv('TRENDING_WEEK_HALF_LIFE_HOURS', 36))
+    TRENDING_MAX_RESULTS = int(os.getenv('TRENDING_MAX_RESULTS', 100))
+    
+    # 함께 받은 파일 추천 (python recommend_job.py 배치로 계산)
+    RECOMMENDATION_TOP_K = int(os.getenv('RECOMMENDATION_TOP_K', 10))
+    RECOMMENDATION_MIN_CO_DOWNLOADS = int(os.getenv('RECOMMENDATION_MIN_CO_DOWNLOADS', 2))
+    RECOMMENDATION_MAX_ITEMS_PER_USER = int(os.getenv('RECOMMENDATION_MAX_ITEMS_PER_USER', 200))
+    
+    # 관리자 통계 (python analytics_job.py로 일별 집계, 대시보드 조회 결과 캐시 시간)
+    ANALYTICS_CACHE_SECONDS = int(os.getenv('ANALYTICS_CACHE_SECONDS', 300))
+    
+    # 내역 보관 (python archive_job.py로 오래된 포인트 거래/다운로드 내역을 보관 DB로 이동)
+    ARCHIVE_DB_PATH = os.getenv('ARCHIVE_DB_PATH', str(Path(DB_PATH).with_name('webhard_archive.db')))
+    ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', 180))
+    ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', 5000))
+    
+    # 파일 소유 캐시 (확인된 소유를 메모리에 둘 최근 사용자 수, 0이면 끔)
+    ENTITLEMENT_CACHE_USERS = int(os.getenv('ENTITLEMENT_CACHE_USERS', 10000))
+    
+    # 요청 속도 제한 (동작별 '횟수/초' 토큰 버킷, 빈 값이면 제한 없음) - IP별 한도는 사용자 한도 x 배수
+    RATE_LIMITS = {
+        'list': os.getenv('RATE_LIMIT_LIST', '120/60'),
+        'download': os.getenv('RATE_LIMIT_DOWNLOAD', '30/60'),
+        'upload': os.getenv('RATE_LIMIT_UPLOAD', '10/60')
+    }
+    RATE_LIMIT_IP_MULTIPLIER = float(os.getenv('RATE_LIMIT_IP_MULTIPLIER', 4))
+    # 앞단 리버스 프록시 주소 (쉼표 구분, IP 또는 CIDR) - 이 주소에서 온 요청만 X-Forwarded-For로 클라이언트 IP를 찾음
+    TRUSTED_PROXIES = [address.strip() for address in os.getenv('TRUSTED_PROXIES', '').split(',') if address.strip()]
+    # 레플리카 간 버킷 공유 (앱 DB), 한 번에 빌려 메모리에서 쓸 토큰 비율 (버킷 크기 대비)
+    RATE_LIMIT_SHARED = os.getenv('RATE_LIMIT_SHARED', 'true').lower() == 'true'
+    RATE_LIMIT_LEASE_FRACTION = float(os.getenv('RATE_LIMIT_LEASE_FRACTION', 0.1))
+    
+    # 다운로드 대역폭 조절 (API 서버, MB/s, 0이면 제한 없음) - 전체 한도는 사용자별로 공평하게 나눔
+    BANDWIDTH_GLOBAL_MBPS = float(os.getenv('BANDWIDTH_GLOBAL_MBPS', 0))
+    BANDWIDTH_PER_CONNECTION_MBPS = float(os.getenv('BANDWIDTH_PER_CONNECTION_MBPS', 0))
+    # 이보다 작은 파일(ZIP은 합계)은 조절 없이 바로 전송
+    BANDWIDTH_SHAPING_MIN_MB = float(os.getenv('BANDWIDTH_SHAPING_MIN_MB', 16))
+    
+    # 부분 재실행 (Streamlit 1.33+에서 파일 목록/헤더를 프래그먼트로 실행)
+    UI_FRAGMENTS = os.getenv('UI_FRAGMENTS', 'true').lower() == 'true'
+    
     # 사이트 설정
     SITE_NAME = os.getenv('SITE_NAME', '꿀파일 시스템')
     SITE_DESCRIPTION = os.getenv('SITE_DESCRIPTION', 'Streamlit 기반 파일 공유 플랫폼')
-    ADMIN_EMAIL = os.getenv('ADMIN_EMAIL', 'admin@webhard.com')
+    # 관리자 연락처 (이 주소로는 회원가입할 수 없음)
+    ADMIN_EMAIL = os.getenv('ADMIN_EMAIL', '').strip()
+    # 관리자 메뉴를 볼 수 있는 사용자 ID 목록 (쉼표 구분, 비우면 관리자 없음)
+    ADMIN_USER_IDS = {int(user_id) for user_id in os.getenv('ADMIN_USER_IDS', '').split(',') if user_id.strip()}
     
     # 카테고리 설정
     CATEGORIES = {
@@ -0,0 +1,46 @@
+import sqlite3
+from database.models import db
+
+# 배치 작업 진행 상태 (작업마다 name 하나, 값은 워터마크나 기준 시각)
+JOB_STATE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS job_state (
+        name TEXT PRIMARY KEY,
+        value TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+def ensure_schema(owner, create):
+    """owner 클래스의 테이블을 프로세스당 한 번 생성 - create(conn)를 실행하고 커밋하면 owner._schema_ready를 켬
+    
+    다른 프로세스가 동시에 만들고 있어 OperationalError(잠김 등)가 나면 되돌리고 다음 호출에서 다시 확인합니다.
+    반환: 이번 호출에서 create가 반환한 값 (이미 만들었거나 실패하면 None)
+    """
+    if owner._schema_ready:
+        return None
+    
+    conn = db.get_connection()
+    
+    try:
+        result = create(conn)
+        conn.commit()
+        owner._schema_ready = True
+        return result
+    except sqlite3.OperationalError:
+        conn.rollback()
+        return None
+    finally:
+        conn.close()
+
+def read_job_state(cursor, name):
+    """job_state 값 (없으면 None)"""
+    cursor.execute('SELECT value FROM main.job_state WHERE name = ?', (name,))
+    row = cursor.fetchone()
+    return row['value'] if row else None
+
+def write_job_state(cursor, name, value):
+    """job_state 값 저장 (호출한 쪽 트랜잭션 안에서, 커밋은 호출한 쪽에서)"""
+    cursor.execute('''
+        INSERT INTO main.job_state (name, value, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(name) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+    ''', (name, str(value)))
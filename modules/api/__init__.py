@@ -0,0 +1 @@
+# api 패키지 초기화
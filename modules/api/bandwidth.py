@@ -0,0 +1,164 @@
+import asyncio
+from collections import deque
+from time import monotonic
+from config.settings import Config
+from modules.monitoring.metrics import registry
+
+MB = 1024 * 1024
+
+# 조절하는 다운로드의 청크 크기이자 사용자별 한 라운드 할당량 (작을수록 사용자 간 전환이 고름)
+SHAPED_CHUNK_SIZE = 256 * 1024
+
+# 전체 버킷에 쌓아둘 수 있는 시간 (초, 쉬다가 한꺼번에 보내는 양의 상한)
+GLOBAL_BURST_SECONDS = 0.25
+
+# 바이트/초 버킷
+THROUGHPUT_BUCKETS = (64 * 1024, 256 * 1024, MB, 4 * MB, 16 * MB, 64 * MB, 256 * MB, 1024 * MB)
+
+DOWNLOAD_QUEUE_SECONDS = registry.histogram(
+    'webhard_download_queue_wait_seconds', '대역폭 조절로 청크 전송을 기다린 시간 (초)')
+DOWNLOAD_THROUGHPUT = registry.histogram(
+    'webhard_download_throughput_bytes_per_second', '다운로드 1건의 평균 전송 속도 (바이트/초, sendfile 포함)',
+    ('shaped',), buckets=THROUGHPUT_BUCKETS)
+SHAPED_DOWNLOADS = registry.gauge(
+    'webhard_download_shaped_streams', '대역폭 조절 중인 다운로드 수')
+
+class BandwidthScheduler:
+    """다운로드 대역폭 조절 - 전체 한도를 사용자별로 공평하게 나누고 연결별 한도를 적용
+    
+    전체 한도(BANDWIDTH_GLOBAL_MBPS)는 하나의 토큰 버킷이고, 기다리는 청크는 사용자별 대기열에 넣어
+    deficit round robin으로 내보냅니다. 라운드마다 사용자별로 SHAPED_CHUNK_SIZE만큼 보낼 수 있어 연결을
+    여러 개 연 사용자도 한 사용자 몫만 받습니다. BANDWIDTH_SHAPING_MIN_MB보다 작은 파일은 조절하지 않으므로
+    전체 한도는 회선 용량보다 작게 잡아 작은 파일이 쓸 여유를 남겨둡니다.
+    """
+    
+    def __init__(self, global_mbps=None, connection_mbps=None, min_mb=None, quantum=SHAPED_CHUNK_SIZE):
+        global_mbps = Config.BANDWIDTH_GLOBAL_MBPS if global_mbps is None else global_mbps
+        connection_mbps = Config.BANDWIDTH_PER_CONNECTION_MBPS if connection_mbps is None else connection_mbps
+        min_mb = Config.BANDWIDTH_SHAPING_MIN_MB if min_mb is None else min_mb
+        self.global_rate = global_mbps * MB
+        self.connection_rate = connection_mbps * MB
+        self.min_bytes = min_mb * MB
+        self.quantum = quantum
+        self._capacity = max(quantum, self.global_rate * GLOBAL_BURST_SECONDS)
+        self._tokens = self._capacity
+        self._updated = monotonic()
+        self._queues = {}
+        self._deficits = {}
+        self._active = deque()
+        self._wakeup = None
+        self._dispatcher = None
+    
+    @property
+    def enabled(self):
+        return self.global_rate > 0 or self.connection_rate > 0
+    
+    def shapes(self, size):
+        """이 크기의 다운로드를 조절하는지 (작은 파일은 그대로 전송)"""
+        return self.enabled and size >= self.min_bytes
+    
+    def connect(self, key):
+        """다운로드 1건의 전송 조절 시작 (key: 공평하게 나눌 단위, 보통 사용자 ID)"""
+        return ShapedConnection(self, key)
+    
+    async def close(self):
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+    
+    async def acquire(self, key, size):
+        """전체 한도에서 size 바이트를 받을 때까지 사용자 대기열에서 기다림"""
+        if self._dispatcher is None:
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+        
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+            self._deficits[key] = 0
+            self._active.append(key)
+        queue.append((size, future))
+        self._wakeup.set()
+        await future
+    
+    async def _dispatch(self):
+        """사용자를 돌아가며 할당량만큼 청크를 내보냄 (deficit round robin)"""
+        while True:
+            if not self._active:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            
+            key = self._active[0]
+            queue = self._queues[key]
+            self._deficits[key] += self.quantum
+            while queue:
+                size, future = queue[0]
+                if future.done():
+                    # 연결이 끊겨 취소된 청크
+                    queue.popleft()
+                    continue
+                if size > self._deficits[key]:
+                    break
+                await self._take_tokens(size)
+                queue.popleft()
+                self._deficits[key] -= size
+                if not future.done():
+                    future.set_result(None)
+            
+            self._active.popleft()
+            if queue:
+                self._active.append(key)
+            else:
+                # 보낼 것이 없는 사용자는 남은 할당량을 이월하지 않음
+                del self._queues[key]
+                del self._deficits[key]
+            
+            # 청크를 받은 연결이 다음 청크를 대기열에 넣을 수 있도록 양보 (토큰이 남아 기다리지 않을 때도
+            # 연결이 하나뿐인 사용자가 라운드에서 빠지지 않음)
+            await asyncio.sleep(0)
+    
+    async def _take_tokens(self, size):
+        self._refill()
+        if self._tokens < size:
+            await asyncio.sleep((size - self._tokens) / self.global_rate)
+            self._refill()
+        self._tokens -= size
+    
+    def _refill(self):
+        now = monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self.global_rate)
+        self._updated = now
+
+class ShapedConnection:
+    """다운로드 1건 - 청크를 보내기 전에 acquire(), 끝나면 close()로 전송 속도 기록"""
+    
+    def __init__(self, scheduler, key):
+        self.scheduler = scheduler
+        self.key = key
+        self.sent = 0
+        self._started = monotonic()
+        self._next_at = self._started
+        SHAPED_DOWNLOADS.inc()
+    
+    async def acquire(self, size):
+        """size 바이트를 보내도 될 때까지 기다림 (전체 한도의 사용자 몫, 연결별 한도)"""
+        started = monotonic()
+        scheduler = self.scheduler
+        if scheduler.connection_rate > 0 and self._next_at > started:
+            await asyncio.sleep(self._next_at - started)
+        if scheduler.global_rate > 0:
+            await scheduler.acquire(self.key, size)
+        
+        now = monotonic()
+        if scheduler.connection_rate > 0:
+            self._next_at = max(self._next_at, now) + size / scheduler.connection_rate
+        self.sent += size
+        DOWNLOAD_QUEUE_SECONDS.observe(now - started)
+    
+    def close(self):
+        SHAPED_DOWNLOADS.dec()
+        elapsed = monotonic() - self._started
+        if self.sent and elapsed > 0:
+            DOWNLOAD_THROUGHPUT.observe(self.sent / elapsed, shaped='true')
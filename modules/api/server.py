@@ -0,0 +1,660 @@
+import json
+import time
+import asyncio
+import tempfile
+import ipaddress
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from urllib.parse import quote
+from aiohttp import web
+from config.settings import Config
+from database.models import db
+from modules.api.bandwidth import BandwidthScheduler, DOWNLOAD_THROUGHPUT, SHAPED_CHUNK_SIZE
+from modules.auth.password_hasher import password_hasher, PasswordHasherBusy
+from modules.auth.rate_limiter import rate_limiter, retry_after_seconds
+from modules.auth.session_store import get_session_store
+from modules.auth.token_signer import TokenSigner, revocation_list
+from modules.file_manager.file_manager import FileManager
+from modules.file_manager.recommendations import RecommendationManager
+from modules.file_manager.storage_codec import CODEC_RAW
+from modules.file_manager.zip_stream import iter_zip_stream
+from modules.point_system.point_manager import PointManager, PAYMENT_OK, PAYMENT_INSUFFICIENT, PAYMENT_NOT_FOUND
+from modules.monitoring.metrics import registry, LOGINS_TOTAL, DOWNLOADS_TOTAL, DOWNLOAD_BYTES
+
+API_REQUESTS_TOTAL = registry.counter(
+    'webhard_api_requests_total', 'API 요청 수', ('route', 'status'))
+API_REQUEST_SECONDS = registry.histogram(
+    'webhard_api_request_seconds', 'API 요청 처리 시간 (초)', ('route',))
+
+# 응답에 노출하는 필드
+USER_FIELDS = ('id', 'username', 'email', 'points', 'created_at', 'last_login')
+FILE_FIELDS = ('file_uuid', 'original_name', 'file_size', 'file_type', 'category', 'price',
+               'download_count', 'description', 'uploader_name', 'created_at')
+FILE_SORTS = ('recent', 'trending_day', 'trending_week')
+# 결제 실패 코드별 응답 상태 (그 밖의 실패는 500)
+PAYMENT_STATUS = {PAYMENT_INSUFFICIENT: 402, PAYMENT_NOT_FOUND: 404}
+RELATED_FIELDS = ('file_uuid', 'original_name', 'category', 'price', 'uploader_name', 'score')
+RELATED_FILES_LIMIT = 8
+
+MAX_PAGE_SIZE = 100
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+UPLOAD_SPOOL_SIZE = 8 * 1024 * 1024
+FILE_CACHE_SECONDS = 60
+FILE_CACHE_ENTRIES = 4096
+# 속도 제한을 한 번 거친 다운로드 토큰을 기억할 최대 개수
+CHARGED_TOKEN_ENTRIES = 65536
+
+# 속도 제한 동작 (메서드, 라우트) - 토큰 URL 다운로드는 로그인 없이 받으므로 IP 버킷만 적용
+RATE_LIMITED_ROUTES = {
+    ('GET', '/api/files'): 'list',
+    ('POST', '/api/files'): 'upload',
+    ('POST', '/api/files/bulk-download-token'): 'download',
+    ('POST', '/api/files/{file_uuid}/download'): 'download',
+    ('POST', '/api/files/{file_uuid}/download-token'): 'download',
+    ('GET', '/api/download/{token}'): 'download'
+}
+# 같은 토큰으로 이어받기/탐색하는 Range 요청은 처음 한 번만 셈
+TOKEN_DOWNLOAD_ROUTE = '/api/download/{token}'
+
+# X-Forwarded-For를 믿을 앞단 프록시
+TRUSTED_PROXY_NETWORKS = tuple(ipaddress.ip_network(address, strict=False) for address in Config.TRUSTED_PROXIES)
+
+def _is_trusted_proxy(address):
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXY_NETWORKS)
+
+def _client_ip(request):
+    """요청한 클라이언트 IP (IP별 속도 제한, 토큰 IP 바인딩에 사용)
+    
+    신뢰하는 프록시를 거친 요청이면 X-Forwarded-For를 오른쪽(가까운 쪽)부터 읽어 프록시가 아닌 첫 주소를
+    씁니다. 왼쪽 값은 클라이언트가 마음대로 채울 수 있으므로 신뢰하는 프록시가 덧붙인 값까지만 믿습니다.
+    """
+    remote = request.remote
+    if not TRUSTED_PROXY_NETWORKS or not _is_trusted_proxy(remote):
+        return remote
+    
+    hops = [hop.strip() for header in request.headers.getall('X-Forwarded-For', []) for hop in header.split(',')]
+    hops = [hop for hop in hops if hop]
+    for hop in reversed(hops):
+        if not _is_trusted_proxy(hop):
+            return hop
+    return hops[0] if hops else remote
+
+def _json(data, status=200):
+    return web.json_response(data, status=status, dumps=lambda obj: json.dumps(obj, ensure_ascii=False, default=str))
+
+def _error(message, status):
+    return _json({'error': message}, status)
+
+def _http_error(exc_class, message):
+    """핸들러 밖(헬퍼)에서 raise 할 JSON 오류 응답"""
+    return exc_class(text=json.dumps({'error': message}, ensure_ascii=False), content_type='application/json')
+
+def _byte_range(request, size):
+    """Range 헤더를 (시작, 끝) 바이트 범위로 변환 (헤더가 없으면 None)"""
+    try:
+        requested = request.http_range
+    except ValueError:
+        # 잘못된 Range는 FileResponse처럼 416으로 응답
+        requested = slice(size, None)
+    if requested.start is None and requested.stop is None:
+        return None
+    
+    start = max(0, size + requested.start) if requested.start < 0 else requested.start
+    end = size if requested.stop is None else min(requested.stop, size)
+    if start >= end:
+        raise web.HTTPRequestRangeNotSatisfiable(headers={'Content-Range': f'bytes */{size}'})
+    return start, end
+
+def _iter_file_range(path, start, length, chunk_size=SHAPED_CHUNK_SIZE):
+    """원본 파일의 start부터 length 바이트를 청크 단위로 읽기"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+def _pick(row, fields):
+    return {field: row.get(field) for field in fields}
+
+def _int_param(request, name, default, minimum=0, maximum=None):
+    try:
+        value = int(request.query.get(name, default))
+    except ValueError:
+        raise _http_error(web.HTTPBadRequest, f"{name}은(는) 정수여야 합니다.")
+    value = max(minimum, value)
+    return min(value, maximum) if maximum is not None else value
+
+class SpooledUpload:
+    """multipart 파트를 임시 파일에 받아 UploadedFile처럼 넘겨주는 래퍼"""
+    
+    def __init__(self, name):
+        self.name = name
+        self.size = 0
+        self._file = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_SIZE)
+    
+    def write(self, chunk):
+        self._file.write(chunk)
+        self.size += len(chunk)
+    
+    def rewind(self):
+        self._file.seek(0)
+    
+    def read(self, size=-1):
+        return self._file.read(size)
+    
+    def close(self):
+        self._file.close()
+
+class TimedFileResponse(web.FileResponse):
+    """sendfile 응답 - 본문을 보내는 prepare()에 걸린 시간으로 전송 속도 기록 (핸들러가 반환한 뒤에 보내므로)"""
+    
+    async def prepare(self, request):
+        started = perf_counter()
+        writer = await super().prepare(request)
+        # Range 요청이면 content_length는 보낸 구간 길이 (HEAD는 본문을 보내지 않음)
+        if request.method != 'HEAD' and self.status in (200, 206) and self.content_length:
+            DOWNLOAD_THROUGHPUT.observe(self.content_length / max(perf_counter() - started, 1e-6), shaped='false')
+        return writer
+
+class WebhardAPI:
+    """FileManager/PointManager를 공유하는 aiohttp JSON API"""
+    
+    def __init__(self, workers=None):
+        self.file_manager = FileManager()
+        self.point_manager = PointManager()
+        self.recommendations = RecommendationManager()
+        self.signer = TokenSigner()
+        self.session_store = get_session_store()
+        self.bandwidth = BandwidthScheduler()
+        self._file_cache = {}
+        self._charged_tokens = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers or Config.API_WORKERS,
+                                           thread_name_prefix='webhard-api')
+    
+    async def run(self, func, *args):
+        """블로킹 매니저 호출을 스레드 풀에서 실행"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+    
+    def build_app(self):
+        app = web.Application(middlewares=[self.metrics_middleware, self.auth_middleware,
+                                           self.rate_limit_middleware],
+                              client_max_size=Config.MAX_FILE_SIZE_MB * 1024 * 1024 + 1024 * 1024)
+        app.router.add_get('/api/health', self.health)
+        app.router.add_post('/api/login', self.login)
+        app.router.add_post('/api/session', self.create_session)
+        app.router.add_delete('/api/session', self.delete_session)
+        app.router.add_get('/api/me', self.me)
+        app.router.add_get('/api/files', self.list_files)
+        app.router.add_get('/api/suggest', self.suggest)
+        app.router.add_post('/api/files', self.upload_file)
+        app.router.add_post('/api/files/bulk-download-token', self.bulk_download_token)
+        app.router.add_get('/api/files/{file_uuid}', self.file_detail)
+        app.router.add_post('/api/files/{file_uuid}/download', self.download_file)
+        app.router.add_post('/api/files/{file_uuid}/download-token', self.download_token)
+        app.router.add_get('/api/download/{token}', self.download_by_token)
+        app.router.add_delete('/api/download/{token}', self.revoke_token)
+        app.on_startup.append(self._startup)
+        app.on_cleanup.append(self._shutdown)
+        return app
+    
+    async def _startup(self, app):
+        # 토큰 다운로드 요청이 DB를 기다리지 않도록 폐기 목록을 미리 읽음 (이후 갱신은 백그라운드)
+        await self.run(revocation_list.refresh)
+    
+    async def _shutdown(self, app):
+        await self.bandwidth.close()
+        self.executor.shutdown(wait=False)
+    
+    @web.middleware
+    async def metrics_middleware(self, request, handler):
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else 'unmatched'
+        started = perf_counter()
+        status = 500
+        try:
+            response = await handler(request)
+            status = response.status
+            return response
+        except web.HTTPException as e:
+            status = e.status
+            raise
+        finally:
+            API_REQUEST_SECONDS.observe(perf_counter() - started, route=route)
+            API_REQUESTS_TOTAL.inc(route=route, status=str(status))
+    
+    @web.middleware
+    async def auth_middleware(self, request, handler):
+        """Authorization: Bearer 토큰이 있으면 request['user']에 사용자 정보 저장"""
+        request['user'] = None
+        header = request.headers.get('Authorization', '')
+        if header.startswith('Bearer '):
+            payload = self.signer.verify(header[7:].strip())
+            if payload and payload.get('typ') == 'api':
+                user = await self.run(db.get_user_by_id, payload.get('uid'))
+                if user and user.get('is_active', 1):
+                    request['user'] = user
+        return await handler(request)
+    
+    @web.middleware
+    async def rate_limit_middleware(self, request, handler):
+        """사용자별/IP별 토큰 버킷을 넘은 요청은 429와 Retry-After로 거절"""
+        resource = request.match_info.route.resource
+        action = RATE_LIMITED_ROUTES.get((request.method, resource.canonical if resource else None))
+        if action is None:
+            return await handler(request)
+        
+        # 이미 받기 시작한 토큰의 Range 요청(이어받기, 탐색)은 결제가 끝난 다운로드의 일부이므로 세지 않음
+        jti = self._download_token_id(request) if resource.canonical == TOKEN_DOWNLOAD_ROUTE else None
+        if jti and 'Range' in request.headers and jti in self._charged_tokens:
+            return await handler(request)
+        
+        user = request['user']
+        retry_after = await self.run(rate_limiter.hit, action, user['id'] if user else None, _client_ip(request))
+        if retry_after > 0:
+            seconds = retry_after_seconds(retry_after)
+            response = _json({'error': f"요청이 너무 많습니다. {seconds}초 후에 다시 시도해주세요.",
+                              'retry_after': seconds}, 429)
+            response.headers['Retry-After'] = str(seconds)
+            return response
+        
+        if jti:
+            if len(self._charged_tokens) >= CHARGED_TOKEN_ENTRIES:
+                self._charged_tokens.clear()
+            self._charged_tokens[jti] = True
+        return await handler(request)
+    
+    def _download_token_id(self, request):
+        """토큰 URL의 토큰 ID (서명이 맞지 않거나 만료된 토큰이면 None, 폐기 확인은 핸들러에서)"""
+        payload = self.point_manager.signer.verify(request.match_info['token'])
+        return payload.get('jti') if payload and payload.get('typ') == 'dl' else None
+    
+    def _require_user(self, request):
+        user = request['user']
+        if user is None:
+            raise _http_error(web.HTTPUnauthorized, "로그인이 필요합니다.")
+        return user
+    
+    async def _get_file(self, file_uuid):
+        file = await self.run(self.file_manager.get_file_by_uuid, file_uuid)
+        if not file:
+            raise _http_error(web.HTTPNotFound, "파일을 찾을 수 없습니다.")
+        return file
+    
+    async def health(self, request):
+        return _json({'status': 'ok'})
+    
+    async def login(self, request):
+        """사용자명/비밀번호로 API 토큰 발급"""
+        try:
+            body = await request.json()
+        except ValueError:
+            return _error("JSON 본문이 필요합니다.", 400)
+        
+        username = str(body.get('username') or '')
+        password = str(body.get('password') or '')
+        if not username or not password:
+            return _error("사용자명과 비밀번호를 입력해주세요.", 400)
+        
+        try:
+            user = await self.run(password_hasher.authenticate, username, password)
+        except PasswordHasherBusy as e:
+            LOGINS_TOTAL.inc(result='busy')
+            return _error(str(e), 503)
+        if not user:
+            LOGINS_TOTAL.inc(result='failed')
+            return _error("잘못된 사용자명 또는 비밀번호입니다.", 401)
+        
+        LOGINS_TOTAL.inc(result='ok')
+        ttl = Config.API_TOKEN_TTL_HOURS * 3600
+        token = self.signer.sign({'uid': user['id'], 'typ': 'api'}, ttl_seconds=ttl)
+        return _json({'token': token, 'expires_in': ttl, 'user': _pick(user, USER_FIELDS)})
+    
+    async def create_session(self, request):
+        """Streamlit 로그인 때 받은 1회용 티켓을 HttpOnly 세션 쿠키로 교환"""
+        # JSON 본문만 받아 다른 사이트의 폼 전송으로 세션을 심지 못하게 함
+        if request.content_type != 'application/json':
+            return _error("JSON 본문이 필요합니다.", 400)
+        try:
+            body = await request.json()
+        except ValueError:
+            return _error("JSON 본문이 필요합니다.", 400)
+        
+        ticket = str(body.get('ticket') or '')
+        sid = await self.run(self.session_store.redeem_ticket, ticket) if ticket else None
+        if not sid or not await self.run(self.session_store.get, sid):
+            return _error("만료되었거나 이미 사용한 티켓입니다.", 401)
+        
+        response = web.Response(status=204)
+        response.set_cookie(Config.SESSION_COOKIE_NAME, sid, path='/', httponly=True,
+                            secure=Config.SESSION_COOKIE_SECURE, samesite=Config.SESSION_COOKIE_SAMESITE)
+        return response
+    
+    async def delete_session(self, request):
+        """세션 쿠키의 세션을 폐기하고 쿠키 삭제 (로그아웃)"""
+        sid = request.cookies.get(Config.SESSION_COOKIE_NAME)
+        if sid:
+            await self.run(self.session_store.delete, sid)
+        
+        response = web.Response(status=204)
+        response.del_cookie(Config.SESSION_COOKIE_NAME, path='/', httponly=True,
+                            secure=Config.SESSION_COOKIE_SECURE, samesite=Config.SESSION_COOKIE_SAMESITE)
+        return response
+    
+    async def me(self, request):
+        """현재 사용자 정보와 통계"""
+        user = self._require_user(request)
+        stats = await self.run(self.point_manager.get_user_statistics, user['id'])
+        return _json({'user': _pick(user, USER_FIELDS), 'statistics': stats})
+    
+    async def list_files(self, request):
+        """파일 목록/검색 (?category=&q=&limit=&offset=&sort=recent|trending_day|trending_week)"""
+        category = request.query.get('category', 'all')
+        if category not in Config.CATEGORIES:
+            return _error(f"알 수 없는 카테고리입니다: {category}", 400)
+        
+        sort = request.query.get('sort', 'recent')
+        if sort not in FILE_SORTS:
+            return _error(f"알 수 없는 정렬입니다: {sort}", 400)
+        
+        limit = _int_param(request, 'limit', 20, minimum=1, maximum=MAX_PAGE_SIZE)
+        offset = _int_param(request, 'offset', 0)
+        files, total = await self.run(
+            self.file_manager.get_files_list, category, request.query.get('q', '').strip(), limit, offset, sort)
+        fields = FILE_FIELDS + ('trend_heat',) if sort != 'recent' else FILE_FIELDS
+        return _json({
+            'files': [_pick(file, fields) for file in files],
+            'total': total,
+            'limit': limit,
+            'offset': offset
+        })
+    
+    async def suggest(self, request):
+        """검색어 자동완성 (?q=&category=&limit=) - 메모리 색인 조회라 키 입력마다 호출 가능
+        
+        색인이 오래되면 조회하면서 DB에서 다시 읽으므로 이벤트 루프 밖에서 실행합니다.
+        """
+        category = request.query.get('category', 'all')
+        if category not in Config.CATEGORIES:
+            return _error(f"알 수 없는 카테고리입니다: {category}", 400)
+        
+        limit = _int_param(request, 'limit', Config.SEARCH_SUGGEST_LIMIT, minimum=1, maximum=50)
+        suggestions = await self.run(self.file_manager.suggest_file_names, request.query.get('q', ''), category, limit)
+        return _json({'suggestions': suggestions})
+    
+    async def file_detail(self, request):
+        """파일 메타데이터 (로그인 시 이미 받은 파일인지 포함)"""
+        file = await self._get_file(request.match_info['file_uuid'])
+        data = _pick(file, FILE_FIELDS)
+        
+        data['related'] = [
+            _pick(item, RELATED_FIELDS)
+            for item in await self.run(self.recommendations.get_related_files, file['id'], RELATED_FILES_LIMIT)
+        ]
+        
+        user = request['user']
+        if user is not None:
+            data['downloaded'] = await self.run(self.point_manager.has_downloaded_file, user['id'], file['id'])
+        return _json(data)
+    
+    async def download_file(self, request):
+        """결제 후 파일 내용 스트리밍 (이미 받은 파일은 무료)"""
+        user = self._require_user(request)
+        file = await self._get_file(request.match_info['file_uuid'])
+        
+        if not await self.run(self.file_manager.get_file_path, file['stored_name']):
+            return _error("파일을 찾을 수 없습니다.", 404)
+        
+        code, message, token = await self.run(
+            self.point_manager.purchase_download_token, user['id'], file, _client_ip(request))
+        if code != PAYMENT_OK:
+            return _error(message, PAYMENT_STATUS.get(code, 500))
+        
+        return await self._send_file(request, file, user['id'])
+    
+    async def download_token(self, request):
+        """결제 후 다운로드 토큰과 URL 발급 (토큰 URL은 로그인 없이 받을 수 있음)"""
+        user = self._require_user(request)
+        file = await self._get_file(request.match_info['file_uuid'])
+        
+        code, message, token = await self.run(
+            self.point_manager.purchase_download_token, user['id'], file, _client_ip(request))
+        if code != PAYMENT_OK:
+            return _error(message, PAYMENT_STATUS.get(code, 500))
+        
+        return _json({
+            'message': message,
+            'token': token,
+            'url': f'/api/download/{token}',
+            'expires_in': Config.DOWNLOAD_TOKEN_TTL_MINUTES * 60
+        })
+    
+    async def download_by_token(self, request):
+        """토큰만으로 파일 제공 (권한 확인에 DB를 쓰지 않음, Range 요청 지원)"""
+        payload = self.point_manager.verify_download_token(
+            request.match_info['token'], client_ip=_client_ip(request))
+        if payload is None:
+            return _error("유효하지 않거나 만료된 다운로드 토큰입니다.", 403)
+        
+        owner = payload.get('uid') or _client_ip(request)
+        if len(payload['fid']) > 1:
+            return await self._send_zip(request, payload['fid'], owner)
+        
+        file = await self._get_file_by_id(payload['fid'][0])
+        if file is None:
+            return _error("파일을 찾을 수 없습니다.", 404)
+        return await self._send_file(request, file, owner)
+    
+    async def bulk_download_token(self, request):
+        """여러 파일을 한 번에 결제하고 ZIP 다운로드 토큰 발급 ({"file_uuids": [...]})"""
+        user = self._require_user(request)
+        try:
+            body = await request.json()
+        except ValueError:
+            return _error("JSON 본문이 필요합니다.", 400)
+        
+        file_uuids = list(dict.fromkeys(body.get('file_uuids') or []))
+        if not file_uuids:
+            return _error("file_uuids가 필요합니다.", 400)
+        if len(file_uuids) > Config.BULK_DOWNLOAD_MAX_FILES:
+            return _error(f"한 번에 최대 {Config.BULK_DOWNLOAD_MAX_FILES}개까지 받을 수 있습니다.", 400)
+        
+        files = await self.run(lambda: [self.file_manager.get_file_by_uuid(str(u)) for u in file_uuids])
+        if not all(files):
+            return _error("찾을 수 없는 파일이 포함되어 있습니다.", 404)
+        
+        code, message, token = await self.run(
+            self.point_manager.purchase_bulk_download_token, user['id'], [f['id'] for f in files], _client_ip(request))
+        if code != PAYMENT_OK:
+            return _error(message, PAYMENT_STATUS.get(code, 500))
+        
+        return _json({
+            'message': message,
+            'token': token,
+            'url': f'/api/download/{token}',
+            'expires_in': Config.DOWNLOAD_TOKEN_TTL_MINUTES * 60
+        })
+    
+    async def revoke_token(self, request):
+        """본인이 발급받은 다운로드 토큰 폐기"""
+        user = self._require_user(request)
+        token = request.match_info['token']
+        payload = self.point_manager.signer.verify(token)
+        if not payload or payload.get('uid') != user['id']:
+            return _error("유효하지 않은 토큰입니다.", 403)
+        
+        success, message = await self.run(self.point_manager.revoke_download_token, token)
+        return _json({'message': message}) if success else _error(message, 500)
+    
+    async def _get_file_by_id(self, file_id):
+        """토큰 다운로드용 파일 정보 (FILE_CACHE_SECONDS 동안 메모리에 보관)"""
+        now = time.monotonic()
+        cached = self._file_cache.get(file_id)
+        if cached and cached[0] > now:
+            return cached[1]
+        
+        file = await self.run(self.file_manager.get_file_by_id, file_id)
+        if len(self._file_cache) >= FILE_CACHE_ENTRIES:
+            self._file_cache.clear()
+        self._file_cache[file_id] = (now + FILE_CACHE_SECONDS, file)
+        return file
+    
+    async def _write_chunks(self, response, chunks, connection=None):
+        """동기 청크 이터레이터를 스레드 풀에서 읽어 응답으로 전송 (connection이 있으면 대역폭 조절)"""
+        started = perf_counter()
+        sent = 0
+        try:
+            while True:
+                chunk = await self.run(next, chunks, None)
+                if chunk is None:
+                    break
+                if connection is not None:
+                    await connection.acquire(len(chunk))
+                await response.write(chunk)
+                sent += len(chunk)
+        finally:
+            await self.run(chunks.close)
+            if connection is not None:
+                connection.close()
+            elif sent:
+                DOWNLOAD_THROUGHPUT.observe(sent / max(perf_counter() - started, 1e-6), shaped='false')
+    
+    async def _send_zip(self, request, file_ids, owner):
+        """여러 파일을 ZIP으로 묶어 임시 파일 없이 스트리밍 (합계가 크면 대역폭 조절)"""
+        files = []
+        for file_id in file_ids:
+            file = await self._get_file_by_id(file_id)
+            if file and await self.run(self.file_manager.get_file_path, file['stored_name']):
+                files.append(file)
+        if not files:
+            return _error("파일을 찾을 수 없습니다.", 404)
+        
+        response = web.StreamResponse(headers={
+            'Content-Type': 'application/zip',
+            'Content-Disposition': f"attachment; filename*=UTF-8''{quote(f'{Config.SITE_NAME}_{len(files)}files.zip')}"
+        })
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        
+        if self.bandwidth.shapes(sum(file['file_size'] for file in files)):
+            await self._write_chunks(response, iter_zip_stream(self.file_manager, files, SHAPED_CHUNK_SIZE),
+                                     self.bandwidth.connect(owner))
+        else:
+            await self._write_chunks(response, iter_zip_stream(self.file_manager, files))
+        
+        await response.write_eof()
+        return response
+    
+    async def _send_file(self, request, file, owner):
+        """원본 그대로 저장된 파일은 sendfile/Range로, 압축된 파일은 청크 스트리밍으로 전송
+        
+        BANDWIDTH_SHAPING_MIN_MB 이상인 파일은 owner(사용자) 단위 대역폭 조절을 거쳐 청크로 보냅니다.
+        """
+        disposition = f"attachment; filename*=UTF-8''{quote(file['original_name'])}"
+        shaped = self.bandwidth.shapes(file['file_size'])
+        
+        if (file.get('storage_codec') or CODEC_RAW) == CODEC_RAW:
+            file_path = await self.run(self.file_manager.get_file_path, file['stored_name'])
+            if not file_path:
+                DOWNLOADS_TOTAL.inc(result='missing')
+                return _error("파일을 찾을 수 없습니다.", 404)
+            if shaped:
+                return await self._send_shaped_range(request, file, file_path, disposition, owner)
+            
+            DOWNLOADS_TOTAL.inc(result='ok')
+            DOWNLOAD_BYTES.inc(file['file_size'])
+            return TimedFileResponse(file_path, headers={
+                'Content-Type': 'application/octet-stream',
+                'Content-Disposition': disposition
+            })
+        
+        response = web.StreamResponse(headers={
+            'Content-Type': 'application/octet-stream',
+            'Content-Length': str(file['file_size']),
+            'Content-Disposition': disposition
+        })
+        await response.prepare(request)
+        
+        if shaped:
+            await self._write_chunks(response, self.file_manager.iter_file_chunks(file, SHAPED_CHUNK_SIZE),
+                                     self.bandwidth.connect(owner))
+        else:
+            await self._write_chunks(response, self.file_manager.iter_file_chunks(file))
+        
+        await response.write_eof()
+        return response
+    
+    async def _send_shaped_range(self, request, file, file_path, disposition, owner):
+        """원본 파일을 대역폭 조절을 거쳐 전송 (sendfile 대신 청크로 보내며 Range 요청 지원)"""
+        size = file['file_size']
+        byte_range = _byte_range(request, size)
+        start, end = byte_range or (0, size)
+        headers = {
+            'Content-Type': 'application/octet-stream',
+            'Content-Length': str(end - start),
+            'Content-Disposition': disposition,
+            'Accept-Ranges': 'bytes'
+        }
+        if byte_range:
+            headers['Content-Range'] = f'bytes {start}-{end - 1}/{size}'
+        
+        response = web.StreamResponse(status=206 if byte_range else 200, headers=headers)
+        await response.prepare(request)
+        
+        DOWNLOADS_TOTAL.inc(result='ok')
+        DOWNLOAD_BYTES.inc(end - start)
+        await self._write_chunks(response, _iter_file_range(file_path, start, end - start),
+                                 self.bandwidth.connect(owner))
+        await response.write_eof()
+        return response
+    
+    async def upload_file(self, request):
+        """multipart/form-data의 file 필드 업로드"""
+        user = self._require_user(request)
+        if not request.content_type.startswith('multipart/'):
+            return _error("multipart/form-data 형식으로 file 필드를 보내주세요.", 400)
+        
+        reader = await request.multipart()
+        field = await reader.next()
+        while field is not None and field.name != 'file':
+            field = await reader.next()
+        if field is None or not field.filename:
+            return _error("file 필드가 필요합니다.", 400)
+        
+        if not self.file_manager.is_allowed_file(field.filename):
+            return _error("허용되지 않는 파일 형식입니다.", 400)
+        
+        max_bytes = Config.MAX_FILE_SIZE_MB * 1024 * 1024
+        upload = SpooledUpload(field.filename)
+        try:
+            while True:
+                chunk = await field.read_chunk(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if upload.size + len(chunk) > max_bytes:
+                    return _error(f"파일 크기가 {Config.MAX_FILE_SIZE_MB}MB를 초과합니다.", 413)
+                await self.run(upload.write, chunk)
+            
+            upload.rewind()
+            success, message = await self.run(self.file_manager.save_uploaded_file, upload, user['id'])
+        finally:
+            upload.close()
+        
+        if not success:
+            return _error(message, 400)
+        return _json({'message': message}, 201)
+
+def create_app(workers=None):
+    """aiohttp 애플리케이션 생성"""
+    return WebhardAPI(workers).build_app()
+
+def run_api_server(host=None, port=None, workers=None):
+    """API 서버 실행 (블로킹)"""
+    web.run_app(create_app(workers), host=host or Config.API_HOST, port=port or Config.API_PORT,
+                access_log=None)
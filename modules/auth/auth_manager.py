@@ -1,46 +1,120 @@
+import json
 import streamlit as st
+import streamlit.components.v1 as components
 from datetime import datetime, timedelta
 from database.models import db
 from config.settings import Config
+from modules.monitoring.metrics import LOGINS_TOTAL
+from modules.auth.session_store import get_session_store
+from modules.auth.password_hasher import password_hasher, PasswordHasherBusy
 
 class AuthManager:
     def __init__(self):
         self.session_timeout = timedelta(hours=Config.SESSION_TIMEOUT_HOURS)
+        self.store = get_session_store()
+        self.last_error = None
     
-    def is_authenticated(self):
-        """사용자가 인증되어 있는지 확인"""
-        if 'user' not in st.session_state:
-            return False
+    def _get_sid(self):
+        """현재 브라우저 세션의 세션 ID (새로 연결된 경우 HttpOnly 세션 쿠키에서 읽음)"""
+        sid = st.session_state.get('sid')
+        if sid or st.session_state.get('signed_out'):
+            return sid
         
-        if 'last_activity' not in st.session_state:
+        # 새로고침했거나 다른 레플리카에 연결되면 웹소켓 연결 때 브라우저가 보낸 쿠키로 세션 복원
+        return st.context.cookies.get(Config.SESSION_COOKIE_NAME)
+    
+    def is_authenticated(self):
+        """사용자가 인증되어 있는지 확인 (서버 측 세션 저장소 기준)"""
+        sid = self._get_sid()
+        if not sid:
             return False
         
-        # 세션 타임아웃 확인
-        if datetime.now() - st.session_state.last_activity > self.session_timeout:
+        # 만료되었거나 다른 레플리카에서 로그아웃한 세션
+        session = self.store.get(sid)
+        if session is None:
             self.logout()
             return False
         
-        # 마지막 활동 시간 업데이트
+        # 사용자 정보가 없거나 바뀐 경우 저장소 기준으로 다시 읽음
+        user = st.session_state.get('user')
+        if not user or user['id'] != session['user_id']:
+            user = db.get_user_by_id(session['user_id'])
+            if not user:
+                self.logout()
+                return False
+            st.session_state.user = user
+            st.session_state.sid = sid
+        
+        # 마지막 활동 시간 업데이트 (저장소 만료 연장은 일정 간격으로만 기록됨)
+        self.store.touch(sid)
         st.session_state.last_activity = datetime.now()
         return True
     
     def login(self, username, password):
         """사용자 로그인"""
-        user = db.authenticate_user(username, password)
+        try:
+            # bcrypt 검증은 제한된 작업자 풀에서 실행 (필요하면 해시 비용도 갱신)
+            user = password_hasher.authenticate(username, password)
+        except PasswordHasherBusy as e:
+            self.last_error = str(e)
+            LOGINS_TOTAL.inc(result='busy')
+            return False
         
         if user:
+            sid = self.store.create(user['id'], {'username': user['username']})
+            if not sid:
+                LOGINS_TOTAL.inc(result='error')
+                return False
+            
+            # 로그인할 때마다 새 세션 ID 사용 (이전 세션은 폐기)
+            previous_sid = self._get_sid()
+            if previous_sid:
+                self.store.delete(previous_sid)
+            
             st.session_state.user = user
+            st.session_state.sid = sid
             st.session_state.last_activity = datetime.now()
+            st.session_state.pop('signed_out', None)
+            # Streamlit은 HttpOnly 쿠키를 쓸 수 없어 API 서버에서 티켓을 쿠키로 교환 (sync_session_cookie)
+            st.session_state.session_ticket = self.store.create_ticket(sid)
+            LOGINS_TOTAL.inc(result='ok')
             return True
         
+        LOGINS_TOTAL.inc(result='failed')
         return False
     
     def logout(self):
         """사용자 로그아웃"""
+        sid = self._get_sid()
+        if sid:
+            self.store.delete(sid)
+        
+        if 'sid' in st.session_state:
+            del st.session_state.sid
+        if 'download_payloads' in st.session_state:
+            del st.session_state.download_payloads
         if 'user' in st.session_state:
             del st.session_state.user
         if 'last_activity' in st.session_state:
             del st.session_state.last_activity
+        
+        # 이 연결의 쿠키로 다시 로그인되지 않게 하고 브라우저의 세션 쿠키도 삭제
+        st.session_state.pop('session_ticket', None)
+        st.session_state.signed_out = True
+        st.session_state.clear_session_cookie = True
+    
+    def sync_session_cookie(self):
+        """로그인/로그아웃을 브라우저 세션 쿠키에 반영 (같은 도메인 프록시 뒤의 API 서버 /api/session 호출)"""
+        ticket = st.session_state.pop('session_ticket', None)
+        clear = st.session_state.pop('clear_session_cookie', False)
+        
+        if ticket:
+            request = "{method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify({ticket: %s})}" % json.dumps(ticket)
+        elif clear:
+            request = "{method: 'DELETE'}"
+        else:
+            return
+        components.html(f"<script>fetch('/api/session', {request});</script>", height=0)
     
     def register(self, username, email, password, confirm_password):
         """사용자 회원가입"""
@@ -54,8 +128,14 @@ class AuthManager:
         if len(password) < 6:
             return False, "비밀번호는 6자리 이상이어야 합니다."
         
-        # 사용자 생성
-        user_id = db.create_user(username, email, password)
+        if Config.ADMIN_EMAIL and email.strip().lower() == Config.ADMIN_EMAIL.lower():
+            return False, "사용할 수 없는 이메일입니다."
+        
+        # 사용자 생성 (설정된 비용의 해시는 작업자 풀에서 만들고 DB 쓰기는 풀 밖에서)
+        try:
+            user_id = password_hasher.create_user(username, email, password)
+        except PasswordHasherBusy as e:
+            return False, str(e)
         
         if user_id:
             return True, "회원가입이 완료되었습니다!"
@@ -69,6 +149,11 @@ class AuthManager:
             return db.get_user_by_id(st.session_state.user['id'])
         return None
     
+    def is_admin(self, user=None):
+        """관리자 계정인지 확인 (서버 설정 ADMIN_USER_IDS 기준, 이메일은 가입 시 누구나 정할 수 있어 쓰지 않음)"""
+        user = user or st.session_state.get('user')
+        return bool(user and user['id'] in Config.ADMIN_USER_IDS)
+    
     def update_user_points(self):
         """현재 사용자의 포인트 정보 업데이트"""
         if self.is_authenticated():
@@ -97,7 +182,7 @@ def show_login_page():
                     st.success("로그인 성공!")
                     st.rerun()
                 else:
-                    st.error("잘못된 사용자명 또는 비밀번호입니다.")
+                    st.error(auth.last_error or "잘못된 사용자명 또는 비밀번호입니다.")
     
     with tab2:
         with st.form("register_form"):
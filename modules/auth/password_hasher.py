@@ -0,0 +1,142 @@
+import os
+import time
+import sqlite3
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from config.settings import Config
+from database.models import db
+from modules.monitoring.metrics import PASSWORD_HASH_SECONDS
+
+class PasswordHasherBusy(Exception):
+    """대기열이 가득 차 제한 시간 안에 해시 작업을 시작하지 못함"""
+
+def cost_of(password_hash):
+    """bcrypt 해시 문자열('$2b$12$...')에서 비용(rounds) 추출 (알 수 없으면 None)"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+class PasswordHasher:
+    """bcrypt 해시/검증을 제한된 작업자 풀에서 실행
+    
+    bcrypt는 GIL을 놓고 CPU를 오래 쓰므로, 로그인이 몰려도 동시에 도는 해시 수를
+    workers개로 묶어 나머지 코어가 Streamlit 재실행과 API 요청을 처리하게 합니다.
+    대기 중인 작업이 max_pending을 넘으면 queue_timeout초까지 기다린 뒤 거절합니다.
+    """
+    
+    def __init__(self, rounds=None, workers=None, max_pending=None, queue_timeout=None):
+        self.rounds = rounds or Config.BCRYPT_ROUNDS
+        self.workers = workers or Config.PASSWORD_HASH_WORKERS or max(1, (os.cpu_count() or 2) // 2)
+        self.max_pending = max_pending or Config.PASSWORD_HASH_MAX_PENDING or self.workers * 8
+        self.queue_timeout = Config.PASSWORD_HASH_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+    
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bcrypt')
+            return self._pool
+    
+    def _call(self, operation, func, *args):
+        """작업자 풀에서 func를 실행하고 결과를 기다림"""
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHasherBusy("로그인 요청이 많습니다. 잠시 후 다시 시도해주세요.")
+        
+        try:
+            return self._get_pool().submit(func, *args).result()
+        finally:
+            self._slots.release()
+            PASSWORD_HASH_SECONDS.observe(time.perf_counter() - started, operation=operation)
+    
+    def hash(self, password):
+        """설정된 비용으로 비밀번호 해시 생성"""
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return self._call('hash', bcrypt.hashpw, password.encode('utf-8'), salt).decode('ascii')
+    
+    def verify(self, password, password_hash):
+        """비밀번호가 저장된 해시와 일치하는지 확인"""
+        try:
+            return self._call('verify', bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('ascii'))
+        except ValueError:
+            # 손상되었거나 bcrypt가 아닌 해시
+            return False
+    
+    def needs_rehash(self, password_hash):
+        """저장된 해시의 비용이 현재 설정과 다른지 확인"""
+        return cost_of(password_hash) != self.rounds
+    
+    def authenticate(self, username, password):
+        """사용자 인증 (성공 시 사용자 dict, 실패 시 None)
+        
+        검증에 성공했고 저장된 해시의 비용이 BCRYPT_ROUNDS와 다르면 이번 로그인의
+        평문 비밀번호로 새 해시를 만들어 함께 저장합니다.
+        """
+        conn = db.get_connection()
+        
+        try:
+            user = conn.execute('''
+                SELECT * FROM users WHERE username = ? AND is_active = 1
+            ''', (username,)).fetchone()
+        finally:
+            conn.close()
+        
+        # 검증은 DB 연결을 놓은 뒤 작업자 풀에서 실행
+        if not user or not self.verify(password, user['password_hash']):
+            return None
+        
+        user = dict(user)
+        new_hash = self.hash(password) if self.needs_rehash(user['password_hash']) else None
+        now = datetime.now()
+        
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            if new_hash:
+                # 다른 로그인이 이미 해시를 바꿨다면 덮어쓰지 않음
+                cursor.execute('''
+                    UPDATE users SET last_login = ?, password_hash = ?
+                    WHERE id = ? AND password_hash = ?
+                ''', (now, new_hash, user['id'], user['password_hash']))
+                if cursor.rowcount:
+                    user['password_hash'] = new_hash
+                else:
+                    cursor.execute('UPDATE users SET last_login = ? WHERE id = ?', (now, user['id']))
+            else:
+                cursor.execute('UPDATE users SET last_login = ? WHERE id = ?', (now, user['id']))
+            conn.commit()
+        except sqlite3.OperationalError:
+            # 로그인 자체는 성공, 기록/재해시는 다음 로그인에 다시 시도
+            conn.rollback()
+        finally:
+            conn.close()
+        
+        return user
+    
+    def create_user(self, username, email, password):
+        """BCRYPT_ROUNDS 비용으로 해시한 비밀번호로 사용자 생성 (성공 시 사용자 ID, 중복이면 None)"""
+        password_hash = self.hash(password)
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('''
+                INSERT INTO users (username, email, password_hash, points)
+                VALUES (?, ?, ?, ?)
+            ''', (username, email, password_hash, Config.INITIAL_POINTS))
+            conn.commit()
+            return cursor.lastrowid
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            return None
+        finally:
+            conn.close()
+
+# 프로세스 전역 해시 작업자 풀
+password_hasher = PasswordHasher()
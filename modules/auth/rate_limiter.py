@@ -0,0 +1,170 @@
+import math
+import time
+import sqlite3
+import threading
+from config.settings import Config
+from database.models import db
+from modules.monitoring.metrics import RATE_LIMITED_TOTAL
+
+# 메모리에 둘 최대 버킷 수 (넘으면 비움 - 잠깐 한도가 느슨해질 뿐 DB 상태는 그대로)
+MAX_LOCAL_KEYS = 100000
+
+# 다 찬 버킷 행을 지우는 주기 (초, 다 찬 버킷은 행이 없는 것과 같음)
+CLEANUP_INTERVAL_SECONDS = 600
+
+def parse_rate(spec):
+    """'횟수/초' 형식 한도를 (버킷 크기, 초당 충전량)으로 변환 (빈 값이나 0이면 None = 제한 없음)"""
+    spec = str(spec or '').strip()
+    if not spec:
+        return None
+    count, _, seconds = spec.partition('/')
+    count, seconds = float(count), float(seconds or 1)
+    if count <= 0 or seconds <= 0:
+        return None
+    return count, count / seconds
+
+class RateLimiter:
+    """동작(list/download/upload)별 토큰 버킷 속도 제한 - 사용자별, IP별
+    
+    버킷 크기만큼 몰아서 요청할 수 있고 토큰은 한도 비율로 다시 찹니다. RATE_LIMIT_SHARED이면 버킷은
+    rate_limit_buckets 테이블에 있어 여러 레플리카가 한도를 나눠 쓰고, 각 프로세스는 토큰을 몇 개씩
+    미리 빌려(lease) 메모리에서 하나씩 쓰므로 DB는 빌린 토큰을 다 썼을 때만 읽고 씁니다. 빌린 토큰은
+    다른 레플리카가 쓸 수 없어 요청이 흩어지면 조금 일찍 제한될 수는 있어도 한도를 넘지는 않습니다.
+    빌린 토큰은 빌린 만큼 버킷이 다시 차는 시간(빌린 개수 / 충전 속도)이 지나면 버리므로, 오래 묵힌
+    토큰을 다시 찬 버킷과 함께 몰아 쓰지 못합니다.
+    """
+    _schema_ready = False
+    
+    def __init__(self, limits=None, shared=None, ip_multiplier=None, lease_fraction=None):
+        specs = Config.RATE_LIMITS if limits is None else limits
+        self.limits = {action: parse_rate(spec) for action, spec in specs.items()}
+        self.shared = Config.RATE_LIMIT_SHARED if shared is None else shared
+        self.ip_multiplier = Config.RATE_LIMIT_IP_MULTIPLIER if ip_multiplier is None else ip_multiplier
+        self.lease_fraction = Config.RATE_LIMIT_LEASE_FRACTION if lease_fraction is None else lease_fraction
+        # 키 -> (남은 빌린 토큰 수, 버릴 시각)
+        self._leased = {}
+        self._buckets = {}
+        self._next_cleanup = 0
+        self._lock = threading.Lock()
+    
+    def _ensure_schema(self, conn):
+        if RateLimiter._schema_ready:
+            return
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                full_at REAL NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        conn.commit()
+        RateLimiter._schema_ready = True
+    
+    def hit(self, action, user_id=None, ip=None):
+        """요청 한 번을 기록 - 허용되면 0, 제한되면 다시 시도할 수 있을 때까지 남은 초
+        
+        사용자 버킷과 IP 버킷(한도 x RATE_LIMIT_IP_MULTIPLIER)을 모두 통과해야 하며, IP 버킷에서
+        막히면 사용자 버킷에서 쓴 토큰은 돌려줍니다.
+        """
+        limit = self.limits.get(action)
+        if limit is None:
+            return 0
+        
+        capacity, rate = limit
+        buckets = []
+        if user_id is not None:
+            buckets.append(('user', f'{action}:user:{user_id}', capacity, rate))
+        if ip and self.ip_multiplier > 0:
+            buckets.append(('ip', f'{action}:ip:{ip}', capacity * self.ip_multiplier, rate * self.ip_multiplier))
+        
+        taken = []
+        for scope, key, bucket_capacity, bucket_rate in buckets:
+            retry_after = self._take(key, bucket_capacity, bucket_rate)
+            if retry_after > 0:
+                now = time.time()
+                with self._lock:
+                    for taken_key, taken_rate in taken:
+                        count, expires_at = self._leased.get(taken_key, (0, now + 1 / taken_rate))
+                        self._leased[taken_key] = (count + 1, expires_at)
+                RATE_LIMITED_TOTAL.inc(action=action, scope=scope)
+                return retry_after
+            taken.append((key, bucket_rate))
+        return 0
+    
+    def _take(self, key, capacity, rate):
+        """토큰 하나 사용 - 빌려둔 토큰이 있으면 메모리에서, 없거나 기한이 지났으면 버킷에서 새로 빌림"""
+        now = time.time()
+        with self._lock:
+            count, expires_at = self._leased.get(key, (0, now))
+            if count >= 1 and now < expires_at:
+                self._leased[key] = (count - 1, expires_at)
+                return 0
+        
+        lease_size = max(1, int(capacity * self.lease_fraction)) if self.shared else 1
+        granted, retry_after = (self._lease_shared if self.shared else self._lease_local)(
+            key, capacity, rate, lease_size)
+        if not granted:
+            return retry_after
+        
+        with self._lock:
+            if len(self._leased) >= MAX_LOCAL_KEYS:
+                self._leased.clear()
+            # 남은 토큰은 새로 빌린 토큰으로 바꾸고 기한도 새로 잡음 (기한이 지난 토큰은 버림)
+            self._leased[key] = (granted - 1, time.time() + granted / rate)
+        return 0
+    
+    def _lease_local(self, key, capacity, rate, lease_size):
+        """프로세스 메모리 버킷에서 토큰 빌리기 (RATE_LIMIT_SHARED=false)"""
+        now = time.time()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            granted = min(lease_size, math.floor(tokens))
+            if granted < 1:
+                return 0, (1 - tokens) / rate
+            if len(self._buckets) >= MAX_LOCAL_KEYS:
+                self._buckets.clear()
+            self._buckets[key] = (tokens - granted, now)
+        return granted, 0
+    
+    def _lease_shared(self, key, capacity, rate, lease_size):
+        """rate_limit_buckets 테이블에서 토큰 빌리기 (모든 레플리카가 같은 버킷을 나눠 씀)"""
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            self._ensure_schema(conn)
+            cursor.execute('BEGIN IMMEDIATE')
+            now = time.time()
+            cursor.execute('SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?', (key,))
+            row = cursor.fetchone()
+            tokens = capacity if row is None else min(capacity, row['tokens'] + (now - row['updated_at']) * rate)
+            granted = min(lease_size, math.floor(tokens))
+            if granted < 1:
+                conn.rollback()
+                return 0, (1 - tokens) / rate
+            
+            remaining = tokens - granted
+            cursor.execute('''
+                INSERT INTO rate_limit_buckets (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at,
+                                               full_at = excluded.full_at
+            ''', (key, remaining, now, now + (capacity - remaining) / rate))
+            if now >= self._next_cleanup:
+                self._next_cleanup = now + CLEANUP_INTERVAL_SECONDS
+                cursor.execute('DELETE FROM rate_limit_buckets WHERE full_at < ?', (now,))
+            conn.commit()
+            return granted, 0
+        except sqlite3.Error:
+            # 제한 상태를 읽을 수 없으면 요청을 막지 않음 (속도 제한 때문에 서비스가 멈추지 않도록)
+            conn.rollback()
+            return 1, 0
+        finally:
+            conn.close()
+
+def retry_after_seconds(retry_after):
+    """응답에 쓸 재시도 대기 시간 (올림한 정수 초, 최소 1)"""
+    return max(1, math.ceil(retry_after))
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,351 @@
+import json
+import time
+import sqlite3
+import secrets
+import threading
+from abc import ABC, abstractmethod
+from config.settings import Config
+from database.models import db
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+class SessionStore(ABC):
+    """서버 측 세션 저장소 인터페이스 (세션 = {'sid', 'user_id', 'data', 'expires_at'})"""
+    
+    def __init__(self, ttl_seconds=None):
+        self.ttl_seconds = ttl_seconds or Config.SESSION_TIMEOUT_HOURS * 3600
+    
+    @abstractmethod
+    def create(self, user_id, data=None):
+        """새 세션을 만들고 세션 ID 반환 (실패하면 None)"""
+    
+    @abstractmethod
+    def get(self, sid):
+        """만료되지 않은 세션 반환 (없으면 None)"""
+    
+    @abstractmethod
+    def touch(self, sid):
+        """만료 시각을 지금부터 TTL 뒤로 연장"""
+    
+    @abstractmethod
+    def delete(self, sid):
+        """세션 삭제 (로그아웃) - 성공 여부 반환"""
+    
+    @abstractmethod
+    def create_ticket(self, sid):
+        """세션 쿠키로 바꿀 1회용 티켓 발급 (SESSION_TICKET_SECONDS 동안 유효, 실패하면 None)"""
+    
+    @abstractmethod
+    def redeem_ticket(self, ticket):
+        """티켓을 한 번만 세션 ID로 교환 (만료되었거나 이미 쓴 티켓이면 None)"""
+    
+    @staticmethod
+    def new_sid():
+        return secrets.token_urlsafe(32)
+
+class SQLiteSessionStore(SessionStore):
+    """앱 DB의 sessions 테이블에 저장하는 기본 세션 저장소"""
+    _schema_ready = False
+    
+    def __init__(self, ttl_seconds=None):
+        super().__init__(ttl_seconds)
+        self._ensure_schema()
+    
+    def _ensure_schema(self):
+        """세션 테이블 생성 (프로세스당 1회)"""
+        if SQLiteSessionStore._schema_ready:
+            return
+        
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS sessions (
+                    sid TEXT PRIMARY KEY,
+                    user_id INTEGER NOT NULL,
+                    data TEXT,
+                    expires_at INTEGER NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS session_tickets (
+                    ticket TEXT PRIMARY KEY,
+                    sid TEXT NOT NULL,
+                    expires_at INTEGER NOT NULL
+                )
+            ''')
+            conn.commit()
+            SQLiteSessionStore._schema_ready = True
+        except sqlite3.OperationalError:
+            conn.rollback()
+        finally:
+            conn.close()
+    
+    def create(self, user_id, data=None):
+        sid = self.new_sid()
+        now = int(time.time())
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('''
+                INSERT INTO sessions (sid, user_id, data, expires_at) VALUES (?, ?, ?, ?)
+            ''', (sid, user_id, json.dumps(data or {}, ensure_ascii=False), now + self.ttl_seconds))
+            
+            # 만료된 세션 정리
+            cursor.execute('DELETE FROM sessions WHERE expires_at < ?', (now,))
+            conn.commit()
+            return sid
+        except Exception:
+            conn.rollback()
+            return None
+        finally:
+            conn.close()
+    
+    def get(self, sid):
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT sid, user_id, data, expires_at FROM sessions
+            WHERE sid = ? AND expires_at >= ?
+        ''', (sid, int(time.time())))
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        if not row:
+            return None
+        return {
+            'sid': row['sid'],
+            'user_id': row['user_id'],
+            'data': json.loads(row['data'] or '{}'),
+            'expires_at': row['expires_at']
+        }
+    
+    def touch(self, sid):
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('''
+                UPDATE sessions SET expires_at = ? WHERE sid = ?
+            ''', (int(time.time()) + self.ttl_seconds, sid))
+            conn.commit()
+        except sqlite3.OperationalError:
+            # 잠금 등으로 실패해도 다음 연장 때 다시 시도
+            conn.rollback()
+        finally:
+            conn.close()
+    
+    def delete(self, sid):
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+            conn.commit()
+            return True
+        except sqlite3.Error:
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
+    
+    def create_ticket(self, sid):
+        ticket = self.new_sid()
+        now = int(time.time())
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('''
+                INSERT INTO session_tickets (ticket, sid, expires_at) VALUES (?, ?, ?)
+            ''', (ticket, sid, now + Config.SESSION_TICKET_SECONDS))
+            
+            # 쓰지 않고 만료된 티켓 정리
+            cursor.execute('DELETE FROM session_tickets WHERE expires_at < ?', (now,))
+            conn.commit()
+            return ticket
+        except sqlite3.Error:
+            conn.rollback()
+            return None
+        finally:
+            conn.close()
+    
+    def redeem_ticket(self, ticket):
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('SELECT sid, expires_at FROM session_tickets WHERE ticket = ?', (ticket,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            
+            # 동시에 같은 티켓을 쓰면 삭제에 성공한 쪽만 교환
+            cursor.execute('DELETE FROM session_tickets WHERE ticket = ?', (ticket,))
+            conn.commit()
+            if cursor.rowcount != 1 or row['expires_at'] < time.time():
+                return None
+            return row['sid']
+        except sqlite3.Error:
+            conn.rollback()
+            return None
+        finally:
+            conn.close()
+
+class RedisSessionStore(SessionStore):
+    """Redis(SETEX/EXPIRE) 기반 세션 저장소 (redis 패키지 필요)"""
+    
+    KEY_PREFIX = 'webhard:session:'
+    TICKET_PREFIX = 'webhard:session-ticket:'
+    
+    def __init__(self, ttl_seconds=None, url=None):
+        super().__init__(ttl_seconds)
+        if redis is None:
+            raise RuntimeError("SESSION_BACKEND=redis를 사용하려면 redis 패키지가 필요합니다. (pip install redis)")
+        self.client = redis.Redis.from_url(url or Config.REDIS_URL)
+    
+    def create(self, user_id, data=None):
+        sid = self.new_sid()
+        value = json.dumps({'user_id': user_id, 'data': data or {}}, ensure_ascii=False)
+        self.client.setex(self.KEY_PREFIX + sid, self.ttl_seconds, value)
+        return sid
+    
+    def get(self, sid):
+        pipe = self.client.pipeline()
+        pipe.get(self.KEY_PREFIX + sid)
+        pipe.ttl(self.KEY_PREFIX + sid)
+        value, ttl = pipe.execute()
+        if value is None:
+            return None
+        
+        session = json.loads(value)
+        return {
+            'sid': sid,
+            'user_id': session['user_id'],
+            'data': session.get('data', {}),
+            'expires_at': int(time.time()) + max(ttl, 0)
+        }
+    
+    def touch(self, sid):
+        self.client.expire(self.KEY_PREFIX + sid, self.ttl_seconds)
+    
+    def delete(self, sid):
+        self.client.delete(self.KEY_PREFIX + sid)
+        return True
+    
+    def create_ticket(self, sid):
+        ticket = self.new_sid()
+        self.client.setex(self.TICKET_PREFIX + ticket, Config.SESSION_TICKET_SECONDS, sid)
+        return ticket
+    
+    def redeem_ticket(self, ticket):
+        # GET과 DELETE를 한 트랜잭션으로 실행해 한 번만 교환
+        pipe = self.client.pipeline(transaction=True)
+        pipe.get(self.TICKET_PREFIX + ticket)
+        pipe.delete(self.TICKET_PREFIX + ticket)
+        sid, deleted = pipe.execute()
+        if sid is None or not deleted:
+            return None
+        return sid.decode() if isinstance(sid, bytes) else sid
+
+class CachedSessionStore(SessionStore):
+    """프로세스 내 읽기 캐시를 둔 세션 저장소 래퍼
+    
+    매 재실행마다 저장소를 읽지 않도록 cache_seconds 동안 세션을 메모리에 두고,
+    만료 연장(touch)은 touch_interval마다 한 번만 저장소에 씁니다.
+    다른 레플리카에서 로그아웃한 세션은 최대 cache_seconds 뒤에 반영됩니다.
+    """
+    
+    MAX_ENTRIES = 10000
+    
+    def __init__(self, backend, cache_seconds=None, touch_interval=None):
+        super().__init__(backend.ttl_seconds)
+        self.backend = backend
+        self.cache_seconds = Config.SESSION_CACHE_SECONDS if cache_seconds is None else cache_seconds
+        self.touch_interval = Config.SESSION_TOUCH_INTERVAL_SECONDS if touch_interval is None else touch_interval
+        self._cache = {}
+        self._lock = threading.Lock()
+    
+    def create(self, user_id, data=None):
+        sid = self.backend.create(user_id, data)
+        if sid:
+            self._remember(sid, {
+                'sid': sid,
+                'user_id': user_id,
+                'data': data or {},
+                'expires_at': int(time.time()) + self.ttl_seconds
+            })
+        return sid
+    
+    def _remember(self, sid, session):
+        with self._lock:
+            if len(self._cache) >= self.MAX_ENTRIES:
+                self._cache.clear()
+            self._cache[sid] = (time.monotonic() + self.cache_seconds, session)
+    
+    def get(self, sid):
+        if not sid:
+            return None
+        
+        with self._lock:
+            cached = self._cache.get(sid)
+        if cached and cached[0] > time.monotonic() and cached[1]['expires_at'] >= time.time():
+            return cached[1]
+        
+        session = self.backend.get(sid)
+        if session is None:
+            with self._lock:
+                self._cache.pop(sid, None)
+            return None
+        
+        self._remember(sid, session)
+        return session
+    
+    def touch(self, sid):
+        session = self.get(sid)
+        if session is None:
+            return
+        
+        # 마지막 연장 후 touch_interval이 지났을 때만 저장소에 기록
+        remaining = session['expires_at'] - time.time()
+        if self.ttl_seconds - remaining < self.touch_interval:
+            return
+        
+        self.backend.touch(sid)
+        self._remember(sid, dict(session, expires_at=int(time.time()) + self.ttl_seconds))
+    
+    def delete(self, sid):
+        with self._lock:
+            self._cache.pop(sid, None)
+        return self.backend.delete(sid)
+    
+    def create_ticket(self, sid):
+        return self.backend.create_ticket(sid)
+    
+    def redeem_ticket(self, ticket):
+        return self.backend.redeem_ticket(ticket)
+
+_session_store = None
+_store_lock = threading.Lock()
+
+def get_session_store():
+    """SESSION_BACKEND 설정에 맞는 프로세스 전역 세션 저장소"""
+    global _session_store
+    
+    with _store_lock:
+        if _session_store is None:
+            if Config.SESSION_BACKEND == 'redis':
+                backend = RedisSessionStore()
+            else:
+                backend = SQLiteSessionStore()
+            _session_store = CachedSessionStore(backend)
+        return _session_store
@@ -0,0 +1,170 @@
+import hmac
+import json
+import time
+import base64
+import sqlite3
+import hashlib
+import threading
+from config.settings import Config
+from database.models import db
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+def parse_previous_keys(text):
+    """'kid:secret,kid:secret' 형식의 이전 서명 키 목록 파싱"""
+    keys = {}
+    for part in (text or '').split(','):
+        kid, _, secret = part.strip().partition(':')
+        if kid and secret:
+            keys[kid] = secret
+    return keys
+
+class TokenSigner:
+    """SECRET_KEY 기반 HMAC-SHA256 서명 토큰 (payload.signature 형식)
+    
+    payload의 kid로 서명 키를 고르므로 SECRET_KEY를 바꿔도 SECRET_KEYS_PREVIOUS에
+    남겨 둔 이전 키로 서명된 토큰은 만료 전까지 계속 검증됩니다.
+    """
+    
+    def __init__(self, secret=None, kid=None, previous_keys=None):
+        self.kid = kid or Config.SECRET_KEY_ID
+        self.keys = {self.kid: (secret or Config.SECRET_KEY).encode('utf-8')}
+        
+        if previous_keys is None:
+            previous_keys = parse_previous_keys(Config.SECRET_KEYS_PREVIOUS)
+        for old_kid, old_secret in previous_keys.items():
+            self.keys.setdefault(old_kid, old_secret.encode('utf-8'))
+    
+    def _signature(self, key, body):
+        return _b64encode(hmac.new(key, body.encode('ascii'), hashlib.sha256).digest())
+    
+    def sign(self, payload, ttl_seconds=None):
+        """payload에 키 ID(kid)와 만료 시각(exp)을 넣고 서명한 토큰 반환"""
+        payload = dict(payload, kid=self.kid)
+        if ttl_seconds is not None:
+            payload['exp'] = int(time.time() + ttl_seconds)
+        
+        body = _b64encode(json.dumps(payload, separators=(',', ':'), sort_keys=True).encode('utf-8'))
+        return f'{body}.{self._signature(self.keys[self.kid], body)}'
+    
+    def verify(self, token):
+        """서명과 만료를 확인하고 payload 반환 (유효하지 않으면 None)"""
+        if not token or token.count('.') != 1:
+            return None
+        
+        body, signature = token.split('.')
+        try:
+            payload = json.loads(_b64decode(body))
+            if not isinstance(payload, dict):
+                return None
+            
+            key = self.keys.get(payload.get('kid', self.kid))
+            if key is None:
+                return None
+            if not hmac.compare_digest(signature.encode('ascii'), self._signature(key, body).encode('ascii')):
+                return None
+        except ValueError:
+            return None
+        
+        if 'exp' in payload and payload['exp'] < time.time():
+            return None
+        return payload
+
+class RevocationList:
+    """폐기된 토큰 ID(jti) 목록
+    
+    검증은 메모리 집합만 보고, refresh_seconds가 지나면 백그라운드 스레드가 revoked_tokens 테이블에서
+    다시 읽어 다른 프로세스에서 폐기한 토큰도 반영합니다 (검증하는 쪽은 DB를 기다리지 않음).
+    """
+    _schema_ready = False
+    
+    def __init__(self, refresh_seconds=None):
+        self.refresh_seconds = Config.TOKEN_REVOCATION_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        self._revoked = {}
+        self._loaded_at = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+    
+    def _ensure_schema(self, conn):
+        if RevocationList._schema_ready:
+            return
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS revoked_tokens (
+                jti TEXT PRIMARY KEY,
+                expires_at INTEGER NOT NULL
+            )
+        ''')
+        conn.commit()
+        RevocationList._schema_ready = True
+    
+    def revoke(self, jti, expires_at):
+        """토큰 ID를 만료 시각까지 폐기 목록에 추가"""
+        with self._lock:
+            self._revoked[jti] = expires_at
+        
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            self._ensure_schema(conn)
+            cursor.execute('''
+                INSERT OR REPLACE INTO revoked_tokens (jti, expires_at) VALUES (?, ?)
+            ''', (jti, int(expires_at)))
+            cursor.execute('DELETE FROM revoked_tokens WHERE expires_at < ?', (int(time.time()),))
+            conn.commit()
+            return True
+        except sqlite3.Error:
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
+    
+    def is_revoked(self, jti):
+        """폐기된 토큰 ID인지 확인 (메모리만 확인, 목록이 오래되면 백그라운드에서 다시 읽음)"""
+        if self._loaded_at is None:
+            # 처음 한 번은 목록을 읽고 확인 (API 서버는 시작할 때 미리 읽어둠)
+            self.refresh()
+        elif time.monotonic() - self._loaded_at >= self.refresh_seconds:
+            self._refresh_in_background()
+        return jti in self._revoked
+    
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, name='webhard-revocation-refresh', daemon=True).start()
+    
+    def refresh(self):
+        """revoked_tokens 테이블에서 폐기 목록 다시 읽기"""
+        now = int(time.time())
+        conn = db.get_connection()
+        
+        try:
+            self._ensure_schema(conn)
+            rows = conn.execute('''
+                SELECT jti, expires_at FROM revoked_tokens WHERE expires_at >= ?
+            ''', (now,)).fetchall()
+        except sqlite3.Error:
+            # 잠금 등으로 실패하면 기존 목록을 유지하고 다음 주기에 다시 시도
+            with self._lock:
+                self._loaded_at = time.monotonic()
+                self._refreshing = False
+            return
+        finally:
+            conn.close()
+        
+        # 갱신 중 표시는 _loaded_at과 함께 바꿔야 그 사이 is_revoked가 갱신을 또 시작하지 않음
+        with self._lock:
+            revoked = {jti: expires_at for jti, expires_at in self._revoked.items() if expires_at >= now}
+            revoked.update((row[0], row[1]) for row in rows)
+            self._revoked = revoked
+            self._loaded_at = time.monotonic()
+            self._refreshing = False
+
+# 프로세스 전역 폐기 목록
+revocation_list = RevocationList()
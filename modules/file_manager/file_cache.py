@@ -0,0 +1,118 @@
+import threading
+from collections import OrderedDict
+from config.settings import Config
+from modules.monitoring.metrics import registry
+
+class HotFileCache:
+    """인기 있는 작은 파일의 내용을 메모리에 보관하는 바이트 예산 LRU 캐시
+    
+    한 번만 받아지는 파일이 캐시를 밀어내지 않도록, 최근 접근 횟수가
+    admit_after 이상인 파일만 캐시에 넣습니다 (LFU 입장 필터).
+    """
+    
+    def __init__(self, max_bytes=None, max_item_bytes=None, admit_after=None):
+        if max_bytes is None:
+            max_bytes = Config.HOT_CACHE_MAX_MB * 1024 * 1024
+        if max_item_bytes is None:
+            max_item_bytes = int(Config.HOT_CACHE_MAX_FILE_MB * 1024 * 1024)
+        if admit_after is None:
+            admit_after = Config.HOT_CACHE_ADMIT_AFTER
+        
+        self.max_bytes = max_bytes
+        self.max_item_bytes = min(max_item_bytes, max_bytes)
+        self.admit_after = max(1, admit_after)
+        
+        self._entries = OrderedDict()
+        self._access_counts = OrderedDict()
+        self._max_tracked = 4096
+        self._size = 0
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def is_cacheable(self, size):
+        """캐시에 넣을 수 있는 크기인지 확인"""
+        return self.max_bytes > 0 and size <= self.max_item_bytes
+    
+    def get(self, key):
+        """캐시된 내용 반환 (없으면 None)"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+            
+            self.misses += 1
+            self._record_access(key)
+            return None
+    
+    def put(self, key, data):
+        """입장 조건을 만족하면 캐시에 저장하고 저장 여부 반환"""
+        size = len(data)
+        if not self.is_cacheable(size):
+            return False
+        
+        with self._lock:
+            if key in self._entries:
+                return True
+            
+            if self._access_counts.get(key, 0) < self.admit_after:
+                return False
+            
+            while self._size + size > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+            
+            self._entries[key] = data
+            self._size += size
+            self._access_counts.pop(key, None)
+            return True
+    
+    def invalidate(self, key):
+        """캐시에서 항목 제거 (파일 삭제 시)"""
+        with self._lock:
+            data = self._entries.pop(key, None)
+            if data is not None:
+                self._size -= len(data)
+            self._access_counts.pop(key, None)
+    
+    def clear(self):
+        """캐시 전체 비우기"""
+        with self._lock:
+            self._entries.clear()
+            self._access_counts.clear()
+            self._size = 0
+    
+    def stats(self):
+        """캐시 적중률 등 통계 반환"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / requests if requests else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes
+            }
+    
+    def _record_access(self, key):
+        count = self._access_counts.pop(key, 0) + 1
+        self._access_counts[key] = count
+        
+        # 추적 대상이 너무 많아지면 오래된 것부터 정리
+        while len(self._access_counts) > self._max_tracked:
+            self._access_counts.popitem(last=False)
+
+# 프로세스 전역 캐시 인스턴스
+hot_file_cache = HotFileCache()
+
+registry.gauge('webhard_hot_cache_hit_ratio', '인기 파일 캐시 적중률').set_function(
+    lambda: hot_file_cache.stats()['hit_ratio'])
+registry.gauge('webhard_hot_cache_bytes', '인기 파일 캐시 사용량 (바이트)').set_function(
+    lambda: hot_file_cache.stats()['bytes'])
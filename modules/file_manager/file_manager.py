@@ -1,17 +1,55 @@
 import os
+import time
 import uuid
 import shutil
+import threading
 import mimetypes
 from pathlib import Path
 from datetime import datetime
 import sqlite3
 from config.settings import Config
 from database.models import db
+from modules.file_manager.storage_codec import StorageCodec, CODEC_RAW
+from modules.file_manager.file_cache import hot_file_cache
+from modules.file_manager.search_index import file_name_index
+from modules.file_manager.trending import TrendingManager
+from modules.monitoring.metrics import UPLOADS_TOTAL, UPLOAD_BYTES, DOWNLOADS_TOTAL, DOWNLOAD_BYTES
 
 class FileManager:
+    _schema_ready = False
+    # 같은 목록/검색 결과를 짧은 시간 안에 다시 요청하면 DB 대신 사용 (프로세스당)
+    _list_cache = {}
+    _list_cache_lock = threading.Lock()
+    _LIST_CACHE_MAX_ENTRIES = 256
+    
     def __init__(self):
         self.upload_path = Path(Config.UPLOAD_PATH)
         self.upload_path.mkdir(parents=True, exist_ok=True)
+        self.codec = StorageCodec()
+        self._ensure_schema()
+    
+    def _ensure_schema(self):
+        """파일 테이블에 저장 코덱 컬럼 추가 (프로세스당 1회)"""
+        if FileManager._schema_ready:
+            return
+        
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('PRAGMA table_info(files)')
+            columns = [row['name'] for row in cursor.fetchall()]
+            if 'storage_codec' not in columns:
+                cursor.execute('''
+                    ALTER TABLE files ADD COLUMN storage_codec TEXT DEFAULT 'raw'
+                ''')
+                conn.commit()
+            FileManager._schema_ready = True
+        except sqlite3.OperationalError:
+            # 다른 프로세스가 먼저 컬럼을 추가한 경우
+            conn.rollback()
+        finally:
+            conn.close()
         
     def get_file_category(self, file_extension):
         """파일 확장자로 카테고리 결정"""
@@ -33,10 +71,12 @@ class FileManager:
     def save_uploaded_file(self, uploaded_file, uploader_id):
         """업로드된 파일을 저장하고 데이터베이스에 정보 기록"""
         if not self.is_allowed_file(uploaded_file.name):
+            UPLOADS_TOTAL.inc(result='rejected')
             return False, "허용되지 않는 파일 형식입니다."
         
         file_size_mb = self.get_file_size_mb(uploaded_file.size)
         if file_size_mb > Config.MAX_FILE_SIZE_MB:
+            UPLOADS_TOTAL.inc(result='rejected')
             return False, f"파일 크기가 {Config.MAX_FILE_SIZE_MB}MB를 초과합니다."
         
         try:
@@ -46,9 +86,8 @@ class FileManager:
             stored_name = f"{file_uuid}{file_extension}"
             stored_path = self.upload_path / stored_name
             
-            # 파일 저장
-            with open(stored_path, "wb") as f:
-                f.write(uploaded_file.read())
+            # 파일 저장 (압축 가능한 파일은 압축해서 저장)
+            storage_codec, _ = self.codec.store(uploaded_file, stored_path)
             
             # 파일 카테고리 결정
             category = self.get_file_category(file_extension)
@@ -61,22 +100,32 @@ class FileManager:
                 file_size=uploaded_file.size,
                 file_type=file_extension.lstrip('.'),
                 category=category,
-                uploader_id=uploader_id
+                uploader_id=uploader_id,
+                storage_codec=storage_codec
             )
             
             if file_id:
                 # 업로드 보너스 포인트 지급
                 self._add_upload_bonus_points(uploader_id, file_id)
+                
+                # 자동완성 색인과 목록 캐시에 바로 반영
+                file_name_index.add(file_id, file_uuid, uploaded_file.name, category)
+                self.invalidate_list_cache()
+                UPLOADS_TOTAL.inc(result='ok')
+                UPLOAD_BYTES.inc(uploaded_file.size)
                 return True, f"파일이 성공적으로 업로드되었습니다! (+{Config.UPLOAD_BONUS_POINTS} 포인트)"
             else:
                 # 데이터베이스 저장 실패 시 파일 삭제
                 stored_path.unlink()
+                UPLOADS_TOTAL.inc(result='error')
                 return False, "데이터베이스 오류가 발생했습니다."
                 
         except Exception as e:
+            UPLOADS_TOTAL.inc(result='error')
             return False, f"파일 업로드 중 오류가 발생했습니다: {str(e)}"
     
-    def _save_file_to_db(self, file_uuid, original_name, stored_name, file_size, file_type, category, uploader_id):
+    def _save_file_to_db(self, file_uuid, original_name, stored_name, file_size, file_type, category, uploader_id,
+                         storage_codec=CODEC_RAW):
         """파일 정보를 데이터베이스에 저장"""
         conn = db.get_connection()
         cursor = conn.cursor()
@@ -84,9 +133,10 @@ class FileManager:
         try:
             cursor.execute('''
                 INSERT INTO files (file_uuid, original_name, stored_name, file_size, 
-                                 file_type, category, uploader_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (file_uuid, original_name, stored_name, file_size, file_type, category, uploader_id))
+                                 file_type, category, uploader_id, storage_codec)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (file_uuid, original_name, stored_name, file_size, file_type, category, uploader_id,
+                  storage_codec))
             
             file_id = cursor.lastrowid
             conn.commit()
@@ -120,8 +170,40 @@ class FileManager:
         finally:
             conn.close()
     
-    def get_files_list(self, category='all', search_query='', limit=20, offset=0):
-        """파일 목록 조회"""
+    def invalidate_list_cache(self):
+        """목록/검색 결과 캐시 비우기 (업로드/삭제 시)"""
+        with FileManager._list_cache_lock:
+            FileManager._list_cache.clear()
+    
+    def suggest_file_names(self, prefix, category='all', limit=None):
+        """검색어 자동완성 - 메모리 색인에서 접두어가 일치하는 파일 (DB 조회 없음)"""
+        return file_name_index.suggest(prefix, category, limit)
+    
+    def get_files_list(self, category='all', search_query='', limit=20, offset=0, sort='recent'):
+        """파일 목록 조회 (sort: recent / trending_day / trending_week, FILE_LIST_CACHE_SECONDS 동안 같은 조회는 캐시 사용)"""
+        cache_key = (category, search_query, limit, offset, sort)
+        if Config.FILE_LIST_CACHE_SECONDS > 0:
+            with FileManager._list_cache_lock:
+                cached = FileManager._list_cache.get(cache_key)
+            if cached and cached[0] > time.monotonic():
+                return [dict(file) for file in cached[1]], cached[2]
+        
+        if sort in ('trending_day', 'trending_week'):
+            files, total_count = TrendingManager().get_trending_files(
+                sort[len('trending_'):], category, search_query, limit, offset)
+        else:
+            files, total_count = self._query_files_list(category, search_query, limit, offset)
+        
+        if Config.FILE_LIST_CACHE_SECONDS > 0:
+            with FileManager._list_cache_lock:
+                if len(FileManager._list_cache) >= FileManager._LIST_CACHE_MAX_ENTRIES:
+                    FileManager._list_cache.clear()
+                FileManager._list_cache[cache_key] = (time.monotonic() + Config.FILE_LIST_CACHE_SECONDS,
+                                                      files, total_count)
+        return [dict(file) for file in files], total_count
+    
+    def _query_files_list(self, category, search_query, limit, offset):
+        """파일 목록과 전체 개수를 DB에서 조회"""
         conn = db.get_connection()
         cursor = conn.cursor()
         
@@ -191,11 +273,73 @@ class FileManager:
         
         return dict(file) if file else None
     
+    def get_file_by_id(self, file_id):
+        """ID로 파일 정보 조회"""
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT f.*, u.username as uploader_name
+            FROM files f
+            JOIN users u ON f.uploader_id = u.id
+            WHERE f.id = ? AND f.is_active = 1
+        ''', (file_id,))
+        
+        file = cursor.fetchone()
+        conn.close()
+        
+        return dict(file) if file else None
+    
     def get_file_path(self, stored_name):
         """저장된 파일의 실제 경로 반환"""
         file_path = self.upload_path / stored_name
         return file_path if file_path.exists() else None
     
+    def open_file(self, file_info):
+        """저장된 파일을 원본 내용의 스트림으로 열기 (없으면 None)"""
+        file_path = self.get_file_path(file_info['stored_name'])
+        if not file_path:
+            return None
+        
+        return self.codec.open(file_path, file_info.get('storage_codec') or CODEC_RAW)
+    
+    def iter_file_chunks(self, file_info, chunk_size=1024 * 1024):
+        """저장된 파일을 원본 바이트 청크 단위로 읽기"""
+        file_path = self.get_file_path(file_info['stored_name'])
+        if not file_path:
+            DOWNLOADS_TOTAL.inc(result='missing')
+            return
+        
+        DOWNLOADS_TOTAL.inc(result='ok')
+        for chunk in self.codec.iter_chunks(file_path, file_info.get('storage_codec') or CODEC_RAW, chunk_size):
+            DOWNLOAD_BYTES.inc(len(chunk))
+            yield chunk
+    
+    def read_file(self, file_info):
+        """저장된 파일의 원본 내용 전체 반환 (없으면 None)"""
+        cacheable = hot_file_cache.is_cacheable(file_info['file_size'])
+        if cacheable:
+            data = hot_file_cache.get(file_info['stored_name'])
+            if data is not None:
+                DOWNLOADS_TOTAL.inc(result='ok')
+                DOWNLOAD_BYTES.inc(len(data))
+                return data
+        
+        stream = self.open_file(file_info)
+        if stream is None:
+            DOWNLOADS_TOTAL.inc(result='missing')
+            return None
+        
+        with stream:
+            data = stream.read()
+        
+        if cacheable:
+            hot_file_cache.put(file_info['stored_name'], data)
+        
+        DOWNLOADS_TOTAL.inc(result='ok')
+        DOWNLOAD_BYTES.inc(len(data))
+        return data
+    
     def format_file_size(self, size_bytes):
         """파일 크기를 사람이 읽기 쉬운 형태로 포맷"""
         if size_bytes == 0:
@@ -226,6 +370,8 @@ class FileManager:
             file_path = self.get_file_path(file_info['stored_name'])
             if file_path and file_path.exists():
                 file_path.unlink()
+            hot_file_cache.invalidate(file_info['stored_name'])
+            file_name_index.remove(file_info['id'])
             
             # 데이터베이스에서 비활성화
             conn = db.get_connection()
@@ -234,9 +380,11 @@ class FileManager:
             cursor.execute('''
                 UPDATE files SET is_active = 0 WHERE file_uuid = ?
             ''', (file_uuid,))
+            TrendingManager().remove(cursor, file_info['id'])
             
             conn.commit()
             conn.close()
+            self.invalidate_list_cache()
             
             return True, "파일이 삭제되었습니다."
             
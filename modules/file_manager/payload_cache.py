@@ -0,0 +1,64 @@
+import time
+from collections import OrderedDict
+from config.settings import Config
+
+class SessionPayloadCache:
+    """브라우저 세션 하나에서 준비한 다운로드 내용(바이트 또는 토큰 URL)을 보관하는 LRU 캐시
+    
+    다운로드 모달이 열린 채로 재실행되어도 파일을 다시 읽지 않도록 st.session_state에
+    두고 사용하며, 바이트는 max_bytes 예산 안에서만 보관합니다.
+    """
+    
+    def __init__(self, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = Config.DOWNLOAD_SESSION_CACHE_MB * 1024 * 1024
+        
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+    
+    def get(self, key):
+        """준비된 내용 반환 ({'data': bytes} 또는 {'url': str}, 없거나 만료되면 None)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        if entry.get('expires_at') and entry['expires_at'] < time.time():
+            self.invalidate(key)
+            return None
+        
+        self._entries.move_to_end(key)
+        return entry
+    
+    def put_bytes(self, key, data):
+        """파일 내용을 보관하고 항목 반환 (예산보다 크면 보관하지 않고 항목만 반환)"""
+        self.invalidate(key)
+        entry = {'data': data}
+        if len(data) > self.max_bytes:
+            return entry
+        
+        while self._size + len(data) > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.get('data') or b'')
+        
+        self._entries[key] = entry
+        self._size += len(data)
+        return entry
+    
+    def put_url(self, key, url, expires_at=None):
+        """다운로드 URL을 만료 시각까지 보관"""
+        self.invalidate(key)
+        entry = {'url': url, 'expires_at': expires_at}
+        self._entries[key] = entry
+        return entry
+    
+    def invalidate(self, key):
+        """항목 제거"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.get('data') or b'')
+    
+    def clear(self):
+        """세션 캐시 전체 비우기"""
+        self._entries.clear()
+        self._size = 0
@@ -0,0 +1,313 @@
+import time
+from config.settings import Config
+from database.models import db
+from database.schema import JOB_STATE_TABLE, ensure_schema, read_job_state, write_job_state
+
+# 배치 작업 진행 상태 키 (job_state 테이블)
+WATERMARK_KEY = 'recommendations_watermark'
+
+# 활성 파일의 (사용자, 파일) 쌍 - 같은 파일을 여러 번 받아도 한 번으로 셈
+# (prev_id: 지난 실행 시점의 마지막 내역 id, 그때 받지 않았으면 NULL)
+PAIRS_QUERY = '''
+    SELECT dh.user_id, dh.file_id, MAX(dh.id) as last_id,
+           MAX(CASE WHEN dh.id <= ? THEN dh.id END) as prev_id
+    FROM download_history dh
+    JOIN files f ON f.id = dh.file_id AND f.is_active = 1
+    WHERE dh.id <= ? {condition}
+    GROUP BY dh.user_id, dh.file_id
+'''
+PAIR_COLUMNS = ['user_id', 'file_id', 'last_id', 'prev_id']
+
+class RecommendationManager:
+    """"이 보물을 수확한 이웃들이 함께 가져간 보물" 추천
+    
+    다운로드 내역의 (사용자, 파일) 쌍으로 파일 간 동시 다운로드 행렬을 만들고, 파일마다 코사인 유사도
+    상위 K개만 file_recommendations에 미리 저장합니다. 조회는 (file_id, rank) 기본 키를 읽는 것뿐이고,
+    계산은 build()를 배치로 실행할 때만 합니다 (python recommend_job.py).
+    """
+    _schema_ready = False
+    
+    def __init__(self):
+        self._ensure_schema()
+    
+    def _ensure_schema(self):
+        """추천 테이블과 배치 작업 상태 테이블 생성 (프로세스당 1회)"""
+        ensure_schema(RecommendationManager, self._create_schema)
+    
+    def _create_schema(self, conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS file_recommendations (
+                file_id INTEGER NOT NULL,
+                rank INTEGER NOT NULL,
+                related_file_id INTEGER NOT NULL,
+                score REAL NOT NULL,
+                co_downloads INTEGER NOT NULL,
+                PRIMARY KEY (file_id, rank)
+            ) WITHOUT ROWID
+        ''')
+        # 증분 갱신이 새 내역과 관련된 사용자/파일의 내역만 읽도록
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_download_history_user_file ON download_history (user_id, file_id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_download_history_file_user ON download_history (file_id, user_id)')
+        conn.execute(JOB_STATE_TABLE)
+    
+    def get_related_files(self, file_id, limit=4):
+        """미리 계산된 함께 받은 파일 목록 (삭제된 파일은 제외)"""
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('''
+                SELECT f.id, f.file_uuid, f.original_name, f.category, f.price, f.file_size,
+                       u.username as uploader_name, r.score, r.co_downloads
+                FROM file_recommendations r
+                JOIN files f ON f.id = r.related_file_id AND f.is_active = 1
+                JOIN users u ON f.uploader_id = u.id
+                WHERE r.file_id = ?
+                ORDER BY r.rank
+                LIMIT ?
+            ''', (file_id, limit))
+            return [dict(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+    
+    def build(self, full=False, top_k=None):
+        """동시 다운로드 추천 계산 - 마지막 실행 이후 내역이 바뀐 파일만 (full이면 전체) 다시 계산
+        
+        전체 계산은 download_history 전체를 읽습니다. 증분 갱신은 새 내역이 있는 사용자, 그 사용자의 바뀐 파일을
+        받은 사용자, 다시 계산할 파일을 받은 사용자의 내역과 관련 파일의 받은 사람 수만 읽습니다.
+        반환: {'full': 전체 계산 여부, 'files': 다시 계산한 파일 수, 'rows': 저장한 추천 수, 'watermark': 처리한 마지막 내역 id, 'seconds': 소요 시간}
+        """
+        started = time.perf_counter()
+        top_k = top_k or Config.RECOMMENDATION_TOP_K
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            value = read_job_state(cursor, WATERMARK_KEY)
+            watermark = int(value) if value and not full else 0
+            
+            cursor.execute('SELECT MAX(id) as max_id FROM download_history')
+            max_id = cursor.fetchone()['max_id'] or 0
+            if watermark and max_id <= watermark:
+                return {'full': False, 'files': 0, 'rows': 0, 'watermark': watermark,
+                        'seconds': time.perf_counter() - started}
+            
+            max_items = Config.RECOMMENDATION_MAX_ITEMS_PER_USER
+            if watermark:
+                touched, pairs, popularity = self._read_incremental(cursor, watermark, max_id, max_items)
+            else:
+                touched, pairs, popularity = None, _read_pairs(cursor, watermark, max_id), None
+            
+            recommendations = compute_recommendations(pairs, touched, top_k, Config.RECOMMENDATION_MIN_CO_DOWNLOADS,
+                                                      max_items, popularity)
+            refreshed = pairs['file_id'].unique() if touched is None else touched
+            # 읽는 동안 채운 임시 테이블의 트랜잭션을 닫음
+            conn.commit()
+            
+            # 계산한 파일의 추천만 바꿔 끼움 (조회는 커밋 전까지 이전 추천을 봄)
+            cursor.execute('BEGIN IMMEDIATE')
+            if touched is None:
+                cursor.execute('DELETE FROM file_recommendations')
+            else:
+                cursor.executemany('DELETE FROM file_recommendations WHERE file_id = ?',
+                                   [(int(file_id),) for file_id in refreshed])
+            cursor.executemany('''
+                INSERT INTO file_recommendations (file_id, rank, related_file_id, score, co_downloads)
+                VALUES (?, ?, ?, ?, ?)
+            ''', recommendations.itertuples(index=False, name=None))
+            write_job_state(cursor, WATERMARK_KEY, max_id)
+            conn.commit()
+            
+            return {'full': touched is None, 'files': len(refreshed), 'rows': len(recommendations),
+                    'watermark': max_id, 'seconds': time.perf_counter() - started}
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
+    def _read_incremental(self, cursor, watermark, max_id, max_items):
+        """증분 갱신에 필요한 내역만 읽기 - (다시 계산할 파일, 그 파일을 받은 사용자의 쌍, 관련 파일의 받은 사람 수)"""
+        import numpy as np
+        
+        # 새 내역이 있는 사용자만 쌍이 바뀔 수 있음 (id 범위라 기본 키로 읽음)
+        cursor.execute('''
+            SELECT DISTINCT user_id FROM download_history WHERE id > ? AND id <= ?
+        ''', (watermark, max_id))
+        loaded = _read_pairs(cursor, watermark, max_id, [row[0] for row in cursor.fetchall()])
+        
+        # 바뀐 파일을 받은 이웃 사용자까지 읽어야 find_touched_files가 전체 내역으로 계산한 것과 같음
+        changed_files = {file_id for _, file_id in changed_pairs(loaded, max_items)}
+        if not changed_files:
+            return np.array([], dtype=int), loaded.iloc[0:0], None
+        loaded = _read_more_pairs(cursor, loaded, watermark, max_id, _users_with_files(cursor, changed_files, max_id))
+        touched = find_touched_files(loaded, max_items)
+        
+        # 다시 계산할 파일을 받은 사용자의 내역 전체 (자기 조인의 양쪽)
+        users = _users_with_files(cursor, touched, max_id)
+        loaded = _read_more_pairs(cursor, loaded, watermark, max_id, users)
+        pairs = loaded[loaded['user_id'].isin(users)]
+        
+        related = recent_pairs(pairs, 'last_id', max_items)['file_id'].unique()
+        return touched, pairs, _popularity(cursor, related, max_id, max_items)
+
+def _fill_ids(cursor, table, ids):
+    """id 목록을 임시 테이블에 채움 (IN 목록 변수 개수 제한을 피하려고)"""
+    cursor.execute(f'CREATE TEMP TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY)')
+    cursor.execute(f'DELETE FROM temp.{table}')
+    cursor.executemany(f'INSERT INTO temp.{table} (id) VALUES (?)', ((int(i),) for i in ids))
+
+def _read_pairs(cursor, watermark, max_id, user_ids=None):
+    """(사용자, 파일) 쌍 읽기 (user_ids가 있으면 그 사용자들의 내역만)"""
+    import pandas as pd
+    
+    condition = ''
+    if user_ids is not None:
+        _fill_ids(cursor, 'recommendation_users', user_ids)
+        condition = 'AND dh.user_id IN (SELECT id FROM temp.recommendation_users)'
+    cursor.execute(PAIRS_QUERY.format(condition=condition), (watermark, max_id))
+    return pd.DataFrame([tuple(row) for row in cursor.fetchall()], columns=PAIR_COLUMNS)
+
+def _read_more_pairs(cursor, loaded, watermark, max_id, user_ids):
+    """아직 읽지 않은 사용자의 쌍을 더 읽어 합침"""
+    import pandas as pd
+    
+    missing = set(user_ids) - set(loaded['user_id'])
+    if not missing:
+        return loaded
+    return pd.concat([loaded, _read_pairs(cursor, watermark, max_id, missing)], ignore_index=True)
+
+def _users_with_files(cursor, file_ids, max_id):
+    """파일들을 한 번이라도 받은 사용자 (max_id까지의 내역)"""
+    _fill_ids(cursor, 'recommendation_files', file_ids)
+    cursor.execute('''
+        SELECT DISTINCT user_id FROM download_history
+        WHERE file_id IN (SELECT id FROM temp.recommendation_files) AND id <= ?
+    ''', (max_id,))
+    return {row[0] for row in cursor.fetchall()}
+
+def _popularity(cursor, file_ids, max_id, max_items_per_user=None):
+    """파일별 받은 사람 수 - 전체 쌍으로 compute_recommendations가 세는 값과 같음
+    
+    받은 사용자 수에서, 최근 파일만 남길 때 그 파일이 잘리는 사용자(활성 파일이 max_items_per_user보다 많은
+    사용자)를 뺍니다.
+    """
+    import pandas as pd
+    
+    _fill_ids(cursor, 'recommendation_files', file_ids)
+    cursor.execute('''
+        SELECT dh.file_id, COUNT(DISTINCT dh.user_id) as users
+        FROM download_history dh
+        JOIN files f ON f.id = dh.file_id AND f.is_active = 1
+        WHERE dh.file_id IN (SELECT id FROM temp.recommendation_files) AND dh.id <= ?
+        GROUP BY dh.file_id
+    ''', (max_id,))
+    popularity = pd.Series({row[0]: row[1] for row in cursor.fetchall()}, dtype='int64')
+    if not max_items_per_user:
+        return popularity
+    
+    cursor.execute('''
+        SELECT dh.user_id
+        FROM download_history dh
+        JOIN files f ON f.id = dh.file_id AND f.is_active = 1
+        WHERE dh.id <= ? AND dh.user_id IN (
+            SELECT user_id FROM download_history
+            WHERE file_id IN (SELECT id FROM temp.recommendation_files) AND id <= ?
+        )
+        GROUP BY dh.user_id
+        HAVING COUNT(DISTINCT dh.file_id) > ?
+    ''', (max_id, max_id, max_items_per_user))
+    heavy_users = [row[0] for row in cursor.fetchall()]
+    if heavy_users:
+        heavy = _read_pairs(cursor, 0, max_id, heavy_users)
+        kept = recent_pairs(heavy, 'last_id', max_items_per_user)
+        dropped = heavy.drop(kept.index)
+        dropped = dropped.loc[dropped['file_id'].isin(popularity.index), 'file_id'].value_counts()
+        popularity = popularity.sub(dropped, fill_value=0).astype('int64')
+    return popularity
+
+def recent_pairs(pairs, order_column='last_id', max_items_per_user=None):
+    """사용자별로 order_column 기준 최근 파일만 남긴 쌍
+    
+    다운로드가 아주 많은 사용자는 최근 파일만 사용합니다 (자기 조인 크기가 사용자당 제곱으로 커지므로).
+    """
+    pairs = pairs.sort_values(order_column)
+    if max_items_per_user:
+        pairs = pairs.groupby('user_id', sort=False).tail(max_items_per_user)
+    return pairs
+
+def _pair_set(pairs):
+    return set(zip(pairs['user_id'], pairs['file_id']))
+
+def changed_pairs(pairs, max_items_per_user=None):
+    """지난 실행 시점과 지금, 사용자별 최근 파일로 자른 (사용자, 파일) 쌍 중 달라진 것"""
+    before = recent_pairs(pairs[pairs['prev_id'].notna()], 'prev_id', max_items_per_user)
+    after = recent_pairs(pairs, 'last_id', max_items_per_user)
+    return _pair_set(before) ^ _pair_set(after)
+
+def find_touched_files(pairs, max_items_per_user=None):
+    """지난 실행 이후 추천 행이 바뀔 수 있는 파일 (pairs의 prev_id는 지난 실행 시점의 마지막 내역 id)
+    
+    사용자별 최근 파일만 쓰므로 새 다운로드가 오래된 파일을 밀어내면 그 파일의 받은 사람 수도 바뀝니다.
+    그래서 자른 뒤의 (사용자, 파일) 쌍을 지난 실행 시점과 비교해, 쌍이 바뀐 사용자의 파일(이전과 지금) 전체와
+    받은 사람 수가 바뀐 파일을 지금 함께 받은 파일을 다시 계산합니다. 이 파일들만 다시 계산하면 전체 계산과 같습니다.
+    pairs에는 새 내역이 있는 사용자와 바뀐 파일을 받은 사용자의 내역 전체가 있어야 합니다.
+    """
+    import numpy as np
+    
+    before = recent_pairs(pairs[pairs['prev_id'].notna()], 'prev_id', max_items_per_user)
+    after = recent_pairs(pairs, 'last_id', max_items_per_user)
+    
+    changed = _pair_set(before) ^ _pair_set(after)
+    if not changed:
+        return np.array([], dtype=int)
+    
+    changed_users = {user_id for user_id, _ in changed}
+    changed_files = {file_id for _, file_id in changed}
+    neighbour_users = after.loc[after['file_id'].isin(changed_files), 'user_id']
+    
+    touched = set(before.loc[before['user_id'].isin(changed_users), 'file_id'])
+    touched |= set(after.loc[after['user_id'].isin(changed_users) | after['user_id'].isin(neighbour_users), 'file_id'])
+    return np.array(sorted(touched), dtype=int)
+
+def compute_recommendations(pairs, touched=None, top_k=10, min_co_downloads=1, max_items_per_user=None,
+                            popularity=None):
+    """(사용자, 파일) 쌍에서 파일별 상위 K개 이웃 계산 (touched가 있으면 그 파일들의 행만)
+    
+    popularity(파일별 받은 사람 수)를 주지 않으면 pairs로 셉니다. pairs가 일부 사용자의 내역만 있을 때는 전체 내역
+    기준 값을 넘겨야 합니다.
+    """
+    import numpy as np
+    import pandas as pd
+    
+    columns = ['file_id', 'rank', 'related_file_id', 'score', 'co_downloads']
+    if pairs.empty:
+        return pd.DataFrame(columns=columns)
+    
+    pairs = recent_pairs(pairs, 'last_id', max_items_per_user)
+    if popularity is None:
+        popularity = pairs.groupby('file_id').size()
+    
+    left = pairs if touched is None else pairs[pairs['file_id'].isin(touched)]
+    left = left[['user_id', 'file_id']].rename(columns={'file_id': 'file_a'})
+    right = pairs[['user_id', 'file_id']].rename(columns={'file_id': 'file_b'})
+    
+    # 희소 행렬의 0이 아닌 칸만 (파일 a, 파일 b, 함께 받은 사용자 수)로 만듦
+    co = left.merge(right, on='user_id')
+    co = co[co['file_a'] != co['file_b']]
+    co = co.groupby(['file_a', 'file_b'], sort=False).size().rename('co_downloads').reset_index()
+    co = co[co['co_downloads'] >= min_co_downloads]
+    if co.empty:
+        return pd.DataFrame(columns=columns)
+    
+    # 코사인 유사도: 함께 받은 수 / sqrt(a를 받은 수 * b를 받은 수)
+    co['score'] = co['co_downloads'].to_numpy() / np.sqrt(
+        popularity.reindex(co['file_a']).to_numpy() * popularity.reindex(co['file_b']).to_numpy())
+    
+    co = co.sort_values(['file_a', 'score', 'co_downloads', 'file_b'], ascending=[True, False, False, True])
+    co = co.groupby('file_a', sort=False).head(top_k)
+    co['rank'] = co.groupby('file_a', sort=False).cumcount()
+    
+    result = co.rename(columns={'file_a': 'file_id', 'file_b': 'related_file_id'})[columns]
+    return result.astype({'file_id': int, 'rank': int, 'related_file_id': int, 'score': float,
+                          'co_downloads': int})
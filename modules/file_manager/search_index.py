@@ -0,0 +1,186 @@
+import re
+import time
+import sqlite3
+import threading
+import unicodedata
+from bisect import bisect_left
+from config.settings import Config
+from database.models import db
+
+# 파일명에서 단어를 나누는 구분자 (공백, 밑줄, 하이픈, 점, 괄호 등)
+_WORD_SPLIT = re.compile(r'[\W_]+', re.UNICODE)
+# 파일 하나당 색인하는 최대 단어 수 (긴 파일명이 메모리를 과하게 쓰지 않도록)
+MAX_TOKENS_PER_FILE = 8
+# 접두어별 제안 결과 캐시 크기 (색인이 바뀌면 비움)
+MAX_CACHED_SUGGESTIONS = 4096
+
+def normalize_name(text):
+    """검색용 정규화 (NFKC + 대소문자 무시 + 공백 정리)"""
+    return ' '.join(unicodedata.normalize('NFKC', text or '').casefold().split())
+
+def name_tokens(name):
+    """파일명 전체와 각 단어를 접두어 검색 키로 반환 (확장자 포함 전체 이름이 첫 번째)"""
+    normalized = normalize_name(name)
+    tokens = [normalized] if normalized else []
+    for word in _WORD_SPLIT.split(normalized):
+        if len(word) >= 2 and word not in tokens:
+            tokens.append(word)
+        if len(tokens) >= MAX_TOKENS_PER_FILE:
+            break
+    return tokens
+
+class FileNameIndex:
+    """파일명 접두어 자동완성 색인 (정렬된 키 배열 + bisect)
+    
+    keys/ids는 같은 순서로 정렬된 병렬 배열이라 접두어 범위를 이분 탐색으로 찾고,
+    업로드/삭제는 이분 탐색한 위치에 바로 넣고 뺍니다. 다른 프로세스(API 서버, 다른 레플리카)에서
+    올린 파일은 refresh_seconds마다 id 워터마크 이후만 읽어 추가하고, 삭제는
+    rebuild_seconds마다 전체를 다시 만들 때 반영됩니다.
+    """
+    
+    def __init__(self, refresh_seconds=None, rebuild_seconds=None):
+        self.refresh_seconds = Config.SEARCH_INDEX_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        self.rebuild_seconds = Config.SEARCH_INDEX_REBUILD_SECONDS if rebuild_seconds is None else rebuild_seconds
+        self._keys = []
+        self._ids = []
+        self._files = {}
+        self._watermark = 0
+        self._synced_at = None
+        self._built_at = None
+        self._results = {}
+        self._lock = threading.RLock()
+    
+    def _load(self, cursor, min_id=0):
+        cursor.execute('''
+            SELECT id, file_uuid, original_name, category, download_count
+            FROM files
+            WHERE is_active = 1 AND id > ?
+            ORDER BY id
+        ''', (min_id,))
+        return cursor.fetchall()
+    
+    def rebuild(self):
+        """DB의 활성 파일 전체로 색인을 다시 만듦"""
+        conn = db.get_connection()
+        try:
+            rows = self._load(conn.cursor())
+        except sqlite3.Error:
+            # 잠금 등으로 실패하면 기존 색인을 유지하고 다음 주기에 다시 시도
+            self._synced_at = self._built_at = time.monotonic()
+            return
+        finally:
+            conn.close()
+        
+        entries = []
+        files = {}
+        for row in rows:
+            files[row['id']] = (row['file_uuid'], row['original_name'], row['category'], row['download_count'] or 0)
+            entries.extend((token, row['id']) for token in name_tokens(row['original_name']))
+        entries.sort()
+        
+        with self._lock:
+            self._keys = [token for token, _ in entries]
+            self._ids = [file_id for _, file_id in entries]
+            self._files = files
+            self._watermark = rows[-1]['id'] if rows else 0
+            self._synced_at = self._built_at = time.monotonic()
+            self._results.clear()
+    
+    def _catch_up(self):
+        """워터마크 이후에 다른 프로세스가 올린 파일만 추가"""
+        conn = db.get_connection()
+        try:
+            rows = self._load(conn.cursor(), self._watermark)
+        except sqlite3.Error:
+            rows = []
+        finally:
+            conn.close()
+        
+        for row in rows:
+            self.add(row['id'], row['file_uuid'], row['original_name'], row['category'], row['download_count'] or 0)
+        self._synced_at = time.monotonic()
+    
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._built_at is None or now - self._built_at >= self.rebuild_seconds:
+                self.rebuild()
+            elif now - self._synced_at >= self.refresh_seconds:
+                self._catch_up()
+    
+    def add(self, file_id, file_uuid, name, category, downloads=0):
+        """파일 하나를 색인에 추가 (업로드 직후)"""
+        with self._lock:
+            if file_id in self._files:
+                return
+            self._files[file_id] = (file_uuid, name, category, downloads)
+            for token in name_tokens(name):
+                index = bisect_left(self._keys, token)
+                # 같은 키 안에서도 id 순서를 유지
+                while index < len(self._keys) and self._keys[index] == token and self._ids[index] < file_id:
+                    index += 1
+                self._keys.insert(index, token)
+                self._ids.insert(index, file_id)
+            self._watermark = max(self._watermark, file_id)
+            self._results.clear()
+    
+    def remove(self, file_id):
+        """파일 하나를 색인에서 제거 (삭제 직후)"""
+        with self._lock:
+            info = self._files.pop(file_id, None)
+            if info is None:
+                return
+            self._results.clear()
+            for token in name_tokens(info[1]):
+                index = bisect_left(self._keys, token)
+                while index < len(self._keys) and self._keys[index] == token:
+                    if self._ids[index] == file_id:
+                        del self._keys[index]
+                        del self._ids[index]
+                        break
+                    index += 1
+    
+    def suggest(self, prefix, category='all', limit=None, scan_limit=500):
+        """접두어로 시작하는 파일명(또는 단어)을 가진 파일을 다운로드 수 순으로 반환"""
+        limit = limit or Config.SEARCH_SUGGEST_LIMIT
+        prefix = normalize_name(prefix)
+        if not prefix:
+            return []
+        
+        self._ensure_fresh()
+        cache_key = (prefix, category, limit)
+        with self._lock:
+            cached = self._results.get(cache_key)
+            if cached is not None:
+                return list(cached)
+            
+            start = bisect_left(self._keys, prefix)
+            candidates = {}
+            for index in range(start, min(start + scan_limit, len(self._keys))):
+                if not self._keys[index].startswith(prefix):
+                    break
+                file_id = self._ids[index]
+                info = self._files.get(file_id)
+                if info and (category == 'all' or info[2] == category):
+                    candidates[file_id] = info
+        
+        ranked = sorted(candidates.items(), key=lambda item: (-item[1][3], item[1][1]))
+        suggestions = [
+            {'id': file_id, 'file_uuid': info[0], 'original_name': info[1], 'category': info[2],
+             'download_count': info[3]}
+            for file_id, info in ranked[:limit]
+        ]
+        
+        with self._lock:
+            if len(self._results) >= MAX_CACHED_SUGGESTIONS:
+                self._results.clear()
+            self._results[cache_key] = suggestions
+        return list(suggestions)
+    
+    def stats(self):
+        """색인 크기 통계"""
+        with self._lock:
+            return {'files': len(self._files), 'keys': len(self._keys), 'watermark': self._watermark}
+
+# 프로세스 전역 색인 (첫 검색 때 만들어짐)
+file_name_index = FileNameIndex()
@@ -0,0 +1,126 @@
+import gzip
+import shutil
+
+try:
+    import zstandard
+except ImportError:  # zstd는 선택 의존성 - 없으면 gzip으로 대체
+    zstandard = None
+
+from config.settings import Config
+
+CODEC_RAW = 'raw'
+CODEC_GZIP = 'gzip'
+CODEC_ZSTD = 'zstd'
+
+# 압축 여부 판단에 사용하는 앞부분 크기
+SNIFF_BYTES = 64 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+# 이미 압축된 포맷의 매직 바이트 (오프셋, 시그니처)
+COMPRESSED_SIGNATURES = (
+    (0, b'PK\x03\x04'),             # zip, docx, xlsx
+    (0, b'\x1f\x8b'),               # gzip
+    (0, b'\x28\xb5\x2f\xfd'),       # zstd
+    (0, b'BZh'),                    # bzip2
+    (0, b'\xfd7zXZ\x00'),           # xz
+    (0, b'Rar!\x1a\x07'),           # rar
+    (0, b'7z\xbc\xaf\x27\x1c'),     # 7z
+    (0, b'\xff\xd8\xff'),           # jpg
+    (0, b'\x89PNG\r\n\x1a\n'),      # png
+    (0, b'GIF8'),                   # gif
+    (4, b'ftyp'),                   # mp4, mov
+    (0, b'\x1a\x45\xdf\xa3'),       # mkv
+    (0, b'ID3'),                    # mp3 (ID3 태그)
+    (0, b'fLaC'),                   # flac
+    (0, b'OggS'),                   # ogg
+)
+
+
+class StorageCodec:
+    """업로드 파일을 디스크에 저장할 때 사용하는 압축 코덱"""
+    
+    def __init__(self, codec=None, level=None, min_ratio=None):
+        codec = (codec or Config.STORAGE_COMPRESSION).lower()
+        if codec == CODEC_ZSTD and zstandard is None:
+            codec = CODEC_GZIP
+        if codec not in (CODEC_GZIP, CODEC_ZSTD):
+            codec = CODEC_RAW
+        
+        self.codec = codec
+        self.level = level if level is not None else Config.STORAGE_COMPRESSION_LEVEL
+        self.min_ratio = min_ratio if min_ratio is not None else Config.STORAGE_COMPRESSION_MIN_RATIO
+    
+    def is_precompressed(self, head):
+        """매직 바이트로 이미 압축된 포맷인지 확인"""
+        for offset, signature in COMPRESSED_SIGNATURES:
+            if head[offset:offset + len(signature)] == signature:
+                return True
+        
+        # ID3 태그 없는 mp3 프레임 동기 비트
+        return len(head) >= 2 and head[0] == 0xFF and (head[1] & 0xE0) == 0xE0
+    
+    def choose_codec(self, head):
+        """앞부분 샘플의 압축률을 보고 저장 코덱 결정"""
+        if self.codec == CODEC_RAW or not head or self.is_precompressed(head):
+            return CODEC_RAW
+        
+        compressed = self._compress_sample(head)
+        if len(compressed) / len(head) > self.min_ratio:
+            return CODEC_RAW
+        
+        return self.codec
+    
+    def store(self, source, dest_path):
+        """파일 객체 내용을 dest_path에 저장하고 (코덱, 저장 크기) 반환"""
+        head = source.read(SNIFF_BYTES)
+        codec = self.choose_codec(head)
+        
+        with open(dest_path, 'wb') as out:
+            if codec == CODEC_RAW:
+                out.write(head)
+                shutil.copyfileobj(source, out, CHUNK_SIZE)
+            else:
+                writer = self._open_writer(codec, out)
+                try:
+                    writer.write(head)
+                    shutil.copyfileobj(source, writer, CHUNK_SIZE)
+                finally:
+                    writer.close()
+            
+            stored_size = out.tell()
+        
+        return codec, stored_size
+    
+    def open(self, path, codec=CODEC_RAW):
+        """저장된 파일을 압축 해제 스트림으로 열기"""
+        codec = codec or CODEC_RAW
+        
+        if codec == CODEC_RAW:
+            return open(path, 'rb')
+        if codec == CODEC_GZIP:
+            return gzip.open(path, 'rb')
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("zstd로 저장된 파일을 읽으려면 zstandard 패키지가 필요합니다.")
+            return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        
+        raise ValueError(f"알 수 없는 저장 코덱입니다: {codec}")
+    
+    def iter_chunks(self, path, codec=CODEC_RAW, chunk_size=CHUNK_SIZE):
+        """저장된 파일을 원본 바이트 청크 단위로 읽기"""
+        with self.open(path, codec) as stream:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    
+    def _compress_sample(self, data):
+        if self.codec == CODEC_ZSTD:
+            return zstandard.ZstdCompressor(level=self.level).compress(data)
+        return gzip.compress(data, compresslevel=min(self.level, 9), mtime=0)
+    
+    def _open_writer(self, codec, out):
+        if codec == CODEC_ZSTD:
+            return zstandard.ZstdCompressor(level=self.level).stream_writer(out, closefd=False)
+        return gzip.GzipFile(fileobj=out, mode='wb', compresslevel=min(self.level, 9), mtime=0)
@@ -0,0 +1,191 @@
+import math
+import time
+import sqlite3
+from config.settings import Config
+from database.models import db
+from database.schema import ensure_schema
+
+# 점수 기준 시각 (2024-01-01 00:00 UTC)
+TRENDING_EPOCH = 1704067200
+
+# 인기 목록 기간별 (점수 컬럼, 반감기(시간), 목록에 포함할 최근 다운로드 기간(초))
+TRENDING_WINDOWS = {
+    'day': ('day_score', Config.TRENDING_DAY_HALF_LIFE_HOURS, 24 * 3600),
+    'week': ('week_score', Config.TRENDING_WEEK_HALF_LIFE_HOURS, 7 * 24 * 3600)
+}
+
+def _log_add(a, b):
+    """log(e^a + e^b) (값이 커져도 넘치지 않도록 로그 공간에서 더함)"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    high, low = (a, b) if a >= b else (b, a)
+    return high + math.log1p(math.exp(low - high))
+
+def decay_term(timestamp, half_life_hours):
+    """기준 시각부터 timestamp까지 반감기 단위로 쌓인 로그 가중치"""
+    return (timestamp - TRENDING_EPOCH) * math.log(2) / (half_life_hours * 3600)
+
+def trend_heat(score, window, now=None):
+    """저장된 점수를 현재 시각 기준 감쇠된 다운로드 수로 변환"""
+    if score is None:
+        return 0.0
+    _, half_life, _ = TRENDING_WINDOWS[window]
+    return math.exp(score - decay_term(now or time.time(), half_life))
+
+class TrendingManager:
+    """시간 감쇠 인기 점수 (다운로드 결제 트랜잭션 안에서 증분 갱신)
+    
+    점수는 기준 시각에 고정한 log(Σ 2^((다운로드 시각 - 기준 시각) / 반감기)) 값입니다. 모든 파일이
+    같은 비율로 감쇠하므로 저장된 값의 순서가 곧 현재 시각의 인기 순서이고, 다시 계산할 필요 없이
+    (카테고리, 점수) 인덱스를 따라 일반 목록과 같은 비용으로 한 페이지를 읽습니다.
+    반감기를 바꾸면 rebuild()로 최근 다운로드 내역에서 점수를 다시 만들어야 합니다.
+    """
+    _schema_ready = False
+    
+    def __init__(self):
+        self._ensure_schema()
+    
+    def _ensure_schema(self):
+        """인기 점수 테이블과 인덱스 생성, 처음 만들 때는 최근 다운로드 내역으로 채움 (프로세스당 1회)"""
+        if ensure_schema(TrendingManager, self._create_schema):
+            self.rebuild()
+    
+    def _create_schema(self, conn):
+        """테이블을 이번에 처음 만들었으면 True"""
+        created = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'file_trending'").fetchone() is None
+        
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS file_trending (
+                file_id INTEGER PRIMARY KEY,
+                category TEXT NOT NULL,
+                day_score REAL NOT NULL,
+                week_score REAL NOT NULL,
+                last_download_at INTEGER NOT NULL
+            )
+        ''')
+        for column in ('day_score', 'week_score'):
+            conn.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_file_trending_{column}
+                ON file_trending ({column} DESC)
+            ''')
+            conn.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_file_trending_category_{column}
+                ON file_trending (category, {column} DESC)
+            ''')
+        return created
+    
+    def record_downloads(self, cursor, file_ids, at=None):
+        """결제 트랜잭션의 커서로 다운로드된 파일들의 점수 갱신 (결제와 함께 커밋/롤백됨)"""
+        if not file_ids:
+            return
+        
+        at = int(at or time.time())
+        day_term = decay_term(at, TRENDING_WINDOWS['day'][1])
+        week_term = decay_term(at, TRENDING_WINDOWS['week'][1])
+        
+        cursor.connection.create_function('trending_log_add', 2, _log_add, deterministic=True)
+        cursor.executemany('''
+            INSERT INTO file_trending (file_id, category, day_score, week_score, last_download_at)
+            SELECT id, category, ?, ?, ? FROM files WHERE id = ?
+            ON CONFLICT(file_id) DO UPDATE SET
+                day_score = trending_log_add(day_score, excluded.day_score),
+                week_score = trending_log_add(week_score, excluded.week_score),
+                last_download_at = MAX(last_download_at, excluded.last_download_at)
+        ''', [(day_term, week_term, at, file_id) for file_id in file_ids])
+    
+    def remove(self, cursor, file_id):
+        """삭제된 파일을 인기 목록에서 제거"""
+        cursor.execute('DELETE FROM file_trending WHERE file_id = ?', (file_id,))
+    
+    def rebuild(self):
+        """최근 다운로드 내역으로 점수 전체를 다시 계산 (테이블 생성 직후, 반감기 변경 후)"""
+        longest = max(window for _, _, window in TRENDING_WINDOWS.values())
+        since = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(time.time() - longest))
+        
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('''
+                SELECT dh.file_id, f.category, CAST(strftime('%s', dh.download_at) AS INTEGER) AS downloaded_at
+                FROM download_history dh
+                JOIN files f ON f.id = dh.file_id
+                WHERE dh.download_at >= ? AND f.is_active = 1
+            ''', (since,))
+            
+            scores = {}
+            for row in cursor.fetchall():
+                at = row['downloaded_at']
+                entry = scores.setdefault(row['file_id'], [row['category'], None, None, at])
+                entry[1] = _log_add(entry[1], decay_term(at, TRENDING_WINDOWS['day'][1]))
+                entry[2] = _log_add(entry[2], decay_term(at, TRENDING_WINDOWS['week'][1]))
+                entry[3] = max(entry[3], at)
+            
+            cursor.execute('DELETE FROM file_trending')
+            cursor.executemany('''
+                INSERT INTO file_trending (file_id, category, day_score, week_score, last_download_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(file_id, *entry) for file_id, entry in scores.items()])
+            conn.commit()
+            return len(scores)
+        except sqlite3.Error:
+            conn.rollback()
+            return 0
+        finally:
+            conn.close()
+    
+    def get_trending_files(self, window='day', category='all', search_query='', limit=20, offset=0):
+        """기간 안에 다운로드된 파일을 인기 순으로 조회 (점수 인덱스 순서대로 읽음, 최대 TRENDING_MAX_RESULTS개)"""
+        column, _, window_seconds = TRENDING_WINDOWS[window]
+        since = int(time.time()) - window_seconds
+        
+        where = 't.last_download_at >= ?'
+        params = [since]
+        if category != 'all':
+            where += ' AND t.category = ?'
+            params.append(category)
+        
+        join_filter = 'f.is_active = 1'
+        join_params = []
+        if search_query:
+            join_filter += ' AND f.original_name LIKE ?'
+            join_params.append(f'%{search_query}%')
+        
+        limit = max(0, min(limit, Config.TRENDING_MAX_RESULTS - offset))
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            # CROSS JOIN으로 file_trending을 바깥 루프에 고정해 점수 인덱스 순서대로 읽음
+            cursor.execute(f'''
+                SELECT f.*, u.username as uploader_name, t.{column} as trend_score
+                FROM file_trending t
+                CROSS JOIN files f ON f.id = t.file_id AND {join_filter}
+                JOIN users u ON f.uploader_id = u.id
+                WHERE {where}
+                ORDER BY t.{column} DESC
+                LIMIT ? OFFSET ?
+            ''', join_params + params + [limit, offset])
+            files = [dict(row) for row in cursor.fetchall()]
+            
+            # 전체 개수도 상위 TRENDING_MAX_RESULTS개까지만 셈
+            cursor.execute(f'''
+                SELECT COUNT(*) as total FROM (
+                    SELECT 1 FROM file_trending t
+                    CROSS JOIN files f ON f.id = t.file_id AND {join_filter}
+                    WHERE {where}
+                    LIMIT ?
+                )
+            ''', join_params + params + [Config.TRENDING_MAX_RESULTS])
+            total_count = cursor.fetchone()['total']
+        finally:
+            conn.close()
+        
+        now = time.time()
+        for file in files:
+            file['trend_heat'] = round(trend_heat(file.pop('trend_score'), window, now), 2)
+        return files, total_count
@@ -0,0 +1,74 @@
+import zipfile
+from pathlib import PurePath
+from datetime import datetime
+
+# 영상/이미지/압축 파일은 이미 압축되어 있어 무압축(STORED)으로 묶음
+ZIP_CHUNK_SIZE = 1024 * 1024
+
+class _ChunkSink:
+    """zipfile이 쓰는 바이트를 모아 두었다가 꺼내 주는 비탐색(unseekable) 출력"""
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def unique_arcname(name, used):
+    """ZIP 안에서 겹치지 않는 파일 이름 (같은 이름은 'name (2).ext'로)"""
+    base = PurePath(name).name or 'file'
+    candidate, counter = base, 1
+    while candidate.lower() in used:
+        counter += 1
+        path = PurePath(base)
+        candidate = f'{path.stem} ({counter}){path.suffix}'
+    used.add(candidate.lower())
+    return candidate
+
+def _date_time(value):
+    if isinstance(value, datetime):
+        moment = value
+    else:
+        try:
+            moment = datetime.fromisoformat(str(value)[:19])
+        except ValueError:
+            moment = datetime.now()
+    # ZIP은 1980년 이전 날짜를 표현할 수 없음
+    return max(moment, datetime(1980, 1, 1)).timetuple()[:6]
+
+def iter_zip_stream(file_manager, files, chunk_size=ZIP_CHUNK_SIZE):
+    """파일들을 임시 파일이나 전체 버퍼 없이 ZIP 바이트 청크로 흘려보냄"""
+    sink = _ChunkSink()
+    used = set()
+    
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for file_info in files:
+            info = zipfile.ZipInfo(unique_arcname(file_info['original_name'], used),
+                                   date_time=_date_time(file_info.get('created_at')))
+            info.compress_type = zipfile.ZIP_STORED
+            info.file_size = file_info['file_size']
+            
+            with archive.open(info, 'w', force_zip64=file_info['file_size'] >= zipfile.ZIP64_LIMIT) as entry:
+                for chunk in file_manager.iter_file_chunks(file_info, chunk_size):
+                    entry.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            
+            data = sink.drain()
+            if data:
+                yield data
+    
+    # 중앙 디렉토리
+    data = sink.drain()
+    if data:
+        yield data
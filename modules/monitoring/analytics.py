@@ -0,0 +1,261 @@
+import time
+import threading
+from datetime import datetime, timedelta
+from config.settings import Config
+from database.models import db
+from database.schema import JOB_STATE_TABLE, ensure_schema, read_job_state, write_job_state
+from modules.point_system.history_archive import CUTOFF_KEY as ARCHIVE_CUTOFF_KEY
+
+# 배치 작업 진행 상태 키 (job_state 테이블, 값은 마지막으로 다 집계한 날짜)
+WATERMARK_KEY = 'analytics_last_complete_day'
+
+# 일별 집계 테이블 (모두 날짜가 기본 키의 첫 컬럼이라 기간 조회가 인덱스 범위 검색)
+ROLLUP_TABLES = {
+    'daily_category_stats': '''
+        CREATE TABLE IF NOT EXISTS daily_category_stats (
+            day TEXT NOT NULL,
+            category TEXT NOT NULL,
+            downloads INTEGER NOT NULL DEFAULT 0,
+            downloaders INTEGER NOT NULL DEFAULT 0,
+            points_spent INTEGER NOT NULL DEFAULT 0,
+            uploads INTEGER NOT NULL DEFAULT 0,
+            upload_bytes INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, category)
+        ) WITHOUT ROWID
+    ''',
+    'daily_uploader_stats': '''
+        CREATE TABLE IF NOT EXISTS daily_uploader_stats (
+            day TEXT NOT NULL,
+            uploader_id INTEGER NOT NULL,
+            uploads INTEGER NOT NULL DEFAULT 0,
+            upload_bytes INTEGER NOT NULL DEFAULT 0,
+            downloads INTEGER NOT NULL DEFAULT 0,
+            points_spent INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, uploader_id)
+        ) WITHOUT ROWID
+    ''',
+    'daily_point_stats': '''
+        CREATE TABLE IF NOT EXISTS daily_point_stats (
+            day TEXT NOT NULL,
+            transaction_type TEXT NOT NULL,
+            transactions INTEGER NOT NULL DEFAULT 0,
+            amount INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, transaction_type)
+        ) WITHOUT ROWID
+    '''
+}
+
+# 증분 집계가 새 날짜만 범위로 읽도록 원본 테이블의 시각 컬럼에 인덱스 추가
+SOURCE_INDEXES = (
+    'CREATE INDEX IF NOT EXISTS idx_download_history_download_at ON download_history (download_at)',
+    'CREATE INDEX IF NOT EXISTS idx_point_transactions_created_at ON point_transactions (created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_files_created_at ON files (created_at)'
+)
+
+def _read_frame(cursor, query, params):
+    """쿼리 결과를 DataFrame으로"""
+    import pandas as pd
+    
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    columns = [description[0] for description in cursor.description]
+    return pd.DataFrame([tuple(row) for row in rows], columns=columns)
+
+def _merge_daily(frames, keys, columns):
+    """(날짜, 키)로 묶은 집계들을 합쳐 없는 값은 0으로 채운 평평한 표로 만듦"""
+    import pandas as pd
+    
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=keys + columns)
+    
+    merged = pd.concat(frames, axis=1).fillna(0)
+    merged.index.names = keys
+    merged = merged.reset_index()
+    for column in columns:
+        if column not in merged:
+            merged[column] = 0
+    return merged[keys + columns].astype({column: 'int64' for column in columns})
+
+class AnalyticsManager:
+    """관리자 통계 - 다운로드/결제/업로드 내역을 일별로 집계한 테이블과 그 조회
+    
+    refresh()는 마지막으로 다 집계한 날의 다음 날부터 오늘까지만 원본을 읽어 pandas로 집계하고 그 날짜들의
+    행만 바꿔 끼웁니다 (오늘은 아직 진행 중이라 다음 실행에서 다시 집계). 대시보드는 집계 테이블만
+    읽고 ANALYTICS_CACHE_SECONDS 동안 같은 조회 결과를 재사용합니다.
+    """
+    _schema_ready = False
+    # 대시보드 조회 결과 캐시 (프로세스당, 집계가 갱신되면 비움)
+    _cache = {}
+    _cache_lock = threading.Lock()
+    
+    def __init__(self):
+        self._ensure_schema()
+    
+    def _ensure_schema(self):
+        """집계 테이블, 작업 상태 테이블, 원본 시각 인덱스 생성 (프로세스당 1회)"""
+        ensure_schema(AnalyticsManager, self._create_schema)
+    
+    def _create_schema(self, conn):
+        for statement in ROLLUP_TABLES.values():
+            conn.execute(statement)
+        conn.execute(JOB_STATE_TABLE)
+        for statement in SOURCE_INDEXES:
+            conn.execute(statement)
+    
+    def get_state(self):
+        """마지막으로 다 집계한 날짜와 갱신 시각"""
+        conn = db.get_connection()
+        try:
+            row = conn.execute('SELECT value, updated_at FROM job_state WHERE name = ?', (WATERMARK_KEY,)).fetchone()
+            return {'last_complete_day': row['value'], 'updated_at': row['updated_at']} if row else None
+        finally:
+            conn.close()
+    
+    def refresh(self, full=False):
+        """새 날짜만 (full이면 전체) 일별 집계 - {'days': 다시 집계한 날 수, 'since': 시작 날짜, 'seconds': 소요 시간}"""
+        started = time.perf_counter()
+        today = datetime.utcnow().date()
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            watermark = read_job_state(cursor, WATERMARK_KEY)
+            if watermark and not full:
+                since = (datetime.strptime(watermark, '%Y-%m-%d').date() + timedelta(days=1)).isoformat()
+            else:
+                since = '0000-00-00'
+            
+            # 보관 DB로 옮긴 날짜는 원본에 없으므로 이미 집계된 행을 그대로 둠 (archive_job.py가 먼저 집계함)
+            archive_cutoff = read_job_state(cursor, ARCHIVE_CUTOFF_KEY)
+            if archive_cutoff:
+                since = max(since, archive_cutoff[:10])
+            
+            # 원본은 새 날짜 범위만 읽음 (UTC 기준 'YYYY-MM-DD HH:MM:SS' 문자열이라 날짜 문자열과 바로 비교)
+            downloads = _read_frame(cursor, '''
+                SELECT substr(dh.download_at, 1, 10) as day, dh.user_id, dh.points_spent,
+                       COALESCE(f.category, 'other') as category, f.uploader_id
+                FROM download_history dh
+                JOIN files f ON f.id = dh.file_id
+                WHERE dh.download_at >= ?
+            ''', (since,))
+            uploads = _read_frame(cursor, '''
+                SELECT substr(created_at, 1, 10) as day, COALESCE(category, 'other') as category,
+                       uploader_id, file_size
+                FROM files
+                WHERE created_at >= ?
+            ''', (since,))
+            points = _read_frame(cursor, '''
+                SELECT substr(created_at, 1, 10) as day, transaction_type, amount
+                FROM point_transactions
+                WHERE created_at >= ?
+            ''', (since,))
+            
+            categories = _merge_daily([
+                downloads.groupby(['day', 'category']).agg(
+                    downloads=('user_id', 'size'), downloaders=('user_id', 'nunique'),
+                    points_spent=('points_spent', 'sum')),
+                uploads.groupby(['day', 'category']).agg(
+                    uploads=('file_size', 'size'), upload_bytes=('file_size', 'sum'))
+            ], ['day', 'category'], ['downloads', 'downloaders', 'points_spent', 'uploads', 'upload_bytes'])
+            
+            uploaders = _merge_daily([
+                uploads.groupby(['day', 'uploader_id']).agg(
+                    uploads=('file_size', 'size'), upload_bytes=('file_size', 'sum')),
+                downloads.groupby(['day', 'uploader_id']).agg(
+                    downloads=('user_id', 'size'), points_spent=('points_spent', 'sum'))
+            ], ['day', 'uploader_id'], ['uploads', 'upload_bytes', 'downloads', 'points_spent'])
+            
+            point_stats = _merge_daily([
+                points.groupby(['day', 'transaction_type']).agg(
+                    transactions=('amount', 'size'), amount=('amount', 'sum'))
+            ], ['day', 'transaction_type'], ['transactions', 'amount'])
+            
+            # 새 날짜의 집계 행만 바꿔 끼움
+            cursor.execute('BEGIN IMMEDIATE')
+            for table, frame in (('daily_category_stats', categories), ('daily_uploader_stats', uploaders),
+                                 ('daily_point_stats', point_stats)):
+                cursor.execute(f'DELETE FROM {table} WHERE day >= ?', (since,))
+                if not frame.empty:
+                    columns = ', '.join(frame.columns)
+                    placeholders = ', '.join('?' * len(frame.columns))
+                    cursor.executemany(f'INSERT INTO {table} ({columns}) VALUES ({placeholders})',
+                                       frame.itertuples(index=False, name=None))
+            
+            # 어제까지는 다 집계됨 (오늘은 다음 실행에서 다시 집계)
+            last_complete_day = (today - timedelta(days=1)).isoformat()
+            write_job_state(cursor, WATERMARK_KEY, last_complete_day)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        
+        self.invalidate_cache()
+        days = set(categories['day']) | set(uploaders['day']) | set(point_stats['day'])
+        return {'days': len(days), 'since': since, 'seconds': time.perf_counter() - started}
+    
+    def invalidate_cache(self):
+        """대시보드 조회 캐시 비우기"""
+        with AnalyticsManager._cache_lock:
+            AnalyticsManager._cache.clear()
+    
+    def _cached(self, key, loader):
+        with AnalyticsManager._cache_lock:
+            cached = AnalyticsManager._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        
+        value = loader()
+        with AnalyticsManager._cache_lock:
+            AnalyticsManager._cache[key] = (time.monotonic() + Config.ANALYTICS_CACHE_SECONDS, value)
+        return value
+    
+    def _query(self, query, params=()):
+        conn = db.get_connection()
+        try:
+            return [dict(row) for row in conn.execute(query, params).fetchall()]
+        finally:
+            conn.close()
+    
+    def get_dashboard(self, days=30, top_uploaders=10):
+        """최근 days일 대시보드 데이터 (집계 테이블만 읽음, ANALYTICS_CACHE_SECONDS 동안 캐시)"""
+        since = (datetime.utcnow().date() - timedelta(days=days - 1)).isoformat()
+        
+        def load():
+            return {
+                'since': since,
+                'categories': self._query('''
+                    SELECT day, category, downloads, downloaders, points_spent, uploads, upload_bytes
+                    FROM daily_category_stats
+                    WHERE day >= ?
+                    ORDER BY day
+                ''', (since,)),
+                'points': self._query('''
+                    SELECT day, transaction_type, transactions, amount
+                    FROM daily_point_stats
+                    WHERE day >= ?
+                    ORDER BY day
+                ''', (since,)),
+                'top_uploaders': self._query('''
+                    SELECT s.uploader_id, u.username, SUM(s.downloads) as downloads,
+                           SUM(s.points_spent) as points_spent, SUM(s.uploads) as uploads,
+                           SUM(s.upload_bytes) as upload_bytes
+                    FROM daily_uploader_stats s
+                    LEFT JOIN users u ON u.id = s.uploader_id
+                    WHERE s.day >= ?
+                    GROUP BY s.uploader_id
+                    ORDER BY downloads DESC, uploads DESC
+                    LIMIT ?
+                ''', (since, top_uploaders)),
+                # 저장 용량 증가는 기간 이전까지의 누적이 필요하므로 날짜별 합계 전체 (하루 한 행)
+                'storage': self._query('''
+                    SELECT day, SUM(upload_bytes) as upload_bytes
+                    FROM daily_category_stats
+                    GROUP BY day
+                    ORDER BY day
+                ''')
+            }
+        
+        return self._cached(('dashboard', days, top_uploaders, since), load)
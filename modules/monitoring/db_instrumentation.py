@@ -0,0 +1,200 @@
+import re
+import threading
+from functools import lru_cache
+from time import perf_counter
+from modules.monitoring.metrics import DB_QUERY_SECONDS, DB_QUERY_ERRORS
+
+_TABLE_PATTERNS = (
+    re.compile(r'^INSERT\s+(?:OR\s+\w+\s+)?INTO\s+(\w+)', re.IGNORECASE),
+    re.compile(r'^REPLACE\s+INTO\s+(\w+)', re.IGNORECASE),
+    re.compile(r'^UPDATE\s+(?:OR\s+\w+\s+)?(\w+)', re.IGNORECASE),
+    re.compile(r'^(?:ALTER|DROP)\s+TABLE\s+(?:IF\s+EXISTS\s+)?(\w+)', re.IGNORECASE),
+    re.compile(r'^CREATE\s+(?:UNIQUE\s+)?(?:TABLE|INDEX)\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)', re.IGNORECASE),
+    re.compile(r'^PRAGMA\s+(\w+)', re.IGNORECASE),
+    re.compile(r'\bFROM\s+(\w+)', re.IGNORECASE),
+)
+_AGGREGATE_PATTERN = re.compile(r'^SELECT\s+(COUNT|SUM|MAX|MIN|AVG)\s*\(', re.IGNORECASE)
+
+_observers = []
+_install_lock = threading.Lock()
+_installed = False
+
+@lru_cache(maxsize=2048)
+def statement_name(sql):
+    """SQL 문장을 '동사_테이블' 형태의 이름으로 정규화 (예: select_files, count_download_history)"""
+    text = sql.strip()
+    if not text:
+        return 'unknown'
+    
+    verb = text.split(None, 1)[0].lower()
+    aggregate = _AGGREGATE_PATTERN.match(text)
+    if aggregate:
+        verb = aggregate.group(1).lower()
+    
+    for pattern in _TABLE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return f'{verb}_{match.group(1).lower()}'
+    return verb
+
+def add_query_observer(callback):
+    """쿼리 완료 시 callback(name, sql, params, elapsed, rows, error) 호출"""
+    if callback not in _observers:
+        _observers.append(callback)
+
+def _record(sql, params, elapsed, rows, error=False):
+    name = statement_name(sql)
+    DB_QUERY_SECONDS.observe(elapsed, statement=name)
+    if error:
+        DB_QUERY_ERRORS.inc(statement=name)
+    
+    for callback in _observers:
+        try:
+            callback(name, sql, params, elapsed, rows, error)
+        except Exception:
+            pass
+
+class InstrumentedCursor:
+    """실행 + 결과 조회 시간을 합산해 기록하는 sqlite3 커서 래퍼"""
+    
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._pending = None
+    
+    def _start(self, sql, params, elapsed):
+        self._pending = [sql, params, elapsed, 0, False]
+    
+    def _finish(self):
+        pending = self._pending
+        if pending is None:
+            return
+        self._pending = None
+        
+        sql, params, elapsed, rows, fetched = pending
+        if not fetched:
+            rows = max(self._cursor.rowcount, 0)
+        _record(sql, params, elapsed, rows)
+    
+    def _timed_fetch(self, fetch, *args):
+        started = perf_counter()
+        result = fetch(*args)
+        pending = self._pending
+        if pending is not None:
+            pending[2] += perf_counter() - started
+            pending[4] = True
+        return result
+    
+    def execute(self, sql, params=()):
+        self._finish()
+        started = perf_counter()
+        try:
+            self._cursor.execute(sql, params)
+        except Exception:
+            _record(sql, params, perf_counter() - started, 0, error=True)
+            raise
+        self._start(sql, params, perf_counter() - started)
+        return self
+    
+    def executemany(self, sql, seq_of_params):
+        self._finish()
+        started = perf_counter()
+        try:
+            self._cursor.executemany(sql, seq_of_params)
+        except Exception:
+            _record(sql, None, perf_counter() - started, 0, error=True)
+            raise
+        _record(sql, None, perf_counter() - started, max(self._cursor.rowcount, 0))
+        return self
+    
+    def fetchone(self):
+        row = self._timed_fetch(self._cursor.fetchone)
+        if row is None:
+            self._finish()
+        elif self._pending is not None:
+            self._pending[3] += 1
+        return row
+    
+    def fetchmany(self, size=None):
+        rows = self._timed_fetch(self._cursor.fetchmany, size or self._cursor.arraysize)
+        if self._pending is not None:
+            self._pending[3] += len(rows)
+        if not rows:
+            self._finish()
+        return rows
+    
+    def fetchall(self):
+        rows = self._timed_fetch(self._cursor.fetchall)
+        if self._pending is not None:
+            self._pending[3] += len(rows)
+        self._finish()
+        return rows
+    
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+    
+    def close(self):
+        self._finish()
+        self._cursor.close()
+    
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+class InstrumentedConnection:
+    """모든 쿼리를 InstrumentedCursor로 실행하는 sqlite3 연결 래퍼"""
+    
+    def __init__(self, conn):
+        object.__setattr__(self, '_conn', conn)
+        object.__setattr__(self, '_cursors', [])
+    
+    def cursor(self, *args):
+        cursor = InstrumentedCursor(self._conn.cursor(*args))
+        self._cursors.append(cursor)
+        return cursor
+    
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+    
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+    
+    def close(self):
+        for cursor in self._cursors:
+            cursor._finish()
+        self._cursors.clear()
+        self._conn.close()
+    
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+    
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+def install_db_instrumentation(database=None):
+    """db.get_connection()이 계측된 연결을 돌려주도록 설정 (프로세스당 1회)"""
+    global _installed
+    
+    with _install_lock:
+        if _installed:
+            return
+        
+        if database is None:
+            from database.models import db as database
+        
+        original = database.get_connection
+        
+        def get_connection(*args, **kwargs):
+            return InstrumentedConnection(original(*args, **kwargs))
+        
+        database.get_connection = get_connection
+        _installed = True
@@ -0,0 +1,274 @@
+import bisect
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+from config.settings import Config
+
+# 오버헤드 예산: 관측 1회당 2µs 이하, 계측된 DB 쿼리 1회당 5µs 이하
+# (benchmarks/run_benchmarks.py의 metrics.* 항목으로 확인)
+
+# 초 단위 지연시간 버킷
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+class _Metric:
+    metric_type = 'untyped'
+    
+    def __init__(self, registry, name, help_text, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, labels):
+        if not self.labelnames:
+            return ()
+        return tuple(labels.get(name, '') for name in self.labelnames)
+    
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.metric_type}']
+        lines.extend(self._render_samples())
+        return lines
+    
+    def _render_samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}' for key, value in items]
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+    metric_type = 'counter'
+    
+    def inc(self, amount=1, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    """현재 값을 나타내는 게이지 (콜백으로 렌더링 시점에 계산 가능)"""
+    metric_type = 'gauge'
+    
+    def __init__(self, registry, name, help_text, labelnames=()):
+        super().__init__(registry, name, help_text, labelnames)
+        self._callback = None
+    
+    def set(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[self._key(labels)] = value
+    
+    def inc(self, amount=1, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+    
+    def set_function(self, callback):
+        """렌더링할 때마다 callback()의 값을 사용 (라벨 없는 게이지)"""
+        self._callback = callback
+    
+    def _render_samples(self):
+        if self._callback is not None:
+            try:
+                return [f'{self.name} {_format_value(self._callback())}']
+            except Exception:
+                return []
+        return super()._render_samples()
+
+class Histogram(_Metric):
+    """버킷 기반 분포 (지연시간, 크기 등)"""
+    metric_type = 'histogram'
+    
+    def __init__(self, registry, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(registry, name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+    
+    @contextmanager
+    def time(self, **labels):
+        """with 블록 실행 시간을 초 단위로 기록"""
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - started, **labels)
+    
+    def snapshot(self, **labels):
+        """(버킷별 누적 개수, 합계, 개수) 반환"""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            if state is None:
+                return [0] * (len(self.buckets) + 1), 0.0, 0
+            counts, total, count = state[0][:], state[1], state[2]
+        
+        cumulative, running = [], 0
+        for value in counts:
+            running += value
+            cumulative.append(running)
+        return cumulative, total, count
+    
+    def _render_samples(self):
+        with self._lock:
+            items = [(key, (state[0][:], state[1], state[2])) for key, state in self._values.items()]
+        
+        lines = []
+        for key, (counts, total, count) in items:
+            running = 0
+            for bound, value in zip(self.buckets + (float('inf'),), counts):
+                running += value
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(float(bound))))
+                lines.append(f'{self.name}_bucket{labels} {running}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+class MetricsRegistry:
+    """이름으로 메트릭을 등록/조회하는 레지스트리"""
+    
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._metrics = {}
+        self._lock = threading.Lock()
+    
+    def _get_or_create(self, cls, name, help_text, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(self, name, help_text, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"메트릭 {name}이(가) 다른 타입으로 이미 등록되어 있습니다.")
+            return metric
+    
+    def counter(self, name, help_text, labelnames=()):
+        return self._get_or_create(Counter, name, help_text, labelnames)
+    
+    def gauge(self, name, help_text, labelnames=()):
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+    
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+    
+    def get(self, name):
+        return self._metrics.get(name)
+    
+    def render_prometheus(self):
+        """Prometheus 텍스트 노출 형식으로 렌더링"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+# 프로세스 전역 레지스트리
+registry = MetricsRegistry(enabled=Config.METRICS_ENABLED)
+
+# 공통 메트릭
+DB_QUERY_SECONDS = registry.histogram(
+    'webhard_db_query_seconds', 'SQL 문장별 실행 시간 (초)', ('statement',))
+DB_QUERY_ERRORS = registry.counter(
+    'webhard_db_query_errors_total', 'SQL 문장별 오류 수', ('statement',))
+UPLOADS_TOTAL = registry.counter(
+    'webhard_uploads_total', '업로드 시도 수', ('result',))
+UPLOAD_BYTES = registry.counter(
+    'webhard_upload_bytes_total', '업로드된 바이트 수')
+DOWNLOADS_TOTAL = registry.counter(
+    'webhard_downloads_total', '파일 내용 제공 횟수', ('result',))
+DOWNLOAD_BYTES = registry.counter(
+    'webhard_download_bytes_total', '다운로드로 제공된 바이트 수')
+PAYMENTS_TOTAL = registry.counter(
+    'webhard_download_payments_total', '다운로드 결제 시도 수', ('result',))
+DOWNLOAD_TOKENS_TOTAL = registry.counter(
+    'webhard_download_tokens_total', '다운로드 토큰 발급/검증 결과', ('result',))
+LOGINS_TOTAL = registry.counter(
+    'webhard_logins_total', '로그인 시도 수', ('result',))
+PASSWORD_HASH_SECONDS = registry.histogram(
+    'webhard_password_hash_seconds', 'bcrypt 해시/검증 소요 시간 (대기 포함, 초)', ('operation',))
+RATE_LIMITED_TOTAL = registry.counter(
+    'webhard_rate_limited_total', '속도 제한으로 거절된 요청 수', ('action', 'scope'))
+RERUN_SECONDS = registry.histogram(
+    'webhard_rerun_seconds', 'Streamlit 재실행 1회 소요 시간 (초)', ('page',))
+
+_server = None
+_server_lock = threading.Lock()
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        
+        body = registry.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+def start_metrics_server(port=None, host=None):
+    """/metrics HTTP 서버를 백그라운드 스레드로 시작 (프로세스당 1회)
+    
+    포트가 이미 사용 중이면 (다른 프로세스가 노출 중) None을 반환합니다.
+    """
+    global _server
+    
+    with _server_lock:
+        if _server is not None:
+            return _server
+        
+        try:
+            _server = ThreadingHTTPServer(
+                (host or Config.METRICS_HOST, port if port is not None else Config.METRICS_PORT),
+                _MetricsHandler
+            )
+        except OSError:
+            return None
+        
+        _server.daemon_threads = True
+        thread = threading.Thread(target=_server.serve_forever, name='webhard-metrics', daemon=True)
+        thread.start()
+        return _server
@@ -0,0 +1,133 @@
+import re
+import json
+import pstats
+import cProfile
+import threading
+from io import StringIO
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from time import perf_counter
+from config.settings import Config
+
+INDEX_FILE = 'index.jsonl'
+
+class RerunProfiler:
+    """Streamlit 재실행을 cProfile로 감싸고 느린 재실행만 pstats 파일로 저장"""
+    
+    def __init__(self, enabled=None, threshold_ms=None, profile_dir=None, keep=None):
+        self.enabled = Config.PROFILE_RERUNS if enabled is None else enabled
+        self.threshold_ms = Config.PROFILE_SLOW_RERUN_MS if threshold_ms is None else threshold_ms
+        self.profile_dir = Path(profile_dir or Config.PROFILE_DIR)
+        self.keep = Config.PROFILE_KEEP if keep is None else keep
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def profile(self):
+        """재실행 하나를 프로파일링 (yield한 dict에 page/user_id/query_params 태그를 채움)"""
+        tags = {}
+        if not self.enabled:
+            yield tags
+            return
+        
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # 같은 스레드에서 다른 프로파일러가 이미 동작 중
+            yield tags
+            return
+        
+        started = perf_counter()
+        try:
+            yield tags
+        finally:
+            profiler.disable()
+            elapsed_ms = (perf_counter() - started) * 1000
+            if elapsed_ms >= self.threshold_ms:
+                self._save(profiler, elapsed_ms, tags)
+    
+    def _save(self, profiler, elapsed_ms, tags):
+        now = datetime.now()
+        page = tags.get('page') or 'unknown'
+        slug = re.sub(r'[^0-9A-Za-z가-힣]+', '_', page).strip('_') or 'page'
+        file_name = f"{now.strftime('%Y%m%d_%H%M%S_%f')}_{slug}.pstats"
+        
+        stats = pstats.Stats(profiler, stream=StringIO())
+        entry = {
+            'file': file_name,
+            'created_at': now.isoformat(timespec='seconds'),
+            'elapsed_ms': round(elapsed_ms, 1),
+            'page': page,
+            'user_id': tags.get('user_id'),
+            'query_params': tags.get('query_params') or {},
+            'top_functions': self._top_functions(stats)
+        }
+        
+        with self._lock:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            stats.dump_stats(str(self.profile_dir / file_name))
+            with open(self.profile_dir / INDEX_FILE, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._prune()
+    
+    def _top_functions(self, stats, limit=10):
+        """누적 시간 기준 상위 함수 목록"""
+        rows = []
+        for (file_name, line, func), (_, calls, total, cumulative, _) in stats.stats.items():
+            rows.append({
+                'function': f"{Path(file_name).name}:{line}({func})",
+                'calls': calls,
+                'total_ms': round(total * 1000, 2),
+                'cumulative_ms': round(cumulative * 1000, 2)
+            })
+        rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+        return rows[:limit]
+    
+    def _prune(self):
+        """오래된 프로파일을 keep개만 남기고 삭제"""
+        entries = self._read_index()
+        if len(entries) <= self.keep:
+            return
+        
+        removed, kept = entries[:-self.keep], entries[-self.keep:]
+        for entry in removed:
+            (self.profile_dir / entry['file']).unlink(missing_ok=True)
+        
+        with open(self.profile_dir / INDEX_FILE, 'w', encoding='utf-8') as f:
+            for entry in kept:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    
+    def _read_index(self):
+        index_path = self.profile_dir / INDEX_FILE
+        if not index_path.exists():
+            return []
+        
+        entries = []
+        with open(index_path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        return entries
+    
+    def list_slow_reruns(self, limit=20, recent=None):
+        """최근 저장된 느린 재실행 중 오래 걸린 순으로 반환"""
+        with self._lock:
+            entries = self._read_index()
+        
+        if recent:
+            entries = entries[-recent:]
+        entries.sort(key=lambda entry: entry['elapsed_ms'], reverse=True)
+        return entries[:limit]
+    
+    def get_profile_path(self, file_name):
+        """저장된 pstats 파일 경로 (없으면 None)"""
+        path = self.profile_dir / Path(file_name).name
+        return path if path.exists() else None
+
+# 프로세스 전역 프로파일러
+rerun_profiler = RerunProfiler()
@@ -0,0 +1,207 @@
+import re
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import datetime
+from config.settings import Config
+from modules.monitoring.metrics import registry
+from modules.monitoring.db_instrumentation import add_query_observer, install_db_instrumentation
+
+# 전체 스캔을 경고할 큰 테이블
+WATCHED_TABLES = ('files', 'download_history', 'point_transactions')
+
+# 실행 계획을 뽑을 수 있는 문장
+_EXPLAINABLE = ('select', 'insert', 'update', 'delete', 'replace', 'with')
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+_FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?!.*\bUSING (?:COVERING )?INDEX\b)')
+_TABLE_ALIAS = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+_NOT_ALIAS = {'where', 'join', 'left', 'right', 'inner', 'outer', 'cross', 'on', 'using',
+              'group', 'order', 'limit', 'union', 'natural', 'set', 'values'}
+
+SLOW_QUERIES_TOTAL = registry.counter(
+    'webhard_slow_queries_total', '임계값을 넘은 SQL 문장 수', ('statement',))
+
+def normalize_sql(sql):
+    """리터럴을 ?로 바꾸고 공백을 정리해 같은 모양의 쿼리를 하나로 묶음"""
+    text = _STRING_LITERAL.sub('?', sql)
+    text = _NUMBER_LITERAL.sub('?', text)
+    text = _WHITESPACE.sub(' ', text).strip()
+    return _IN_LIST.sub('IN (...)', text)
+
+def params_shape(params):
+    """파라미터 값 대신 타입만 남긴 요약 (예: 'int,str,int')"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return ','.join(f'{key}:{type(value).__name__}' for key, value in params.items())
+    return ','.join(type(value).__name__ for value in params)
+
+def table_aliases(sql):
+    """FROM/JOIN 절의 별칭 → 테이블 이름 매핑 (실행 계획은 별칭으로 표시됨)"""
+    aliases = {}
+    for table, alias in _TABLE_ALIAS.findall(sql):
+        aliases[table] = table
+        if alias and alias.lower() not in _NOT_ALIAS:
+            aliases[alias] = table
+    return aliases
+
+def find_full_scans(plan, sql='', tables=WATCHED_TABLES):
+    """실행 계획에서 인덱스 없이 전체 스캔하는 감시 대상 테이블 목록"""
+    aliases = table_aliases(sql)
+    scans = []
+    for detail in plan or ():
+        match = _FULL_SCAN.match(detail)
+        if not match:
+            continue
+        table = aliases.get(match.group(1), match.group(1))
+        if table in tables and table not in scans:
+            scans.append(table)
+    return scans
+
+def explain_query_plan(db_path, sql, params=()):
+    """계측되지 않은 읽기 전용 연결로 EXPLAIN QUERY PLAN 실행 (실패 시 None)"""
+    try:
+        conn = sqlite3.connect(f'file:{Path(db_path).resolve()}?mode=ro', uri=True, timeout=0.5)
+    except sqlite3.Error:
+        return None
+    
+    try:
+        rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}', params or ()).fetchall()
+        return [row[3] for row in rows]
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+
+class SlowQueryLog:
+    """임계값을 넘은 쿼리를 JSONL로 기록하고 문장별 실행 계획을 한 번씩 캡처"""
+    
+    def __init__(self, threshold_ms=None, log_path=None, db_path=None):
+        self.threshold = (Config.SLOW_QUERY_MS if threshold_ms is None else threshold_ms) / 1000
+        self.log_path = Path(log_path or Config.SLOW_QUERY_LOG)
+        self.db_path = db_path or Config.DB_PATH
+        self._plans = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, name, sql, params, elapsed, rows, error):
+        """db_instrumentation 쿼리 관찰자"""
+        if elapsed < self.threshold or error:
+            return
+        
+        SLOW_QUERIES_TOTAL.inc(statement=name)
+        normalized = normalize_sql(sql)
+        entry = {
+            'at': datetime.now().isoformat(timespec='milliseconds'),
+            'statement': name,
+            'sql': normalized,
+            'params': params_shape(params),
+            'rows': rows,
+            'elapsed_ms': round(elapsed * 1000, 2)
+        }
+        
+        plan = self._capture_plan(normalized, sql, params)
+        if plan is not None:
+            entry['plan'] = plan
+            entry['full_scans'] = find_full_scans(plan, normalized)
+        
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+    
+    def _capture_plan(self, normalized, sql, params):
+        """처음 보는 문장이면 실행 계획을 반환 (이미 캡처했으면 None)"""
+        with self._lock:
+            if normalized in self._plans:
+                return None
+        
+        if sql.lstrip().split(None, 1)[0].lower() not in _EXPLAINABLE:
+            plan = []
+        else:
+            plan = explain_query_plan(self.db_path, sql, params)
+            if plan is None:
+                # 잠금 등으로 실패하면 다음에 다시 시도
+                return None
+        
+        with self._lock:
+            if normalized in self._plans:
+                return None
+            self._plans[normalized] = plan
+        return plan
+
+_slow_query_log = None
+_install_lock = threading.Lock()
+
+def install_slow_query_log(database=None):
+    """DB 계측을 켜고 느린 쿼리 로그 관찰자를 등록 (프로세스당 1회)"""
+    global _slow_query_log
+    
+    with _install_lock:
+        if _slow_query_log is None:
+            install_db_instrumentation(database)
+            _slow_query_log = SlowQueryLog()
+            add_query_observer(_slow_query_log.observe)
+        return _slow_query_log
+
+def read_slow_query_log(log_path=None):
+    """JSONL 로그를 읽어 항목 목록 반환"""
+    path = Path(log_path or Config.SLOW_QUERY_LOG)
+    if not path.exists():
+        return []
+    
+    entries = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return entries
+
+def summarize_slow_queries(entries, db_path=None):
+    """정규화된 SQL별로 횟수/지연시간/행 수/실행 계획을 묶어 느린 순으로 반환
+    
+    로그에 실행 계획이 없는 문장은 db_path가 주어지면 지금 다시 EXPLAIN 합니다.
+    """
+    groups = {}
+    for entry in entries:
+        group = groups.setdefault(entry['sql'], {
+            'sql': entry['sql'],
+            'statement': entry['statement'],
+            'params': entry.get('params'),
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'max_rows': 0,
+            'last_at': entry['at'],
+            'plan': None
+        })
+        group['count'] += 1
+        group['total_ms'] += entry['elapsed_ms']
+        group['max_ms'] = max(group['max_ms'], entry['elapsed_ms'])
+        group['max_rows'] = max(group['max_rows'], entry.get('rows') or 0)
+        group['last_at'] = max(group['last_at'], entry['at'])
+        if entry.get('plan') is not None:
+            group['plan'] = entry['plan']
+    
+    summary = []
+    for group in groups.values():
+        if group['plan'] is None and db_path and group['sql'].split(None, 1)[0].lower() in _EXPLAINABLE:
+            # 정규화된 SQL은 ?만 남으므로 NULL 바인딩으로 계획만 확인
+            sql = group['sql'].replace('IN (...)', 'IN (?)')
+            group['plan'] = explain_query_plan(db_path, sql, (None,) * sql.count('?'))
+        group['full_scans'] = find_full_scans(group['plan'], group['sql'])
+        group['avg_ms'] = round(group['total_ms'] / group['count'], 2)
+        group['total_ms'] = round(group['total_ms'], 2)
+        summary.append(group)
+    
+    summary.sort(key=lambda group: group['total_ms'], reverse=True)
+    return summary
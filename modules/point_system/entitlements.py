@@ -0,0 +1,106 @@
+import threading
+from collections import OrderedDict
+from config.settings import Config
+from database.models import db
+from database.schema import ensure_schema
+from modules.point_system.history_archive import HistoryArchiveManager
+
+class EntitlementManager:
+    """사용자가 가진(결제한) 파일 - (user_id, file_id) 기본 키 한 행씩
+    
+    결제 트랜잭션의 커서로 grant()를 호출해 결제와 함께 커밋/롤백되고, 소유 확인은 다운로드 내역 대신
+    기본 키 조회 한 번입니다. 소유는 취소되지 않으므로 확인된 소유만 사용자별 집합으로 메모리에 두고
+    (다른 프로세스가 결제한 파일도 놓치지 않도록 메모리에 없으면 DB를 확인), 최근 사용자
+    ENTITLEMENT_CACHE_USERS명까지만 보관합니다.
+    """
+    _schema_ready = False
+    _owned = OrderedDict()
+    _owned_lock = threading.Lock()
+    
+    def __init__(self):
+        self.archive = HistoryArchiveManager()
+        self._ensure_schema()
+    
+    def _ensure_schema(self):
+        """소유 테이블 생성, 처음 만들 때는 다운로드 내역(보관된 내역 포함)으로 채움 (프로세스당 1회)"""
+        ensure_schema(EntitlementManager, self._create_schema)
+    
+    def _create_schema(self, conn):
+        # 보관된 다운로드 내역도 채우도록 (ATTACH는 트랜잭션 안에서 할 수 없음)
+        archived = self.archive.attach(conn)
+        conn.execute('BEGIN IMMEDIATE')
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'file_entitlements'").fetchone():
+            return
+        
+        conn.execute('''
+            CREATE TABLE file_entitlements (
+                user_id INTEGER NOT NULL,
+                file_id INTEGER NOT NULL,
+                acquired_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (user_id, file_id)
+            ) WITHOUT ROWID
+        ''')
+        sources = ['main.download_history'] + (['archive.download_history'] if archived else [])
+        for source in sources:
+            conn.execute(f'''
+                INSERT OR IGNORE INTO file_entitlements (user_id, file_id, acquired_at)
+                SELECT user_id, file_id, MIN(download_at) FROM {source}
+                GROUP BY user_id, file_id
+            ''')
+    
+    def grant(self, cursor, user_id, file_ids):
+        """결제 트랜잭션의 커서로 소유 기록 (이미 가진 파일은 그대로)"""
+        cursor.executemany('''
+            INSERT OR IGNORE INTO file_entitlements (user_id, file_id) VALUES (?, ?)
+        ''', [(user_id, file_id) for file_id in file_ids])
+    
+    def owned_in(self, cursor, user_id, file_ids):
+        """트랜잭션 안에서 DB 기준으로 가진 파일 ID 집합 (결제 직전 확인용, 메모리 캐시를 쓰지 않음)"""
+        file_ids = list(file_ids)
+        if not file_ids:
+            return set()
+        
+        placeholders = ','.join('?' * len(file_ids))
+        cursor.execute(f'''
+            SELECT file_id FROM file_entitlements
+            WHERE user_id = ? AND file_id IN ({placeholders})
+        ''', [user_id] + file_ids)
+        return {row['file_id'] for row in cursor.fetchall()}
+    
+    def remember(self, user_id, file_ids):
+        """커밋된 소유를 메모리 캐시에 추가"""
+        file_ids = set(file_ids)
+        if not file_ids or Config.ENTITLEMENT_CACHE_USERS <= 0:
+            return
+        
+        with EntitlementManager._owned_lock:
+            owned = EntitlementManager._owned.get(user_id)
+            if owned is None:
+                owned = EntitlementManager._owned[user_id] = set()
+                while len(EntitlementManager._owned) > Config.ENTITLEMENT_CACHE_USERS:
+                    EntitlementManager._owned.popitem(last=False)
+            else:
+                EntitlementManager._owned.move_to_end(user_id)
+            owned |= file_ids
+    
+    def owned_file_ids(self, user_id, file_ids):
+        """주어진 파일 중 사용자가 가진 파일 ID 집합 (메모리에 없는 파일만 기본 키로 조회)"""
+        file_ids = set(file_ids)
+        with EntitlementManager._owned_lock:
+            known = EntitlementManager._owned.get(user_id, set()) & file_ids
+        unknown = file_ids - known
+        if not unknown:
+            return known
+        
+        conn = db.get_connection()
+        try:
+            found = self.owned_in(conn.cursor(), user_id, unknown)
+        finally:
+            conn.close()
+        
+        self.remember(user_id, found)
+        return known | found
+    
+    def owns(self, user_id, file_id):
+        """사용자가 파일을 가졌는지 확인"""
+        return file_id in self.owned_file_ids(user_id, [file_id])
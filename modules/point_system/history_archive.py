@@ -0,0 +1,188 @@
+import time
+from pathlib import Path
+from datetime import datetime, timedelta
+from config.settings import Config
+from database.models import db
+from database.schema import JOB_STATE_TABLE, ensure_schema
+
+# 보관 기준 시각 키 (job_state 테이블, 값은 이 시각 이전 내역이 모두 보관 DB에 있다는 UTC 자정 시각)
+CUTOFF_KEY = 'history_archive_cutoff'
+
+# 인기 목록 rebuild()가 최근 7일 내역을 원본에서 읽으므로 최소 보관 기준 (일)
+MIN_ARCHIVE_DAYS = 8
+
+# 보관 대상 테이블별 (시각 컬럼, 컬럼 목록, 보관 DB 테이블 정의)
+# 보관 테이블은 (사용자, 시각, id) 기본 키 순서로 저장되어 한 사용자의 내역이 연속된 페이지에 모임
+ARCHIVE_TABLES = {
+    'point_transactions': ('created_at', 'id, user_id, transaction_type, amount, description, file_id, created_at', '''
+        CREATE TABLE IF NOT EXISTS archive.point_transactions (
+            id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            transaction_type TEXT NOT NULL,
+            amount INTEGER NOT NULL,
+            description TEXT,
+            file_id INTEGER,
+            created_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (user_id, created_at, id)
+        ) WITHOUT ROWID
+    '''),
+    'download_history': ('download_at', 'id, user_id, file_id, points_spent, download_at', '''
+        CREATE TABLE IF NOT EXISTS archive.download_history (
+            id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            file_id INTEGER NOT NULL,
+            points_spent INTEGER NOT NULL,
+            download_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (user_id, download_at, id)
+        ) WITHOUT ROWID
+    ''')
+}
+
+# 보관하면서 사용자별 요약에 더할 값 (보관 행만큼 통계가 그대로 유지되도록)
+SUMMARY_UPDATES = {
+    'point_transactions': ('transactions, earned, spent', '''
+        COUNT(*), SUM(CASE WHEN transaction_type = 'earn' THEN amount ELSE 0 END),
+        SUM(CASE WHEN transaction_type = 'spend' THEN amount ELSE 0 END)
+    ''', '''
+        transactions = transactions + excluded.transactions,
+        earned = earned + excluded.earned,
+        spent = spent + excluded.spent
+    '''),
+    'download_history': ('downloads, download_points', 'COUNT(*), SUM(points_spent)', '''
+        downloads = downloads + excluded.downloads,
+        download_points = download_points + excluded.download_points
+    ''')
+}
+
+EMPTY_SUMMARY = {'transactions': 0, 'earned': 0, 'spent': 0, 'downloads': 0, 'download_points': 0}
+
+class HistoryArchiveManager:
+    """오래된 포인트 거래/다운로드 내역 보관
+    
+    archive()는 기준 시각 이전 행을 보관 DB(ARCHIVE_DB_PATH, ATTACH로 연결)로 옮기고 사용자별 개수와
+    합계를 user_history_summary에 더해 통계가 원본을 모두 읽은 것과 같게 유지합니다. 원본 테이블에는
+    최근 내역만 남고, 내역 페이지가 보관 구간까지 넘어갈 때만 보관 DB를 붙여 이어서 읽습니다.
+    """
+    _schema_ready = False
+    
+    def __init__(self):
+        self.path = Path(Config.ARCHIVE_DB_PATH)
+        self._ensure_schema()
+    
+    def _ensure_schema(self):
+        """사용자별 요약 테이블과 작업 상태 테이블 생성 (프로세스당 1회, 보관 DB는 archive()에서 생성)"""
+        ensure_schema(HistoryArchiveManager, self._create_schema)
+    
+    def _create_schema(self, conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS user_history_summary (
+                user_id INTEGER PRIMARY KEY,
+                transactions INTEGER NOT NULL DEFAULT 0,
+                earned INTEGER NOT NULL DEFAULT 0,
+                spent INTEGER NOT NULL DEFAULT 0,
+                downloads INTEGER NOT NULL DEFAULT 0,
+                download_points INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        conn.execute(JOB_STATE_TABLE)
+    
+    def attach(self, conn):
+        """연결에 보관 DB를 archive로 붙임 (트랜잭션 밖에서 호출, 보관 DB가 아직 없으면 False)"""
+        if any(row['name'] == 'archive' for row in conn.execute('PRAGMA database_list')):
+            return True
+        if not self.path.exists():
+            return False
+        conn.execute('ATTACH DATABASE ? AS archive', (str(self.path),))
+        return True
+    
+    def get_summary(self, conn, user_id):
+        """보관된 내역의 사용자별 개수와 합계 (보관된 내역이 없으면 0)"""
+        row = conn.execute('''
+            SELECT transactions, earned, spent, downloads, download_points
+            FROM user_history_summary WHERE user_id = ?
+        ''', (user_id,)).fetchone()
+        return dict(row) if row else dict(EMPTY_SUMMARY)
+    
+    def read_page(self, conn, table, query, params, recent_count, limit, offset):
+        """최근 내역 다음에 보관 내역을 이어 붙여 한 페이지 읽기 (페이지가 보관 구간에 걸릴 때만 보관 DB를 읽음)
+        
+        query의 {table}은 원본 테이블 또는 archive.<table>로 바뀌고, 끝에 LIMIT/OFFSET이 붙습니다.
+        """
+        rows = []
+        if offset < recent_count:
+            rows = conn.execute(query.format(table=table) + ' LIMIT ? OFFSET ?',
+                                tuple(params) + (limit, offset)).fetchall()
+        
+        remaining = limit - len(rows)
+        if remaining > 0 and self.attach(conn):
+            rows += conn.execute(query.format(table=f'archive.{table}') + ' LIMIT ? OFFSET ?',
+                                 tuple(params) + (remaining, max(0, offset - recent_count))).fetchall()
+        return [dict(row) for row in rows]
+    
+    def archive(self, days=None, batch_size=None):
+        """days일보다 오래된 내역을 보관 DB로 이동 - {'cutoff': 기준 시각, 테이블: 옮긴 행 수, 'seconds': 소요 시간}
+        
+        기준 시각은 UTC 자정으로 맞추고, 오래된 행부터 batch_size개씩 옮겨 쓰기 잠금을 짧게 잡습니다.
+        """
+        started = time.perf_counter()
+        days = max(days or Config.ARCHIVE_AFTER_DAYS, MIN_ARCHIVE_DAYS)
+        batch_size = batch_size or Config.ARCHIVE_BATCH_SIZE
+        cutoff = (datetime.utcnow().date() - timedelta(days=days)).isoformat() + ' 00:00:00'
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        result = {'cutoff': cutoff}
+        
+        try:
+            conn.execute('ATTACH DATABASE ? AS archive', (str(self.path),))
+            for _, _, statement in ARCHIVE_TABLES.values():
+                cursor.execute(statement)
+            cursor.execute('CREATE TEMP TABLE IF NOT EXISTS archive_batch (id INTEGER PRIMARY KEY)')
+            conn.commit()
+            
+            for table, (time_column, columns, _) in ARCHIVE_TABLES.items():
+                summary_columns, summary_values, summary_update = SUMMARY_UPDATES[table]
+                moved = 0
+                while True:
+                    cursor.execute('BEGIN IMMEDIATE')
+                    cursor.execute('DELETE FROM temp.archive_batch')
+                    # 오래된 행부터 옮겨 항상 보관된 행이 원본에 남은 행보다 과거가 되도록 함
+                    cursor.execute(f'''
+                        INSERT INTO temp.archive_batch (id)
+                        SELECT id FROM main.{table} WHERE {time_column} < ?
+                        ORDER BY {time_column}, id LIMIT ?
+                    ''', (cutoff, batch_size))
+                    if cursor.rowcount <= 0:
+                        conn.rollback()
+                        break
+                    
+                    cursor.execute(f'''
+                        INSERT INTO archive.{table} ({columns})
+                        SELECT {columns} FROM main.{table} WHERE id IN (SELECT id FROM temp.archive_batch)
+                    ''')
+                    cursor.execute(f'''
+                        INSERT INTO main.user_history_summary (user_id, {summary_columns})
+                        SELECT user_id, {summary_values}
+                        FROM main.{table} WHERE id IN (SELECT id FROM temp.archive_batch)
+                        GROUP BY user_id
+                        ON CONFLICT(user_id) DO UPDATE SET {summary_update}
+                    ''')
+                    cursor.execute(f'DELETE FROM main.{table} WHERE id IN (SELECT id FROM temp.archive_batch)')
+                    moved += cursor.rowcount
+                    conn.commit()
+                result[table] = moved
+            
+            cursor.execute('''
+                INSERT INTO main.job_state (name, value, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(name) DO UPDATE SET value = MAX(value, excluded.value), updated_at = excluded.updated_at
+            ''', (CUTOFF_KEY, cutoff))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        
+        result['seconds'] = time.perf_counter() - started
+        return result
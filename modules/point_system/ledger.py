@@ -0,0 +1,158 @@
+import time
+from config.settings import Config
+from database.models import db
+from database.schema import JOB_STATE_TABLE, ensure_schema, read_job_state, write_job_state
+from modules.point_system.history_archive import HistoryArchiveManager
+
+# 마지막 스냅샷이 반영한 point_transactions id (job_state 테이블)
+WATERMARK_KEY = 'ledger_snapshot_watermark'
+
+# 거래 한 건이 잔액에 더하는 값
+SIGNED_AMOUNT = "CASE pt.transaction_type WHEN 'earn' THEN pt.amount WHEN 'spend' THEN -pt.amount ELSE 0 END"
+
+class LedgerManager:
+    """포인트 원장 - 사용자별 잔액 스냅샷 + 스냅샷 이후 거래
+    
+    원장 잔액은 마지막 스냅샷(balance_snapshots)에 as_of_id 이후 거래를 더한 값이고, 스냅샷이 없는 사용자는
+    가입 포인트 + 보관된 거래 요약 + 남은 거래 전체입니다. snapshot()은 마지막 실행 이후 거래가 있는
+    사용자의 스냅샷만 앞으로 옮기므로 잔액 확인과 통계가 최근 거래 수에만 비례합니다.
+    스냅샷은 users.points가 아니라 원장 값으로만 만들어 users.points와 어긋난 값이 그대로 드러납니다.
+    """
+    _schema_ready = False
+    
+    def __init__(self):
+        # 보관된 거래 요약 테이블(user_history_summary) 생성
+        HistoryArchiveManager()
+        self._ensure_schema()
+    
+    def _ensure_schema(self):
+        """스냅샷 테이블, 작업 상태 테이블, 사용자별 거래 인덱스 생성 (프로세스당 1회)"""
+        ensure_schema(LedgerManager, self._create_schema)
+    
+    def _create_schema(self, conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS balance_snapshots (
+                user_id INTEGER PRIMARY KEY,
+                balance INTEGER NOT NULL,
+                earned INTEGER NOT NULL,
+                spent INTEGER NOT NULL,
+                as_of_id INTEGER NOT NULL,
+                snapshot_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute(JOB_STATE_TABLE)
+        # 스냅샷 이후 거래를 (사용자, id) 범위로 읽도록
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_point_transactions_user_id ON point_transactions (user_id)')
+    
+    def get_balance(self, conn, user_id):
+        """원장 기준 잔액과 누적 획득/사용 포인트 - {'balance', 'earned', 'spent'}"""
+        snapshot = conn.execute('''
+            SELECT balance, earned, spent, as_of_id FROM balance_snapshots WHERE user_id = ?
+        ''', (user_id,)).fetchone()
+        if snapshot:
+            balance, earned, spent, as_of_id = tuple(snapshot)
+        else:
+            archived = conn.execute('SELECT earned, spent FROM user_history_summary WHERE user_id = ?',
+                                    (user_id,)).fetchone()
+            earned, spent = (archived['earned'], archived['spent']) if archived else (0, 0)
+            balance, as_of_id = Config.INITIAL_POINTS + earned - spent, 0
+        
+        delta = conn.execute('''
+            SELECT SUM(CASE WHEN transaction_type = 'earn' THEN amount ELSE 0 END) as earned,
+                   SUM(CASE WHEN transaction_type = 'spend' THEN amount ELSE 0 END) as spent
+            FROM point_transactions
+            WHERE user_id = ? AND id > ?
+        ''', (user_id, as_of_id)).fetchone()
+        delta_earned, delta_spent = delta['earned'] or 0, delta['spent'] or 0
+        return {'balance': balance + delta_earned - delta_spent, 'earned': earned + delta_earned,
+                'spent': spent + delta_spent}
+    
+    def snapshot(self):
+        """마지막 스냅샷 이후 거래가 있는 사용자의 스냅샷을 현재까지 옮김
+        
+        반환: {'users': 갱신한 사용자 수, 'watermark': 반영한 마지막 거래 id, 'seconds': 소요 시간}
+        """
+        started = time.perf_counter()
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('''
+                CREATE TEMP TABLE IF NOT EXISTS ledger_deltas (user_id INTEGER PRIMARY KEY, earned INTEGER, spent INTEGER)
+            ''')
+            cursor.execute('BEGIN IMMEDIATE')
+            watermark = int(read_job_state(cursor, WATERMARK_KEY) or 0)
+            cursor.execute('SELECT COALESCE(MAX(id), 0) as max_id FROM point_transactions')
+            max_id = cursor.fetchone()['max_id']
+            
+            cursor.execute('DELETE FROM temp.ledger_deltas')
+            cursor.execute('''
+                INSERT INTO temp.ledger_deltas (user_id, earned, spent)
+                SELECT user_id, SUM(CASE WHEN transaction_type = 'earn' THEN amount ELSE 0 END),
+                       SUM(CASE WHEN transaction_type = 'spend' THEN amount ELSE 0 END)
+                FROM point_transactions
+                WHERE id > ? AND id <= ?
+                GROUP BY user_id
+            ''', (watermark, max_id))
+            users = cursor.rowcount
+            
+            # 스냅샷이 있는 사용자는 이번 구간의 합계를 더함 (UPDATE ... FROM은 SQLite 3.33 이상이라 서브쿼리 사용)
+            cursor.execute('''
+                UPDATE balance_snapshots
+                SET balance = balance + (SELECT d.earned - d.spent FROM temp.ledger_deltas d
+                                         WHERE d.user_id = balance_snapshots.user_id),
+                    earned = earned + (SELECT d.earned FROM temp.ledger_deltas d
+                                       WHERE d.user_id = balance_snapshots.user_id),
+                    spent = spent + (SELECT d.spent FROM temp.ledger_deltas d
+                                     WHERE d.user_id = balance_snapshots.user_id),
+                    as_of_id = ?, snapshot_at = CURRENT_TIMESTAMP
+                WHERE user_id IN (SELECT user_id FROM temp.ledger_deltas)
+            ''', (max_id,))
+            
+            # 첫 스냅샷은 가입 포인트 + 보관된 거래 요약 + 워터마크까지의 남은 거래 전체
+            cursor.execute(f'''
+                INSERT INTO balance_snapshots (user_id, balance, earned, spent, as_of_id)
+                SELECT d.user_id, ? + COALESCE(h.earned, 0) - COALESCE(h.spent, 0) + SUM({SIGNED_AMOUNT}),
+                       COALESCE(h.earned, 0) + SUM(CASE WHEN pt.transaction_type = 'earn' THEN pt.amount ELSE 0 END),
+                       COALESCE(h.spent, 0) + SUM(CASE WHEN pt.transaction_type = 'spend' THEN pt.amount ELSE 0 END), ?
+                FROM temp.ledger_deltas d
+                JOIN point_transactions pt ON pt.user_id = d.user_id AND pt.id <= ?
+                LEFT JOIN user_history_summary h ON h.user_id = d.user_id
+                WHERE d.user_id NOT IN (SELECT user_id FROM balance_snapshots)
+                GROUP BY d.user_id
+            ''', (Config.INITIAL_POINTS, max_id, max_id))
+            
+            write_job_state(cursor, WATERMARK_KEY, max_id)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        
+        return {'users': users, 'watermark': max_id, 'seconds': time.perf_counter() - started}
+    
+    def reconcile(self):
+        """모든 사용자의 users.points를 원장 잔액과 비교 (한 번의 쿼리를 스트리밍) - 어긋난 사용자를 하나씩 반환
+        
+        각 항목: {'user_id', 'username', 'points': users.points, 'ledger': 원장 잔액, 'drift': points - ledger}
+        """
+        conn = db.get_connection()
+        
+        try:
+            rows = conn.execute(f'''
+                SELECT u.id as user_id, u.username, u.points,
+                       COALESCE(s.balance, ? + COALESCE(h.earned, 0) - COALESCE(h.spent, 0))
+                           + COALESCE(SUM({SIGNED_AMOUNT}), 0) as ledger
+                FROM users u
+                LEFT JOIN balance_snapshots s ON s.user_id = u.id
+                LEFT JOIN user_history_summary h ON h.user_id = u.id
+                LEFT JOIN point_transactions pt ON pt.user_id = u.id AND pt.id > COALESCE(s.as_of_id, 0)
+                GROUP BY u.id
+                ORDER BY u.id
+            ''', (Config.INITIAL_POINTS,))
+            for row in rows:
+                if row['points'] != row['ledger']:
+                    yield dict(row, drift=row['points'] - row['ledger'])
+        finally:
+            conn.close()
@@ -1,11 +1,30 @@
+import uuid
 import sqlite3
 from datetime import datetime
 from database.models import db
 from config.settings import Config
+from modules.auth.token_signer import TokenSigner, revocation_list
+from modules.file_manager.trending import TrendingManager
+from modules.point_system.history_archive import HistoryArchiveManager
+from modules.point_system.ledger import LedgerManager
+from modules.point_system.entitlements import EntitlementManager
+from modules.monitoring.metrics import PAYMENTS_TOTAL, DOWNLOAD_TOKENS_TOTAL
+
+# 결제 결과 코드 (PAYMENTS_TOTAL 라벨, API 응답 상태 선택에 사용)
+PAYMENT_OK = 'ok'
+PAYMENT_INSUFFICIENT = 'insufficient'
+PAYMENT_NOT_FOUND = 'not_found'
+PAYMENT_ERROR = 'error'
+
+FREE_DOWNLOAD_MESSAGE = "이미 다운로드했거나 내가 올린 파일이라 무료입니다."
 
 class PointManager:
     def __init__(self):
-        pass
+        self.signer = TokenSigner()
+        self.trending = TrendingManager()
+        self.archive = HistoryArchiveManager()
+        self.ledger = LedgerManager()
+        self.entitlements = EntitlementManager()
     
     def get_user_points(self, user_id):
         """사용자의 현재 포인트 조회"""
@@ -27,48 +46,170 @@ class PointManager:
         return user_points >= file_price
     
     def process_download_payment(self, user_id, file_id, file_price=None):
-        """다운로드 결제 처리"""
-        if file_price is None:
-            file_price = Config.DOWNLOAD_COST_POINTS
+        """다운로드 결제 처리 (이미 받은 파일과 내 파일은 무료) - (성공, 메시지)"""
+        prices = None if file_price is None else {int(file_id): file_price}
+        code, message, paid, total_price = self._charge(user_id, [file_id], '파일 다운로드', prices)
+        if code != PAYMENT_OK:
+            return False, message
+        return True, f"{total_price} 포인트가 차감되었습니다." if paid else FREE_DOWNLOAD_MESSAGE
+    
+    def process_bulk_download_payment(self, user_id, file_ids):
+        """여러 파일을 한 트랜잭션으로 결제 (이미 받은 파일과 내 파일은 무료) - (성공, 메시지, 결제 포인트)"""
+        file_ids = list(dict.fromkeys(int(file_id) for file_id in file_ids))
+        if not file_ids:
+            return False, "선택한 파일이 없습니다.", 0
         
-        if not self.can_afford_download(user_id, file_price):
-            return False, "포인트가 부족합니다."
+        code, message, total_price = self._charge_bulk(user_id, file_ids)
+        return code == PAYMENT_OK, message, total_price
+    
+    def _charge_bulk(self, user_id, file_ids):
+        """일괄 결제 - (결과 코드, 메시지, 결제 포인트)"""
+        code, message, paid, total_price = self._charge(user_id, file_ids, '파일 일괄 다운로드')
+        if code != PAYMENT_OK:
+            return code, message, 0
+        free_count = len(file_ids) - len(paid)
+        return code, f"{len(file_ids)}개 파일, {total_price} 포인트가 차감되었습니다. (무료 {free_count}개)", total_price
+    
+    def _charge(self, user_id, file_ids, description, prices=None):
+        """파일들을 한 트랜잭션으로 결제 - (결과 코드, 오류 메시지, 결제한 파일 ID 목록, 결제 포인트)
         
+        소유 확인, 잔액 확인, 차감을 한 쓰기 트랜잭션 안에서 하므로 같은 파일을 동시에 요청해도 한 번만
+        결제되고 잔액이 음수가 되지 않습니다. prices가 있으면 파일 가격 대신 사용합니다.
+        """
+        file_ids = list(dict.fromkeys(int(file_id) for file_id in file_ids))
         conn = db.get_connection()
         cursor = conn.cursor()
+        placeholders = ','.join('?' * len(file_ids))
         
         try:
-            # 사용자 포인트 차감
-            cursor.execute('''
-                UPDATE users SET points = points - ? WHERE id = ?
-            ''', (file_price, user_id))
+            # 잔액 확인부터 차감까지 다른 결제가 끼어들지 않도록 쓰기 잠금을 먼저 잡음
+            cursor.execute('BEGIN IMMEDIATE')
             
-            # 포인트 트랜잭션 기록
-            cursor.execute('''
-                INSERT INTO point_transactions (user_id, transaction_type, amount, description, file_id)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (user_id, 'spend', file_price, '파일 다운로드', file_id))
+            cursor.execute(f'''
+                SELECT id, price, uploader_id FROM files
+                WHERE id IN ({placeholders}) AND is_active = 1
+            ''', file_ids)
+            files = {row['id']: dict(row) for row in cursor.fetchall()}
             
-            # 다운로드 히스토리 기록
-            cursor.execute('''
-                INSERT INTO download_history (user_id, file_id, points_spent)
-                VALUES (?, ?, ?)
-            ''', (user_id, file_id, file_price))
+            if any(file_id not in files for file_id in file_ids):
+                conn.rollback()
+                PAYMENTS_TOTAL.inc(result=PAYMENT_NOT_FOUND)
+                return PAYMENT_NOT_FOUND, "찾을 수 없는 파일이 포함되어 있습니다.", [], 0
             
-            # 파일 다운로드 카운트 증가
-            cursor.execute('''
-                UPDATE files SET download_count = download_count + 1 WHERE id = ?
-            ''', (file_id,))
+            for file_id, price in (prices or {}).items():
+                files[file_id]['price'] = price
             
-            conn.commit()
-            return True, f"{file_price} 포인트가 차감되었습니다."
+            owned = self.entitlements.owned_in(cursor, user_id, file_ids)
+            
+            to_pay = [files[file_id] for file_id in file_ids
+                      if file_id not in owned and files[file_id]['uploader_id'] != user_id]
+            total_price = sum(file['price'] for file in to_pay)
             
+            if to_pay:
+                # 사용자 포인트 차감 (잔액이 부족하면 0행)
+                cursor.execute('''
+                    UPDATE users SET points = points - ? WHERE id = ? AND points >= ?
+                ''', (total_price, user_id, total_price))
+                if cursor.rowcount != 1:
+                    conn.rollback()
+                    PAYMENTS_TOTAL.inc(result=PAYMENT_INSUFFICIENT)
+                    return PAYMENT_INSUFFICIENT, "포인트가 부족합니다.", [], 0
+                
+                # 포인트 트랜잭션 / 다운로드 히스토리 기록, 다운로드 카운트 증가
+                cursor.executemany('''
+                    INSERT INTO point_transactions (user_id, transaction_type, amount, description, file_id)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', [(user_id, 'spend', file['price'], description, file['id']) for file in to_pay])
+                
+                cursor.executemany('''
+                    INSERT INTO download_history (user_id, file_id, points_spent)
+                    VALUES (?, ?, ?)
+                ''', [(user_id, file['id'], file['price']) for file in to_pay])
+                
+                # 소유 기록 (재다운로드 무료 확인용)
+                self.entitlements.grant(cursor, user_id, [file['id'] for file in to_pay])
+                
+                cursor.executemany('''
+                    UPDATE files SET download_count = download_count + 1 WHERE id = ?
+                ''', [(file['id'],) for file in to_pay])
+                
+                # 인기 점수 갱신
+                self.trending.record_downloads(cursor, [file['id'] for file in to_pay])
+            
+            conn.commit()
+            paid = [file['id'] for file in to_pay]
+            self.entitlements.remember(user_id, owned | set(paid))
+            PAYMENTS_TOTAL.inc(len(to_pay), result=PAYMENT_OK)
+            return PAYMENT_OK, None, paid, total_price
+        
         except Exception as e:
             conn.rollback()
-            return False, f"결제 처리 중 오류가 발생했습니다: {str(e)}"
+            PAYMENTS_TOTAL.inc(result=PAYMENT_ERROR)
+            return PAYMENT_ERROR, f"결제 처리 중 오류가 발생했습니다: {str(e)}", [], 0
         finally:
             conn.close()
     
+    def purchase_bulk_download_token(self, user_id, file_ids, client_ip=None):
+        """여러 파일을 한 번에 결제하고 ZIP 다운로드 토큰 발급 - (결과 코드, 메시지, 토큰)"""
+        file_ids = list(dict.fromkeys(int(file_id) for file_id in file_ids))
+        code, message, _ = self._charge_bulk(user_id, file_ids)
+        if code != PAYMENT_OK:
+            return code, message, None
+        return code, message, self.issue_download_token(user_id, file_ids, client_ip)
+    
+    def purchase_download_token(self, user_id, file_info, client_ip=None):
+        """필요하면 결제하고 다운로드 토큰 발급 (이미 받은 파일과 내 파일은 무료) - (결과 코드, 메시지, 토큰)"""
+        code, message, paid, total_price = self._charge(user_id, [file_info['id']], '파일 다운로드')
+        if code != PAYMENT_OK:
+            return code, message, None
+        
+        message = f"{total_price} 포인트가 차감되었습니다." if paid else FREE_DOWNLOAD_MESSAGE
+        return code, message, self.issue_download_token(user_id, [file_info['id']], client_ip)
+    
+    def issue_download_token(self, user_id, file_ids, client_ip=None, ttl_seconds=None):
+        """결제가 끝난 파일들에 대한 서명된 다운로드 토큰 발급"""
+        payload = {
+            'typ': 'dl',
+            'uid': user_id,
+            'fid': [int(file_id) for file_id in file_ids],
+            'ip': client_ip,
+            'jti': uuid.uuid4().hex
+        }
+        DOWNLOAD_TOKENS_TOTAL.inc(result='issued')
+        return self.signer.sign(payload, ttl_seconds or Config.DOWNLOAD_TOKEN_TTL_MINUTES * 60)
+    
+    def verify_download_token(self, token, file_id=None, client_ip=None):
+        """DB 조회 없이 다운로드 토큰 검증 후 payload 반환 (유효하지 않으면 None)"""
+        payload = self.signer.verify(token)
+        if not payload or payload.get('typ') != 'dl':
+            DOWNLOAD_TOKENS_TOTAL.inc(result='invalid')
+            return None
+        
+        if file_id is not None and int(file_id) not in payload['fid']:
+            DOWNLOAD_TOKENS_TOTAL.inc(result='wrong_file')
+            return None
+        
+        if Config.DOWNLOAD_TOKEN_ENFORCE_IP and payload.get('ip') and client_ip and payload['ip'] != client_ip:
+            DOWNLOAD_TOKENS_TOTAL.inc(result='wrong_ip')
+            return None
+        
+        if revocation_list.is_revoked(payload['jti']):
+            DOWNLOAD_TOKENS_TOTAL.inc(result='revoked')
+            return None
+        
+        DOWNLOAD_TOKENS_TOTAL.inc(result='accepted')
+        return payload
+    
+    def revoke_download_token(self, token):
+        """다운로드 토큰을 만료 전에 폐기"""
+        payload = self.signer.verify(token)
+        if not payload or payload.get('typ') != 'dl':
+            return False, "유효하지 않은 토큰입니다."
+        
+        if not revocation_list.revoke(payload['jti'], payload['exp']):
+            return False, "토큰 폐기 중 오류가 발생했습니다."
+        return True, "토큰이 폐기되었습니다."
+    
     def add_points(self, user_id, amount, description="포인트 충전"):
         """포인트 추가"""
         conn = db.get_connection()
@@ -96,77 +237,71 @@ class PointManager:
             conn.close()
     
     def get_point_history(self, user_id, limit=20, offset=0):
-        """포인트 사용 내역 조회"""
+        """포인트 사용 내역 조회 (최근 내역 다음 페이지부터는 보관 DB에서 이어서 읽음)"""
         conn = db.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT pt.*, f.original_name as file_name
-            FROM point_transactions pt
-            LEFT JOIN files f ON pt.file_id = f.id
-            WHERE pt.user_id = ?
-            ORDER BY pt.created_at DESC
-            LIMIT ? OFFSET ?
-        ''', (user_id, limit, offset))
-        
-        transactions = cursor.fetchall()
-        
-        # 전체 개수 조회
-        cursor.execute('''
-            SELECT COUNT(*) as total
-            FROM point_transactions
-            WHERE user_id = ?
-        ''', (user_id,))
-        
-        total_count = cursor.fetchone()['total']
-        conn.close()
+        try:
+            # 최근 내역 개수 + 보관된 내역 개수
+            cursor.execute('''
+                SELECT COUNT(*) as total
+                FROM point_transactions
+                WHERE user_id = ?
+            ''', (user_id,))
+            recent_count = cursor.fetchone()['total']
+            total_count = recent_count + self.archive.get_summary(conn, user_id)['transactions']
+            
+            transactions = self.archive.read_page(conn, 'point_transactions', '''
+                SELECT pt.*, f.original_name as file_name
+                FROM {table} pt
+                LEFT JOIN files f ON pt.file_id = f.id
+                WHERE pt.user_id = ?
+                ORDER BY pt.created_at DESC, pt.id DESC
+            ''', (user_id,), recent_count, limit, offset)
+        finally:
+            conn.close()
         
-        return [dict(t) for t in transactions], total_count
+        return transactions, total_count
     
     def get_download_history(self, user_id, limit=20, offset=0):
-        """다운로드 내역 조회"""
+        """다운로드 내역 조회 (최근 내역 다음 페이지부터는 보관 DB에서 이어서 읽음)"""
         conn = db.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT dh.*, f.original_name, f.file_uuid, u.username as uploader_name
-            FROM download_history dh
-            JOIN files f ON dh.file_id = f.id
-            JOIN users u ON f.uploader_id = u.id
-            WHERE dh.user_id = ?
-            ORDER BY dh.download_at DESC
-            LIMIT ? OFFSET ?
-        ''', (user_id, limit, offset))
-        
-        downloads = cursor.fetchall()
-        
-        # 전체 개수 조회
-        cursor.execute('''
-            SELECT COUNT(*) as total
-            FROM download_history
-            WHERE user_id = ?
-        ''', (user_id,))
-        
-        total_count = cursor.fetchone()['total']
-        conn.close()
+        try:
+            # 최근 내역 개수 + 보관된 내역 개수
+            cursor.execute('''
+                SELECT COUNT(*) as total
+                FROM download_history
+                WHERE user_id = ?
+            ''', (user_id,))
+            recent_count = cursor.fetchone()['total']
+            total_count = recent_count + self.archive.get_summary(conn, user_id)['downloads']
+            
+            downloads = self.archive.read_page(conn, 'download_history', '''
+                SELECT dh.*, f.original_name, f.file_uuid, u.username as uploader_name
+                FROM {table} dh
+                JOIN files f ON dh.file_id = f.id
+                JOIN users u ON f.uploader_id = u.id
+                WHERE dh.user_id = ?
+                ORDER BY dh.download_at DESC, dh.id DESC
+            ''', (user_id,), recent_count, limit, offset)
+        finally:
+            conn.close()
         
-        return [dict(d) for d in downloads], total_count
+        return downloads, total_count
     
     def has_downloaded_file(self, user_id, file_id):
-        """사용자가 이미 해당 파일을 다운로드했는지 확인"""
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT COUNT(*) as count
-            FROM download_history
-            WHERE user_id = ? AND file_id = ?
-        ''', (user_id, file_id))
-        
-        result = cursor.fetchone()
-        conn.close()
+        """사용자가 이미 해당 파일을 다운로드했는지 확인 (소유 테이블 기본 키 조회 또는 메모리)"""
+        return self.entitlements.owns(user_id, file_id)
+    
+    def get_downloaded_file_ids(self, user_id, file_ids):
+        """주어진 파일 중 사용자가 이미 다운로드한 파일 ID 집합 (목록 한 페이지를 쿼리 1번 이하로)"""
+        file_ids = list(file_ids)
+        if not file_ids:
+            return set()
         
-        return result['count'] > 0
+        return self.entitlements.owned_file_ids(user_id, file_ids)
     
     def get_user_statistics(self, user_id):
         """사용자의 통계 정보 조회"""
@@ -198,31 +333,19 @@ class PointManager:
         result = cursor.fetchone()
         total_downloads = result['total_downloads'] if result['total_downloads'] else 0
         
-        # 총 획득 포인트
-        cursor.execute('''
-            SELECT SUM(amount) as total_earned
-            FROM point_transactions
-            WHERE user_id = ? AND transaction_type = 'earn'
-        ''', (user_id,))
-        result = cursor.fetchone()
-        total_earned = result['total_earned'] if result['total_earned'] else 0
+        # 총 획득/사용 포인트 (원장 스냅샷 + 스냅샷 이후 거래)
+        ledger = self.ledger.get_balance(conn, user_id)
         
-        # 총 사용 포인트
-        cursor.execute('''
-            SELECT SUM(amount) as total_spent
-            FROM point_transactions
-            WHERE user_id = ? AND transaction_type = 'spend'
-        ''', (user_id,))
-        result = cursor.fetchone()
-        total_spent = result['total_spent'] if result['total_spent'] else 0
+        # 보관된 다운로드 내역 수
+        archived = self.archive.get_summary(conn, user_id)
         
         conn.close()
         
         return {
             'uploaded_count': uploaded_count,
-            'downloaded_count': downloaded_count,
+            'downloaded_count': downloaded_count + archived['downloads'],
             'total_downloads': total_downloads,
-            'total_earned': total_earned,
-            'total_spent': total_spent,
+            'total_earned': ledger['earned'],
+            'total_spent': ledger['spent'],
             'current_points': self.get_user_points(user_id)
         }
@@ -1,12 +1,24 @@
+import html
+import time
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 from config.settings import Config
 from modules.auth.auth_manager import AuthManager
+from modules.auth.rate_limiter import rate_limiter, retry_after_seconds
 from modules.file_manager.file_manager import FileManager
-from modules.point_system.point_manager import PointManager
+from modules.file_manager.zip_stream import iter_zip_stream
+from modules.file_manager.payload_cache import SessionPayloadCache
+from modules.file_manager.recommendations import RecommendationManager
+from modules.point_system.point_manager import PointManager, PAYMENT_OK
+from modules.monitoring.rerun_profiler import rerun_profiler
+from modules.monitoring.analytics import AnalyticsManager
+from modules.ui.fragments import fragment, rerun_app
 
-def show_ghibli_navigation():
+def _set_session_value(key, value):
+    """버튼 콜백 - 재실행 전에 세션 상태 값 설정"""
+    st.session_state[key] = value
+
+def show_ghibli_navigation(is_admin=False):
     """지브리 스타일 네비게이션 메뉴"""
     st.markdown("""
     <div style="background: linear-gradient(135deg, #C8E6C9, #A5D6A7); 
@@ -26,15 +38,16 @@ def show_ghibli_navigation():
         "💰 도토리 주머니",
         "📜 수집 일지"
     ]
+    if is_admin:
+        menu_options.append("🔧 관리자")
     
-    # 가로 메뉴 버튼들
+    # 가로 메뉴 버튼들 (콜백에서 메뉴를 바꿔 재실행이 한 번만 일어나도록)
     cols = st.columns(len(menu_options))
     
     for i, (col, option) in enumerate(zip(cols, menu_options)):
         with col:
-            if st.button(option, key=f"nav_{i}", use_container_width=True):
-                st.session_state.current_menu = option
-                st.rerun()
+            st.button(option, key=f"nav_{i}", use_container_width=True,
+                      on_click=_set_session_value, args=('current_menu', option))
     
     # 현재 메뉴 상태 관리
     if 'current_menu' not in st.session_state:
@@ -77,45 +90,226 @@ def show_ghibli_header():
             placeholder="원하는 파일을 찾아보세요...",
             help="숲 속에서 보물을 찾듯이 검색해보세요!"
         )
+        show_ghibli_search_suggestions(search_query, category)
     
     with col4:
-        if user:
-            st.markdown(f"""
-            <div style="text-align: center; background: linear-gradient(135deg, #FFE082, #FFCC02); 
-                        padding: 15px; border-radius: 20px; border: 3px solid #FFA000; margin-top: 25px;">
-                <div style="color: #E65100; font-weight: bold; font-size: 12px;">🌟 도토리 주머니</div>
-                <div style="color: #BF360C; font-size: 20px; font-weight: bold;">{user['points']:,}P</div>
-                <div style="color: #E65100; font-size: 10px;">✨ {user['username']}</div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            if st.button("🚪 숲으로 돌아가기", key="logout_btn"):
-                auth.logout()
-                st.rerun()
-        else:
-            st.button("🌱 숲에 들어가기", key="login_btn")
+        show_ghibli_user_badge(user)
     
     return category, search_query
 
+def show_ghibli_search_suggestions(search_query, category):
+    """검색어로 시작하는 다른 파일명 제안 (메모리 색인 사용, DB 조회 없음)"""
+    if not search_query.strip():
+        return
+    
+    suggestions = [
+        item['original_name'] for item in FileManager().suggest_file_names(search_query, category, 4)
+        if item['original_name'] != search_query
+    ]
+    if not suggestions:
+        return
+    
+    st.caption("🌱 혹시 이 보물을 찾으세요?")
+    for i, name in enumerate(suggestions):
+        st.button(name, key=f"search_suggestion_{i}", use_container_width=True,
+                  on_click=_set_session_value, args=('search_query', name))
+
+def _logout():
+    AuthManager().logout()
+
+@fragment
+def show_ghibli_user_badge(user):
+    """헤더의 도토리 주머니와 로그아웃 버튼"""
+    if user:
+        st.markdown(f"""
+        <div style="text-align: center; background: linear-gradient(135deg, #FFE082, #FFCC02); 
+                    padding: 15px; border-radius: 20px; border: 3px solid #FFA000; margin-top: 25px;">
+            <div style="color: #E65100; font-weight: bold; font-size: 12px;">🌟 도토리 주머니</div>
+            <div style="color: #BF360C; font-size: 20px; font-weight: bold;">{user['points']:,}P</div>
+            <div style="color: #E65100; font-size: 10px;">✨ {user['username']}</div>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        if st.button("🚪 숲으로 돌아가기", key="logout_btn", on_click=_logout):
+            rerun_app()
+    else:
+        st.button("🌱 숲에 들어가기", key="login_btn")
+
 def show_menu_tabs():
     """상단 메뉴 탭 표시"""
     # 메뉴 탭
     menu = st.tabs(["🏠 메인", "📤 업로드", "📊 내 정보", "💰 포인트", "📜 다운로드 내역"])
     return menu
 
-def show_ghibli_file_list(category='all', search_query='', page=1, per_page=10):
+# 카테고리별 이모지
+CATEGORY_EMOJI = {
+    'movie': '🎬', 'drama': '📺', 'video': '🎥', 'game': '🎮',
+    'anime': '🌸', 'music': '🎵', 'document': '📄', 'image': '🖼️',
+    'software': '💾', 'other': '🌿'
+}
+
+# 파일 목록 템플릿 (모듈 로드 시 한 번만 만들고 재실행마다 값만 채움)
+FILE_LIST_TEMPLATE = """
+<div style="background: linear-gradient(135deg, #A5D6A7, #81C784); 
+            padding: 15px; border-radius: 15px; margin: 20px 0; border: 2px solid #4CAF50;">
+    <h3 style="color: #1B5E20; text-align: center; margin: 0;">
+        🌳 숲 속 보물 목록 ({total_count:,}개의 보물) 🌳
+    </h3>
+</div>
+<div style="background: linear-gradient(135deg, #FFE082, #FFCC02); 
+            padding: 10px; border-radius: 10px; margin: 10px 0; border: 2px solid #FFA000;">
+    <div style="display: grid; grid-template-columns: 0.5fr 3fr 1fr 1fr 1fr; gap: 10px; font-weight: bold; color: #E65100;">
+        <div>🔢</div>
+        <div>📁 보물 이름</div>
+        <div>📏 크기</div>
+        <div>🪙 가격</div>
+        <div>⚡ 행동</div>
+    </div>
+</div>
+{rows}
+"""
+
+FILE_ROW_TEMPLATE = """
+<div style="background: linear-gradient(135deg, #F1F8E9, #DCEDC8); 
+            padding: 15px; border-radius: 15px; margin: 5px 0; 
+            border: 2px solid #8BC34A; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
+    <div style="display: grid; grid-template-columns: 0.5fr 3fr 1fr 1fr 1fr; gap: 10px; align-items: center;">
+        <div style="text-align: center; font-weight: bold; color: #33691E;">{number}</div>
+        <div>
+            <div style="color: #2E7D32; font-weight: bold; font-size: 16px;">{emoji} {name}</div>
+            <div style="color: #689F38; font-size: 12px;">
+                👤 {uploader} | 📅 {created} | 📂 {category}{trend}
+            </div>
+        </div>
+        <div style="text-align: center; color: #558B2F; font-weight: bold;">{size}</div>
+        <div style="text-align: center; color: #F57F17; font-weight: bold;">{price}P</div>
+        <div style="text-align: center;">{badge}</div>
+    </div>
+</div>
+"""
+
+_BADGE_TEMPLATE = ('<span style="background: {0}; color: {1}; padding: 5px 10px; '
+                   'border-radius: 15px; font-size: 12px;">{2}</span>')
+
+# 파일 목록 정렬 (인기 순은 다운로드마다 갱신되는 시간 감쇠 점수)
+FILE_SORT_OPTIONS = {
+    'recent': "🌱 새로 심은 순",
+    'trending_day': "🔥 오늘의 인기",
+    'trending_week': "🌳 이번 주 인기"
+}
+
+# 행동 열 배지 (행마다 버튼을 두지 않고 아래 수확 바에서 한 번에 선택)
+FILE_STATUS_BADGES = {
+    'mine': _BADGE_TEMPLATE.format('#C8E6C9', '#2E7D32', '🌱 내 파일'),
+    'redownload': _BADGE_TEMPLATE.format('#DCEDC8', '#33691E', '🔄 재수확 가능'),
+    'download': _BADGE_TEMPLATE.format('#FFE082', '#E65100', '✨ 수확 가능'),
+    'poor': _BADGE_TEMPLATE.format('#FFCDD2', '#C62828', '💸 도토리 부족'),
+    'guest': _BADGE_TEMPLATE.format('#FFE0B2', '#EF6C00', '🚪 입장 필요')
+}
+
+def get_file_statuses(files, user, downloaded_ids):
+    """파일별 행동 상태 (mine / redownload / download / poor / guest)"""
+    if not user:
+        return {file['id']: 'guest' for file in files}
+    
+    statuses = {}
+    for file in files:
+        if file['uploader_id'] == user['id']:
+            statuses[file['id']] = 'mine'
+        elif file['id'] in downloaded_ids:
+            statuses[file['id']] = 'redownload'
+        elif user['points'] >= file['price']:
+            statuses[file['id']] = 'download'
+        else:
+            statuses[file['id']] = 'poor'
+    return statuses
+
+def render_ghibli_file_list_html(files, total_count, offset, statuses, format_size):
+    """파일 목록 한 페이지를 하나의 HTML 문자열로 생성"""
+    rows = []
+    for i, file in enumerate(files):
+        rows.append(FILE_ROW_TEMPLATE.format(
+            number=offset + i + 1,
+            emoji=CATEGORY_EMOJI.get(file['category'], '🌿'),
+            name=html.escape(file['original_name']),
+            uploader=html.escape(file['uploader_name']),
+            created=str(file['created_at'])[:10],
+            category=Config.CATEGORIES.get(file['category'], '기타'),
+            size=format_size(file['file_size']),
+            price=file['price'],
+            badge=FILE_STATUS_BADGES[statuses[file['id']]],
+            trend=f" | 🔥 {file['trend_heat']:.1f}" if 'trend_heat' in file else ''
+        ))
+    return FILE_LIST_TEMPLATE.format(total_count=total_count, rows=''.join(rows))
+
+def _open_download_modal():
+    """수확 바의 단일 콜백 - 선택한 파일의 다운로드 모달 열기"""
+    st.session_state.download_file_id = st.session_state.get('file_action_choice')
+
+def _close_download_modal():
+    st.session_state.download_file_id = None
+
+def show_ghibli_file_actions(files, statuses):
+    """목록 아래 수확 바 (선택 상자 + 버튼 하나, 모든 행의 행동을 한 콜백으로 처리)"""
+    actionable = {file['id']: file for file in files if statuses[file['id']] in ('download', 'redownload')}
+    if not actionable:
+        return
+    
+    labels = {
+        file_id: (f"🔄 재수확 · {file['original_name']}" if statuses[file_id] == 'redownload'
+                  else f"✨ {file['price']}P · {file['original_name']}")
+        for file_id, file in actionable.items()
+    }
+    
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        st.selectbox(
+            "수확할 보물",
+            list(actionable.keys()),
+            format_func=labels.get,
+            key="file_action_choice",
+            label_visibility="collapsed"
+        )
+    with col2:
+        st.button("✨ 수확", key="file_action_submit", type="primary", use_container_width=True,
+                  help="도토리를 내고 보물 가져가기 (이미 수확한 보물은 무료)", on_click=_open_download_modal)
+
+@fragment
+def show_ghibli_file_list_fragment(category='all', search_query='', per_page=10):
+    """파일 목록 프래그먼트 - 정렬/페이지 이동, 수확 바, 다운로드 모달은 이 부분만 다시 실행"""
+    sort = st.radio(
+        "🧭 정렬",
+        options=list(FILE_SORT_OPTIONS.keys()),
+        format_func=FILE_SORT_OPTIONS.get,
+        key="file_sort",
+        horizontal=True,
+        label_visibility="collapsed",
+        on_change=_set_session_value,
+        args=('current_page', 1)
+    )
+    show_ghibli_file_list(category, search_query, st.session_state.get('current_page', 1), per_page, sort)
+
+def show_ghibli_file_list(category='all', search_query='', page=1, per_page=10, sort='recent'):
     """지브리 스타일 파일 목록 표시"""
     file_manager = FileManager()
     point_manager = PointManager()
     auth = AuthManager()
     user = auth.get_current_user()
     
+    # 목록 조회 속도 제한 - 조건이 바뀐 새 조회만 셈 (체크박스 등으로 다시 그릴 때는 세지 않음)
+    listing = (category, search_query, page, per_page, sort)
+    if user and st.session_state.get('last_file_listing') != listing:
+        if not check_rate_limit('list', user):
+            return
+        st.session_state.last_file_listing = listing
+    
     offset = (page - 1) * per_page
     files, total_count = file_manager.get_files_list(
         category=category,
         search_query=search_query,
         limit=per_page,
-        offset=offset
+        offset=offset,
+        sort=sort
     )
     
     if not files:
@@ -131,95 +325,93 @@ def show_ghibli_file_list(category='all', search_query='', page=1, per_page=10):
     # 총 페이지 수 계산
     total_pages = (total_count + per_page - 1) // per_page
     
-    # 파일 목록 헤더
-    st.markdown(f"""
-    <div style="background: linear-gradient(135deg, #A5D6A7, #81C784); 
-                padding: 15px; border-radius: 15px; margin: 20px 0; border: 2px solid #4CAF50;">
-        <h3 style="color: #1B5E20; text-align: center; margin: 0;">
-            🌳 숲 속 보물 목록 ({total_count:,}개의 보물) 🌳
-        </h3>
-    </div>
-    """, unsafe_allow_html=True)
+    # 페이지 전체의 다운로드 여부를 쿼리 한 번으로 조회
+    downloaded_ids = point_manager.get_downloaded_file_ids(user['id'], [file['id'] for file in files]) if user else set()
+    statuses = get_file_statuses(files, user, downloaded_ids)
     
-    # 테이블 헤더
-    st.markdown("""
-    <div style="background: linear-gradient(135deg, #FFE082, #FFCC02); 
-                padding: 10px; border-radius: 10px; margin: 10px 0; border: 2px solid #FFA000;">
-        <div style="display: grid; grid-template-columns: 0.5fr 3fr 1fr 1fr 1fr; gap: 10px; font-weight: bold; color: #E65100;">
-            <div>🔢</div>
-            <div>📁 보물 이름</div>
-            <div>📏 크기</div>
-            <div>🪙 가격</div>
-            <div>⚡ 행동</div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    # 헤더와 모든 행을 하나의 요소로 전송
+    st.markdown(
+        render_ghibli_file_list_html(files, total_count, offset, statuses, file_manager.format_file_size),
+        unsafe_allow_html=True
+    )
     
-    # 파일 목록 표시
-    for i, file in enumerate(files):
-        # 카테고리별 이모지
-        category_emoji = {
-            'movie': '🎬', 'drama': '📺', 'video': '🎥', 'game': '🎮',
-            'anime': '🌸', 'music': '🎵', 'document': '📄', 'image': '🖼️',
-            'software': '💾', 'other': '🌿'
-        }.get(file['category'], '🌿')
-        
-        # 파일 카드
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #F1F8E9, #DCEDC8); 
-                    padding: 15px; border-radius: 15px; margin: 5px 0; 
-                    border: 2px solid #8BC34A; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-            <div style="display: grid; grid-template-columns: 0.5fr 3fr 1fr 1fr 1fr; gap: 10px; align-items: center;">
-                <div style="text-align: center; font-weight: bold; color: #33691E;">
-                    {offset + i + 1}
-                </div>
-                <div>
-                    <div style="color: #2E7D32; font-weight: bold; font-size: 16px;">
-                        {category_emoji} {file['original_name']}
-                    </div>
-                    <div style="color: #689F38; font-size: 12px;">
-                        👤 {file['uploader_name']} | 📅 {file['created_at'][:10]} | 📂 {Config.CATEGORIES.get(file['category'], '기타')}
-                    </div>
-                </div>
-                <div style="text-align: center; color: #558B2F; font-weight: bold;">
-                    {file_manager.format_file_size(file['file_size'])}
-                </div>
-                <div style="text-align: center; color: #F57F17; font-weight: bold;">
-                    {file['price']}P
-                </div>
-                <div style="text-align: center;">
-        """, unsafe_allow_html=True)
-        
-        # 다운로드 버튼 로직
-        if user:
-            if file['uploader_id'] == user['id']:
-                st.markdown("""
-                <span style="background: #C8E6C9; color: #2E7D32; padding: 5px 10px; 
-                             border-radius: 15px; font-size: 12px;">🌱 내 파일</span>
-                """, unsafe_allow_html=True)
-            elif point_manager.has_downloaded_file(user['id'], file['id']):
-                if st.button("🔄 재수확", key=f"redown_{file['id']}", help="이미 수확한 보물을 다시 가져가기"):
-                    show_ghibli_download_modal(file)
-            elif point_manager.can_afford_download(user['id'], file['price']):
-                if st.button("✨ 수확", key=f"down_{file['id']}", type="primary", help="도토리를 내고 보물 가져가기"):
-                    show_ghibli_download_modal(file)
-            else:
-                st.markdown("""
-                <span style="background: #FFCDD2; color: #C62828; padding: 5px 10px; 
-                             border-radius: 15px; font-size: 12px;">💸 도토리 부족</span>
-                """, unsafe_allow_html=True)
-        else:
-            st.markdown("""
-            <span style="background: #FFE0B2; color: #EF6C00; padding: 5px 10px; 
-                         border-radius: 15px; font-size: 12px;">🚪 입장 필요</span>
-            """, unsafe_allow_html=True)
-        
-        st.markdown("</div></div></div>", unsafe_allow_html=True)
+    show_ghibli_file_actions(files, statuses)
+    
+    # 선택한 파일의 다운로드 모달 (재실행해도 닫기 전까지 유지)
+    selected = next((file for file in files if file['id'] == st.session_state.get('download_file_id')), None)
+    if selected:
+        show_ghibli_download_modal(selected)
+        st.button("닫기", key="close_download_modal", on_click=_close_download_modal)
+    
+    # 여러 파일 한꺼번에 받기
+    if user:
+        show_ghibli_bulk_download(files, user)
     
     # 페이지네이션
     if total_pages > 1:
         show_ghibli_pagination(page, total_pages)
 
+def show_ghibli_bulk_download(files, user):
+    """선택한 파일들을 한 번에 결제하고 ZIP으로 받기"""
+    point_manager = PointManager()
+    file_manager = FileManager()
+    
+    with st.expander("🧺 여러 보물 한꺼번에 수확하기"):
+        options = {file['id']: file for file in files}
+        selected = st.multiselect(
+            "수확할 보물을 고르세요",
+            list(options.keys()),
+            format_func=lambda file_id: options[file_id]['original_name'],
+            max_selections=Config.BULK_DOWNLOAD_MAX_FILES,
+            key="bulk_download_selection"
+        )
+        
+        if not selected:
+            st.caption("이미 수확한 보물과 내 파일은 무료로 함께 담겨요!")
+            return
+        
+        # API 서버가 없으면 ZIP 전체를 메모리에 만들므로 결제 전에 합계 크기를 제한
+        total_size = sum(options[file_id]['file_size'] for file_id in selected)
+        if not Config.API_PUBLIC_URL and total_size > Config.BULK_DOWNLOAD_INLINE_MAX_MB * 1024 * 1024:
+            st.warning(f"🧺 한 번에 담을 수 있는 보물은 합계 {Config.BULK_DOWNLOAD_INLINE_MAX_MB}MB까지예요. "
+                       f"(고른 보물: {file_manager.format_file_size(total_size)}) 몇 개를 빼고 다시 골라주세요!")
+            return
+        
+        if not st.button(f"🧺 {len(selected)}개 한꺼번에 수확하기", type="primary", use_container_width=True):
+            return
+        
+        if not check_rate_limit('download', user):
+            return
+        
+        if Config.API_PUBLIC_URL:
+            # API 서버가 ZIP을 바로 스트리밍 (메모리에 전체를 올리지 않음)
+            code, message, token = point_manager.purchase_bulk_download_token(user['id'], selected)
+            if code != PAYMENT_OK:
+                st.error(f"❌ {message}")
+                return
+            
+            st.success(f"✨ {message}")
+            st.link_button("💾 ZIP 보물 주머니 받기", f"{Config.API_PUBLIC_URL}/api/download/{token}",
+                           use_container_width=True)
+        else:
+            success, message, _ = point_manager.process_bulk_download_payment(user['id'], selected)
+            if not success:
+                st.error(f"❌ {message}")
+                return
+            
+            st.success(f"✨ {message}")
+            # API 서버가 없으면 Streamlit download_button에 넘기기 위해 ZIP을 조립
+            chosen = [options[file_id] for file_id in selected if file_manager.get_file_path(options[file_id]['stored_name'])]
+            st.download_button(
+                label="💾 ZIP 보물 주머니에 담기",
+                data=b''.join(iter_zip_stream(file_manager, chosen)),
+                file_name=f"{Config.SITE_NAME}_{len(chosen)}files.zip",
+                mime="application/zip",
+                use_container_width=True
+            )
+        
+        AuthManager().update_user_points()
+
 def get_file_icon(file_type):
     """파일 타입에 따른 아이콘 반환"""
     icons = {
@@ -243,8 +435,9 @@ def show_ghibli_download_modal(file):
         st.error("🚪 숲에 들어가려면 로그인이 필요해요!")
         return
     
-    # 이미 다운로드한 파일인지 확인
-    already_downloaded = point_manager.has_downloaded_file(user['id'], file['id'])
+    # 이미 다운로드한 파일인지 확인 (내가 올린 파일도 무료)
+    already_downloaded = (file.get('uploader_id') == user['id']
+                          or point_manager.has_downloaded_file(user['id'], file['id']))
     
     with st.expander(f"🌟 {file['original_name']} 보물 수확하기", expanded=True):
         st.markdown("""
@@ -286,34 +479,108 @@ def show_ghibli_download_modal(file):
         
         st.markdown("</div>", unsafe_allow_html=True)
         
-        # 다운로드 버튼
-        if st.button("🌟 보물 수확하기!", use_container_width=True, type="primary"):
-            if cost > 0:
-                success, message = point_manager.process_download_payment(
-                    user['id'], file['id'], file['price']
-                )
-                if not success:
-                    st.error(f"❌ {message}")
-                    return
-                
-                st.success(f"✨ {message}")
-                auth.update_user_points()  # 포인트 정보 갱신
+        show_ghibli_related_files(file)
+        
+        # 이미 준비한 내용이 있으면 재실행해도 파일을 다시 읽지 않음
+        payloads = get_download_payloads()
+        payload = payloads.get(file['id'])
+        
+        # 다운로드 버튼 (누른 순간에만 결제하고 내용을 준비)
+        if payload is None and st.button("🌟 보물 수확하기!", use_container_width=True, type="primary"):
+            payload = prepare_download_payload(file, user, cost, payloads, point_manager, file_manager)
+            if payload is None:
+                return
             
-            # 실제 파일 다운로드
-            file_path = file_manager.get_file_path(file['stored_name'])
-            if file_path and file_path.exists():
-                with open(file_path, 'rb') as f:
-                    st.download_button(
-                        label="💾 보물 주머니에 담기",
-                        data=f.read(),
-                        file_name=file['original_name'],
-                        mime=f"application/octet-stream",
-                        use_container_width=True
-                    )
-                st.balloons()
-                st.success("🎉 보물을 성공적으로 수확했어요!")
-            else:
-                st.error("❌ 보물을 찾을 수 없어요. 나무지기에게 문의해보세요!")
+            auth.update_user_points()  # 포인트 정보 갱신
+            if cost > 0 and payloads.get(file['id']) is payload:
+                # 헤더의 도토리 잔액도 갱신 - 준비한 내용이 캐시에 있을 때만
+                # (캐시 예산보다 큰 파일은 재실행하면 버튼이 사라지므로 이번 실행에서 바로 보여줌)
+                st.session_state.download_celebration = file['id']
+                rerun_app()
+            st.session_state.pop('download_celebration', None)
+            st.balloons()
+            st.success("🎉 보물을 성공적으로 수확했어요!")
+        elif payload is not None and st.session_state.get('download_celebration') == file['id']:
+            # 재실행 전에 결제를 마친 다운로드
+            del st.session_state.download_celebration
+            st.balloons()
+            st.success("🎉 보물을 성공적으로 수확했어요!")
+        
+        if payload is None:
+            return
+        
+        if 'url' in payload:
+            st.link_button("💾 보물 주머니에 담기", payload['url'], use_container_width=True)
+        else:
+            st.download_button(
+                label="💾 보물 주머니에 담기",
+                data=payload['data'],
+                file_name=file['original_name'],
+                mime=f"application/octet-stream",
+                use_container_width=True
+            )
+
+def show_ghibli_related_files(file, limit=4):
+    """이 파일을 받은 사용자들이 함께 받은 파일 (미리 계산된 추천을 기본 키로 한 번 조회)"""
+    related = RecommendationManager().get_related_files(file['id'], limit)
+    if not related:
+        return
+    
+    items = ''.join(
+        f"<li>{CATEGORY_EMOJI.get(item['category'], '🌿')} {html.escape(item['original_name'])} "
+        f"<span style=\"color: #F57F17;\">({item['price']}P)</span></li>"
+        for item in related
+    )
+    st.markdown(f"""
+    <div style="background: #F1F8E9; padding: 10px 15px; border-radius: 15px; border: 2px dashed #8BC34A; margin: 10px 0;">
+        <p style="color: #2E7D32; font-weight: bold; margin: 0 0 5px 0;">🍃 이 보물을 수확한 이웃들이 함께 가져간 보물</p>
+        <ul style="color: #388E3C; margin: 0;">{items}</ul>
+    </div>
+    """, unsafe_allow_html=True)
+
+def get_download_payloads():
+    """현재 브라우저 세션의 다운로드 내용 캐시"""
+    if 'download_payloads' not in st.session_state:
+        st.session_state.download_payloads = SessionPayloadCache()
+    return st.session_state.download_payloads
+
+def check_rate_limit(action, user):
+    """사용자별 속도 제한 확인 - 넘었으면 기다릴 시간을 안내하고 False"""
+    retry_after = rate_limiter.hit(action, user['id'])
+    if retry_after > 0:
+        st.warning(f"⏳ 숲이 잠시 숨을 고르고 있어요. {retry_after_seconds(retry_after)}초 후에 다시 시도해주세요!")
+        return False
+    return True
+
+def prepare_download_payload(file, user, cost, payloads, point_manager, file_manager):
+    """결제 후 다운로드 내용 준비 - API 서버가 있으면 토큰 URL, 없으면 파일 바이트 (실패 시 None)"""
+    if not check_rate_limit('download', user):
+        return None
+    
+    if Config.API_PUBLIC_URL:
+        # 파일 바이트는 API 서버가 토큰 URL로 직접 스트리밍
+        code, message, token = point_manager.purchase_download_token(user['id'], file)
+        if code != PAYMENT_OK:
+            st.error(f"❌ {message}")
+            return None
+        
+        if cost > 0:
+            st.success(f"✨ {message}")
+        expires_at = time.time() + Config.DOWNLOAD_TOKEN_TTL_MINUTES * 60
+        return payloads.put_url(file['id'], f"{Config.API_PUBLIC_URL}/api/download/{token}", expires_at)
+    
+    if cost > 0:
+        success, message = point_manager.process_download_payment(user['id'], file['id'], file['price'])
+        if not success:
+            st.error(f"❌ {message}")
+            return None
+        st.success(f"✨ {message}")
+    
+    file_data = file_manager.read_file(file)
+    if file_data is None:
+        st.error("❌ 보물을 찾을 수 없어요. 나무지기에게 문의해보세요!")
+        return None
+    return payloads.put_bytes(file['id'], file_data)
 
 def show_download_modal(file):
     """다운로드 모달 표시"""
@@ -326,8 +593,9 @@ def show_download_modal(file):
         st.error("🔐 로그인이 필요합니다.")
         return
     
-    # 이미 다운로드한 파일인지 확인
-    already_downloaded = point_manager.has_downloaded_file(user['id'], file['id'])
+    # 이미 다운로드한 파일인지 확인 (내가 올린 파일도 무료)
+    already_downloaded = (file.get('uploader_id') == user['id']
+                          or point_manager.has_downloaded_file(user['id'], file['id']))
     
     # 파일 아이콘 가져오기
     file_icon = get_file_icon(file['file_type'])
@@ -397,11 +665,8 @@ def show_download_modal(file):
                         auth.update_user_points()  # 포인트 정보 갱신
                     
                     # 실제 파일 다운로드
-                    file_path = file_manager.get_file_path(file['stored_name'])
-                    if file_path and file_path.exists():
-                        with open(file_path, 'rb') as f:
-                            file_data = f.read()
-                        
+                    file_data = file_manager.read_file(file)
+                    if file_data is not None:
                         st.download_button(
                             label=f"💾 {file['original_name']} 저장",
                             data=file_data,
@@ -422,8 +687,8 @@ def show_download_modal(file):
             else:
                 st.caption("💡 한 번 다운로드하면 무료로 재다운 가능")
 
-def show_ghibli_pagination(current_page, total_pages):
-    """지브리 스타일 페이지네이션 컨트롤 표시"""
+def show_ghibli_pagination(current_page, total_pages, state_key='current_page'):
+    """지브리 스타일 페이지네이션 컨트롤 표시 (state_key: 페이지 번호를 담는 세션 상태 키)"""
     if total_pages <= 1:
         return
     
@@ -434,17 +699,16 @@ def show_ghibli_pagination(current_page, total_pages):
     
     col1, col2, col3, col4, col5 = st.columns([1, 1, 2, 1, 1])
     
+    # 페이지 변경은 콜백에서 처리 (파일 목록 프래그먼트만 한 번 다시 실행)
     with col1:
         if current_page > 1:
-            if st.button("🍃 이전 숲", key="prev_page", help="이전 페이지로"):
-                st.session_state.current_page = current_page - 1
-                st.rerun()
+            st.button("🍃 이전 숲", key=f"{state_key}_prev", help="이전 페이지로",
+                      on_click=_set_session_value, args=(state_key, current_page - 1))
     
     with col2:
         if current_page > 1:
-            if st.button("🌱 첫 숲", key="first_page", help="첫 페이지로"):
-                st.session_state.current_page = 1
-                st.rerun()
+            st.button("🌱 첫 숲", key=f"{state_key}_first", help="첫 페이지로",
+                      on_click=_set_session_value, args=(state_key, 1))
     
     with col3:
         st.markdown(f"""
@@ -455,15 +719,13 @@ def show_ghibli_pagination(current_page, total_pages):
     
     with col4:
         if current_page < total_pages:
-            if st.button("🌲 마지막 숲", key="last_page", help="마지막 페이지로"):
-                st.session_state.current_page = total_pages
-                st.rerun()
+            st.button("🌲 마지막 숲", key=f"{state_key}_last", help="마지막 페이지로",
+                      on_click=_set_session_value, args=(state_key, total_pages))
     
     with col5:
         if current_page < total_pages:
-            if st.button("🌿 다음 숲", key="next_page", help="다음 페이지로"):
-                st.session_state.current_page = current_page + 1
-                st.rerun()
+            st.button("🌿 다음 숲", key=f"{state_key}_next", help="다음 페이지로",
+                      on_click=_set_session_value, args=(state_key, current_page + 1))
     
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -591,6 +853,9 @@ def show_ghibli_upload_form():
             success_count = 0
             
             for uploaded_file in uploaded_files:
+                if not check_rate_limit('upload', user):
+                    break
+                
                 success, message = file_manager.save_uploaded_file(uploaded_file, user['id'])
                 
                 if success:
@@ -733,7 +998,10 @@ def show_ghibli_point_management():
     </div>
     """, unsafe_allow_html=True)
     
-    transactions, total_count = point_manager.get_point_history(user['id'])
+    # 오래된 페이지는 보관 DB에서 읽으므로 한 번에 한 페이지씩
+    per_page = 20
+    page = st.session_state.get('point_history_page', 1)
+    transactions, total_count = point_manager.get_point_history(user['id'], per_page, (page - 1) * per_page)
     
     if transactions:
         for transaction in transactions:
@@ -758,6 +1026,8 @@ def show_ghibli_point_management():
                 </div>
             </div>
             """, unsafe_allow_html=True)
+        
+        show_ghibli_pagination(page, (total_count + per_page - 1) // per_page, state_key='point_history_page')
     else:
         st.info("🌿 아직 도토리 사용 내역이 없어요!")
 
@@ -779,7 +1049,10 @@ def show_ghibli_download_history():
         st.error("🚪 숲에 들어가려면 로그인이 필요해요!")
         return
     
-    downloads, total_count = point_manager.get_download_history(user['id'])
+    # 오래된 페이지는 보관 DB에서 읽으므로 한 번에 한 페이지씩
+    per_page = 20
+    page = st.session_state.get('download_history_page', 1)
+    downloads, total_count = point_manager.get_download_history(user['id'], per_page, (page - 1) * per_page)
     
     if downloads:
         for download in downloads:
@@ -799,6 +1072,8 @@ def show_ghibli_download_history():
             </div>
             """, unsafe_allow_html=True)
         
+        show_ghibli_pagination(page, (total_count + per_page - 1) // per_page, state_key='download_history_page')
+        
         st.markdown(f"""
         <div style="text-align: center; background: #E8F5E8; padding: 15px; 
                     border-radius: 15px; border: 2px solid #81C784; margin: 20px 0;">
@@ -814,6 +1089,141 @@ def show_ghibli_download_history():
         </div>
         """, unsafe_allow_html=True)
 
+def show_ghibli_admin_page():
+    """관리자 페이지 - 통계 대시보드와 느린 재실행 프로파일 목록"""
+    auth = AuthManager()
+    user = auth.get_current_user()
+    
+    if not user or not auth.is_admin(user):
+        st.error("🚫 관리자만 들어올 수 있어요!")
+        return
+    
+    st.markdown("""
+    <div style="text-align: center; background: linear-gradient(135deg, #ECEFF1, #CFD8DC); 
+                padding: 20px; border-radius: 20px; border: 3px solid #607D8B; margin: 20px 0;">
+        <h2 style="color: #37474F; margin: 0;">🔧 관리자 작업실</h2>
+        <p style="color: #455A64; margin: 10px 0;">숲의 통계와 느린 재실행 프로파일을 확인해보세요</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    stats_tab, profile_tab = st.tabs(["📈 숲 통계", "🐢 느린 재실행"])
+    with stats_tab:
+        show_ghibli_admin_analytics()
+    with profile_tab:
+        show_ghibli_slow_reruns()
+
+def show_ghibli_admin_analytics():
+    """일별 집계 테이블로 그린 다운로드/수입/업로더/저장 공간 통계 (원본 내역은 읽지 않음)"""
+    import pandas as pd
+    
+    analytics = AnalyticsManager()
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        days = st.selectbox("기간", [7, 30, 90, 365], index=1, format_func=lambda d: f"최근 {d}일",
+                            key="analytics_days", label_visibility="collapsed")
+    with col2:
+        if st.button("🔄 집계 갱신", key="analytics_refresh", use_container_width=True):
+            result = analytics.refresh()
+            st.success(f"{result['since']} 이후 {result['days']}일을 {result['seconds']:.2f}초 만에 집계했어요")
+    
+    state = analytics.get_state()
+    if not state:
+        st.info("아직 집계된 통계가 없어요. 위 버튼을 누르거나 python analytics_job.py를 실행하세요.")
+        return
+    st.caption(f"마지막 집계: {state['updated_at']} UTC ({state['last_complete_day']}까지 확정, 오늘은 다음 집계 때 갱신)")
+    
+    dashboard = analytics.get_dashboard(days)
+    categories = pd.DataFrame(dashboard['categories'], columns=[
+        'day', 'category', 'downloads', 'downloaders', 'points_spent', 'uploads', 'upload_bytes'])
+    if categories.empty:
+        st.info("🌿 이 기간에는 기록이 없어요!")
+        return
+    categories['category'] = categories['category'].map(lambda key: Config.CATEGORIES.get(key, key))
+    format_size = FileManager().format_file_size
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("📥 다운로드", f"{int(categories['downloads'].sum()):,}")
+    col2.metric("🪙 도토리 수입", f"{int(categories['points_spent'].sum()):,}P")
+    col3.metric("🌱 업로드", f"{int(categories['uploads'].sum()):,}")
+    col4.metric("💾 업로드 용량", format_size(int(categories['upload_bytes'].sum())))
+    
+    st.subheader("📥 일별 다운로드")
+    st.bar_chart(categories.pivot_table(index='day', columns='category', values='downloads',
+                                        aggfunc='sum', fill_value=0))
+    
+    st.subheader("🪙 카테고리별 도토리 수입")
+    st.bar_chart(categories.groupby('category')['points_spent'].sum())
+    
+    points = pd.DataFrame(dashboard['points'], columns=['day', 'transaction_type', 'transactions', 'amount'])
+    if not points.empty:
+        st.subheader("🌰 도토리 흐름")
+        points['transaction_type'] = points['transaction_type'].map({'earn': '획득', 'spend': '사용'}).fillna(
+            points['transaction_type'])
+        st.line_chart(points.pivot_table(index='day', columns='transaction_type', values='amount',
+                                         aggfunc='sum', fill_value=0))
+    
+    storage = pd.DataFrame(dashboard['storage'], columns=['day', 'upload_bytes'])
+    if not storage.empty:
+        st.subheader("💾 저장 공간 증가 (누적 업로드, GB)")
+        storage['GB'] = storage['upload_bytes'].cumsum() / 1024 ** 3
+        st.line_chart(storage[storage['day'] >= dashboard['since']].set_index('day')['GB'])
+    
+    if dashboard['top_uploaders']:
+        st.subheader("🏆 인기 나무지기")
+        st.table([
+            {
+                '나무지기': row['username'] or f"#{row['uploader_id']}",
+                '다운로드': row['downloads'],
+                '도토리 수입': row['points_spent'],
+                '업로드': row['uploads'],
+                '업로드 용량': format_size(row['upload_bytes'] or 0)
+            }
+            for row in dashboard['top_uploaders']
+        ])
+
+def show_ghibli_slow_reruns():
+    """느린 재실행 프로파일 목록"""
+    if not rerun_profiler.enabled:
+        st.info(f"재실행 프로파일링이 꺼져 있습니다. PROFILE_RERUNS=true로 켜면 "
+                f"{rerun_profiler.threshold_ms}ms 이상 걸린 재실행이 {rerun_profiler.profile_dir}에 저장됩니다.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        recent = st.number_input("최근 몇 건에서 찾을까요?", min_value=10, max_value=1000, value=200, step=10)
+    with col2:
+        limit = st.number_input("표시할 개수", min_value=5, max_value=100, value=20, step=5)
+    
+    entries = rerun_profiler.list_slow_reruns(limit=int(limit), recent=int(recent))
+    if not entries:
+        st.info("🌿 아직 저장된 느린 재실행이 없어요!")
+        return
+    
+    for entry in entries:
+        title = f"{entry['elapsed_ms']:,.0f}ms · {entry['page']} · 사용자 {entry['user_id'] or '-'} · {entry['created_at']}"
+        with st.expander(title):
+            if entry['query_params']:
+                st.caption(f"쿼리 파라미터: {entry['query_params']}")
+            st.table([
+                {
+                    '함수': row['function'],
+                    '호출 수': row['calls'],
+                    '자체 시간(ms)': row['total_ms'],
+                    '누적 시간(ms)': row['cumulative_ms']
+                }
+                for row in entry['top_functions']
+            ])
+            
+            path = rerun_profiler.get_profile_path(entry['file'])
+            if path:
+                st.download_button(
+                    "📥 pstats 파일 받기",
+                    data=path.read_bytes(),
+                    file_name=entry['file'],
+                    mime="application/octet-stream",
+                    key=f"profile_{entry['file']}"
+                )
+
 def show_upload_form():
     """파일 업로드 폼 표시"""
     auth = AuthManager()
@@ -937,6 +1347,9 @@ def show_upload_form():
                     progress_bar.progress(progress)
                     status_text.text(f"업로드 중... ({i+1}/{total_files}) {uploaded_file.name}")
                     
+                    if not check_rate_limit('upload', user):
+                        break
+                    
                     success, message = file_manager.save_uploaded_file(uploaded_file, user['id'])
                     
                     if success:
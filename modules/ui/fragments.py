@@ -0,0 +1,19 @@
+import streamlit as st
+from config.settings import Config
+
+# UI_FRAGMENTS=false면 기존처럼 모든 상호작용에 앱 전체가 다시 실행됨
+FRAGMENTS_ACTIVE = Config.UI_FRAGMENTS
+
+def fragment(func):
+    """func를 독립적으로 다시 실행되는 프래그먼트로 만듦 (UI_FRAGMENTS=false면 그대로 반환)"""
+    if not FRAGMENTS_ACTIVE:
+        return func
+    return st.fragment(func)
+
+def rerun_app():
+    """프래그먼트 안의 변경(로그아웃, 잔액 변경 등)을 앱 전체에 반영
+    
+    프래그먼트가 꺼져 있으면 이미 앱 전체가 다시 실행 중이므로 아무것도 하지 않습니다.
+    """
+    if FRAGMENTS_ACTIVE:
+        st.rerun()
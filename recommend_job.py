@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+함께 받은 파일 추천 배치 작업
+다운로드 내역으로 파일 간 동시 다운로드 행렬을 계산해 파일별 상위 K개 이웃을 file_recommendations에 저장합니다.
+기본은 마지막 실행 이후 추천이 바뀔 수 있는 파일(새 다운로드가 생긴 사용자의 파일과 그 이웃)만 다시 계산하므로
+cron으로 자주 실행해도 됩니다. 결과는 전체 다시 계산과 같습니다 (파일 삭제는 --full 실행 때 반영).
+
+사용 예:
+    python recommend_job.py            # 증분 갱신
+    python recommend_job.py --full     # 전체 다시 계산 (매일 한 번 권장)
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from config.settings import Config
+
+def main():
+    parser = argparse.ArgumentParser(description="함께 받은 파일 추천 배치 작업")
+    parser.add_argument('--full', action='store_true', help="워터마크를 무시하고 전체 다시 계산")
+    parser.add_argument('--top-k', type=int, default=Config.RECOMMENDATION_TOP_K, help="파일별로 저장할 추천 수")
+    args = parser.parse_args()
+    
+    from modules.file_manager.recommendations import RecommendationManager
+    
+    result = RecommendationManager().build(full=args.full, top_k=args.top_k)
+    mode = "전체" if result['full'] else "증분"
+    print(f"🍃 추천 {mode} 갱신: 파일 {result['files']:,}개, 추천 {result['rows']:,}개 "
+          f"(내역 id ≤ {result['watermark']}, {result['seconds']:.2f}초)")
+
+if __name__ == "__main__":
+    main()
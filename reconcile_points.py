@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+포인트 잔액 대사 (reconciliation)
+모든 사용자의 users.points를 포인트 원장 잔액(마지막 잔액 스냅샷 + 이후 거래)과 한 번의 스트리밍 쿼리로
+비교해 어긋난 사용자를 보고합니다. 어긋난 사용자가 있으면 종료 코드 1을 반환합니다.
+
+사용 예:
+    python reconcile_points.py                 # 대사만
+    python reconcile_points.py --snapshot      # 스냅샷을 현재까지 갱신한 뒤 대사 (cron 권장)
+    python reconcile_points.py --json bench_results/reconcile.json
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+def main():
+    parser = argparse.ArgumentParser(description="포인트 잔액 대사")
+    parser.add_argument('--snapshot', action='store_true', help="대사 전에 잔액 스냅샷을 현재까지 갱신")
+    parser.add_argument('--show', type=int, default=20, help="출력할 어긋난 사용자 수")
+    parser.add_argument('--json', dest='json_output', help="어긋난 사용자 전체를 JSON으로 저장할 경로")
+    args = parser.parse_args()
+    
+    from modules.point_system.ledger import LedgerManager
+    
+    ledger = LedgerManager()
+    if args.snapshot:
+        snapshot = ledger.snapshot()
+        print(f"🧾 원장 스냅샷: 사용자 {snapshot['users']:,}명 (거래 #{snapshot['watermark']}까지, {snapshot['seconds']:.2f}초)")
+    
+    started = time.perf_counter()
+    drifted = []
+    for entry in ledger.reconcile():
+        drifted.append(entry)
+        if len(drifted) <= args.show:
+            print(f"  ❌ #{entry['user_id']} {entry['username']}: users.points {entry['points']:,} / "
+                  f"원장 {entry['ledger']:,} (차이 {entry['drift']:+,})")
+    seconds = time.perf_counter() - started
+    
+    if args.json_output:
+        output = Path(args.json_output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(drifted, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"📄 결과 저장: {output}")
+    
+    if drifted:
+        print(f"❌ 잔액이 어긋난 사용자 {len(drifted):,}명, 차이 합계 {sum(entry['drift'] for entry in drifted):+,}P "
+              f"({seconds:.2f}초)")
+        sys.exit(1)
+    print(f"✅ 모든 사용자의 잔액이 원장과 일치 ({seconds:.2f}초)")
+
+if __name__ == "__main__":
+    main()
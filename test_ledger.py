@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+포인트 원장 테스트 스크립트
+임시 DB에서 결제/충전 후 내역을 보관하면서 원장 잔액(스냅샷 + 이후 거래)과 소유 기록이 유지되는지 확인
+"""
+
+import os
+import sys
+import uuid
+import tempfile
+from pathlib import Path
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+# 실제 DB를 건드리지 않도록 설정을 읽기 전에 임시 DB 지정
+TEST_DIR = Path(tempfile.mkdtemp(prefix='webhard_test_'))
+os.environ['DB_PATH'] = str(TEST_DIR / 'webhard.db')
+os.environ['ARCHIVE_DB_PATH'] = str(TEST_DIR / 'webhard_archive.db')
+os.environ['UPLOAD_PATH'] = str(TEST_DIR / 'uploads')
+
+from config.settings import Config
+from database.models import db
+from modules.point_system.point_manager import PointManager, FREE_DOWNLOAD_MESSAGE
+from modules.point_system.ledger import LedgerManager
+from modules.point_system.entitlements import EntitlementManager
+from modules.point_system.history_archive import HistoryArchiveManager, MIN_ARCHIVE_DAYS
+
+# 보관 대상이 되도록 내역 시각을 옮길 날짜
+OLD_TIMESTAMP = '2000-01-01 00:00:00'
+
+def is_isolated():
+    """테스트용 임시 DB를 쓰고 있는지 (다른 스크립트가 먼저 설정을 읽었으면 실제 DB일 수 있어 보관을 건너뜀)"""
+    db_dir = Path(Config.DB_PATH).resolve().parent
+    return db_dir.parent == TEST_DIR.resolve().parent and db_dir.name.startswith('webhard_test_')
+
+def create_user(name):
+    suffix = uuid.uuid4().hex[:8]
+    return db.create_user(f"{name}_{suffix}", f"{name}_{suffix}@example.com", "password123")
+
+def create_file(uploader_id, price):
+    file_uuid = str(uuid.uuid4())
+    conn = db.get_connection()
+    try:
+        cursor = conn.execute('''
+            INSERT INTO files (file_uuid, original_name, stored_name, file_size, file_type, category, uploader_id, price)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (file_uuid, f"{file_uuid}.txt", f"{file_uuid}.txt", 10, 'txt', 'document', uploader_id, price))
+        conn.commit()
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+def age_history(user_ids):
+    """사용자들의 지금까지 내역을 오래된 내역으로 바꿈"""
+    placeholders = ','.join('?' * len(user_ids))
+    conn = db.get_connection()
+    try:
+        conn.execute(f'UPDATE point_transactions SET created_at = ? WHERE user_id IN ({placeholders})',
+                     [OLD_TIMESTAMP, *user_ids])
+        conn.execute(f'UPDATE download_history SET download_at = ? WHERE user_id IN ({placeholders})',
+                     [OLD_TIMESTAMP, *user_ids])
+        conn.commit()
+    finally:
+        conn.close()
+
+def count_rows(table, user_id):
+    conn = db.get_connection()
+    try:
+        return conn.execute(f'SELECT COUNT(*) FROM {table} WHERE user_id = ?', (user_id,)).fetchone()[0]
+    finally:
+        conn.close()
+
+def ledger_balance(user_id):
+    conn = db.get_connection()
+    try:
+        return LedgerManager().get_balance(conn, user_id)['balance']
+    finally:
+        conn.close()
+
+def snapshot_plus_deltas(user_id):
+    """스냅샷 행 + 그 이후 거래로 직접 계산한 잔액 (스냅샷이 없으면 None)"""
+    conn = db.get_connection()
+    try:
+        snapshot = conn.execute('SELECT balance, as_of_id FROM balance_snapshots WHERE user_id = ?',
+                                (user_id,)).fetchone()
+        if snapshot is None:
+            return None
+        delta = conn.execute('''
+            SELECT COALESCE(SUM(CASE transaction_type WHEN 'earn' THEN amount ELSE -amount END), 0)
+            FROM point_transactions WHERE user_id = ? AND id > ?
+        ''', (user_id, snapshot['as_of_id'])).fetchone()[0]
+        return snapshot['balance'] + delta
+    finally:
+        conn.close()
+
+def drifted_users(user_ids):
+    return [row for row in LedgerManager().reconcile() if row['user_id'] in user_ids]
+
+def test_ledger_across_archive_runs():
+    """스냅샷 + 이후 거래 = users.points 가 여러 번의 보관 뒤에도 유지되는지"""
+    if not is_isolated():
+        print("⚠️ 임시 DB가 아니어서 원장 보관 테스트를 건너뜁니다.")
+        return
+    
+    point_manager = PointManager()
+    ledger = LedgerManager()
+    archive = HistoryArchiveManager()
+    
+    uploader = create_user('uploader')
+    buyer = create_user('buyer')
+    # 스냅샷 없이 보관되는 사용자 (가입 포인트 + 보관 요약으로 계산)
+    quiet = create_user('quiet')
+    files = [create_file(uploader, price) for price in (30, 20, 10)]
+    
+    assert point_manager.process_download_payment(buyer, files[0])[0]
+    assert point_manager.add_points(buyer, 50)[0]
+    assert point_manager.add_points(quiet, 7)[0]
+    age_history([buyer, quiet])
+    
+    # 1회차: archive_job.py처럼 스냅샷 후 보관
+    ledger.snapshot()
+    archive.archive(days=MIN_ARCHIVE_DAYS)
+    assert count_rows('point_transactions', buyer) == 0
+    assert count_rows('point_transactions', quiet) == 0
+    
+    # 보관 뒤 새 거래는 스냅샷 이후 거래로 더해짐
+    assert point_manager.process_download_payment(buyer, files[1])[0]
+    users = [buyer, quiet, uploader]
+    for user_id in users:
+        assert ledger_balance(user_id) == point_manager.get_user_points(user_id)
+    assert snapshot_plus_deltas(buyer) == point_manager.get_user_points(buyer)
+    assert point_manager.get_user_points(buyer) == Config.INITIAL_POINTS - 30 + 50 - 20
+    assert point_manager.get_user_points(quiet) == Config.INITIAL_POINTS + 7
+    assert not drifted_users(users)
+    
+    # 2회차: 스냅샷 이후 거래까지 보관해도 잔액이 그대로인지
+    assert point_manager.process_download_payment(buyer, files[2])[0]
+    age_history([buyer])
+    ledger.snapshot()
+    archive.archive(days=MIN_ARCHIVE_DAYS)
+    assert count_rows('point_transactions', buyer) == 0
+    assert snapshot_plus_deltas(buyer) == point_manager.get_user_points(buyer) == Config.INITIAL_POINTS - 10
+    assert not drifted_users(users)
+    
+    # 원장을 거치지 않은 변경은 어긋남으로 보고됨
+    conn = db.get_connection()
+    try:
+        conn.execute('UPDATE users SET points = points + 1 WHERE id = ?', (buyer,))
+        conn.commit()
+    finally:
+        conn.close()
+    assert [row['drift'] for row in drifted_users(users)] == [1]
+
+def test_entitlements_survive_archive():
+    """다운로드 내역을 보관해도 재다운로드가 무료이고, 소유 테이블을 새로 만들 때 보관 내역도 채우는지"""
+    if not is_isolated():
+        print("⚠️ 임시 DB가 아니어서 소유 기록 보관 테스트를 건너뜁니다.")
+        return
+    
+    point_manager = PointManager()
+    uploader = create_user('uploader')
+    buyer = create_user('buyer')
+    file_id = create_file(uploader, 25)
+    
+    assert point_manager.process_download_payment(buyer, file_id)[0]
+    age_history([buyer])
+    LedgerManager().snapshot()
+    HistoryArchiveManager().archive(days=MIN_ARCHIVE_DAYS)
+    assert count_rows('download_history', buyer) == 0
+    
+    # 메모리 캐시 없이 DB 기준으로 확인
+    EntitlementManager._owned.clear()
+    points = point_manager.get_user_points(buyer)
+    assert point_manager.has_downloaded_file(buyer, file_id)
+    assert point_manager.process_download_payment(buyer, file_id) == (True, FREE_DOWNLOAD_MESSAGE)
+    assert point_manager.get_user_points(buyer) == points
+    
+    # 소유 테이블이 없던 배포에서 처음 만들 때는 보관 DB의 다운로드 내역으로도 채움
+    conn = db.get_connection()
+    try:
+        conn.execute('DROP TABLE file_entitlements')
+        conn.commit()
+    finally:
+        conn.close()
+    EntitlementManager._schema_ready = False
+    EntitlementManager._owned.clear()
+    assert EntitlementManager().owns(buyer, file_id)
+
+if __name__ == "__main__":
+    try:
+        test_ledger_across_archive_runs()
+        print("✅ 보관을 거쳐도 원장 잔액(스냅샷 + 이후 거래)이 포인트와 같습니다!")
+        test_entitlements_survive_archive()
+        print("✅ 보관된 다운로드도 재다운로드 무료로 인정됩니다!")
+        print("\n🎉 포인트 원장 테스트 통과!")
+    except AssertionError:
+        import traceback
+        traceback.print_exc()
+        print("❌ 포인트 원장 테스트 실패!")
+        sys.exit(1)
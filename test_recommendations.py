@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+함께 받은 파일 추천 테스트 스크립트
+임시 DB에 무작위 다운로드 내역을 나눠 넣으며 증분 갱신한 추천이 전체 다시 계산한 추천과 같은지 확인
+"""
+
+import os
+import sys
+import uuid
+import random
+import tempfile
+from pathlib import Path
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+# 실제 DB를 건드리지 않도록 설정을 읽기 전에 임시 DB 지정
+TEST_DIR = Path(tempfile.mkdtemp(prefix='webhard_test_'))
+os.environ['DB_PATH'] = str(TEST_DIR / 'webhard.db')
+os.environ['UPLOAD_PATH'] = str(TEST_DIR / 'uploads')
+
+from config.settings import Config
+from database.models import db
+from modules.file_manager.recommendations import RecommendationManager
+
+# 무작위 내역 수와 내역마다 증분 갱신할 횟수
+HISTORY_RUNS = 40
+BATCHES_PER_RUN = 4
+
+def is_isolated():
+    """테스트용 임시 DB를 쓰고 있는지 (다른 스크립트가 먼저 설정을 읽었으면 실제 DB일 수 있어 건너뜀)"""
+    db_dir = Path(Config.DB_PATH).resolve().parent
+    return db_dir.parent == TEST_DIR.resolve().parent and db_dir.name.startswith('webhard_test_')
+
+def create_user(name):
+    suffix = uuid.uuid4().hex[:8]
+    return db.create_user(f"{name}_{suffix}", f"{name}_{suffix}@example.com", "password123")
+
+def create_file(uploader_id):
+    file_uuid = str(uuid.uuid4())
+    conn = db.get_connection()
+    try:
+        cursor = conn.execute('''
+            INSERT INTO files (file_uuid, original_name, stored_name, file_size, file_type, category, uploader_id, price)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (file_uuid, f"{file_uuid}.txt", f"{file_uuid}.txt", 10, 'txt', 'document', uploader_id, 0))
+        conn.commit()
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+def add_downloads(rows):
+    conn = db.get_connection()
+    try:
+        conn.executemany('INSERT INTO download_history (user_id, file_id, points_spent) VALUES (?, ?, 0)', rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+def stored_recommendations():
+    conn = db.get_connection()
+    try:
+        rows = conn.execute('''
+            SELECT file_id, rank, related_file_id, score, co_downloads FROM file_recommendations
+            ORDER BY file_id, rank
+        ''').fetchall()
+        return [(row[0], row[1], row[2], round(row[3], 12), row[4]) for row in rows]
+    finally:
+        conn.close()
+
+def test_incremental_matches_full_build():
+    """무작위 내역을 여러 번에 나눠 증분 갱신한 결과 = 같은 내역으로 전체 다시 계산한 결과"""
+    if not is_isolated():
+        print("⚠️ 임시 DB가 아니어서 추천 증분 갱신 테스트를 건너뜁니다.")
+        return
+    
+    # 사용자별 최근 파일 자르기와 이웃 파일 재계산이 자주 일어나도록 작은 한도로 실행
+    original = (Config.RECOMMENDATION_MAX_ITEMS_PER_USER, Config.RECOMMENDATION_MIN_CO_DOWNLOADS)
+    Config.RECOMMENDATION_MAX_ITEMS_PER_USER, Config.RECOMMENDATION_MIN_CO_DOWNLOADS = 3, 1
+    try:
+        manager = RecommendationManager()
+        uploader = create_user('uploader')
+        users = [create_user('user') for _ in range(8)]
+        files = [create_file(uploader) for _ in range(12)]
+        
+        for seed in range(HISTORY_RUNS):
+            rng = random.Random(seed)
+            manager.build(full=True)
+            for _ in range(BATCHES_PER_RUN):
+                # 일부 사용자와 파일에 몰리도록 뽑고, 같은 파일을 다시 받는 내역도 섞음
+                add_downloads([(rng.choice(users[:rng.randint(1, len(users))]),
+                                rng.choice(files[:rng.randint(1, len(files))]))
+                               for _ in range(rng.randint(0, 12))])
+                manager.build()
+            
+            incremental = stored_recommendations()
+            manager.build(full=True)
+            assert incremental == stored_recommendations(), f"seed {seed}"
+    finally:
+        Config.RECOMMENDATION_MAX_ITEMS_PER_USER, Config.RECOMMENDATION_MIN_CO_DOWNLOADS = original
+
+if __name__ == "__main__":
+    try:
+        test_incremental_matches_full_build()
+        print("✅ 증분 갱신한 추천이 전체 다시 계산한 추천과 같습니다!")
+        print("\n🎉 추천 테스트 통과!")
+    except AssertionError:
+        import traceback
+        traceback.print_exc()
+        print("❌ 추천 테스트 실패!")
+        sys.exit(1)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+속도 제한 / 대역폭 조절 테스트 스크립트
+토큰 버킷이 한도만큼 허용하고 다시 차는지, 레플리카가 나눠 빌린 토큰이 한도를 넘지 않는지,
+대역폭을 사용자별로 공평하게 나누는지 확인
+"""
+
+import os
+import sys
+import uuid
+import asyncio
+import tempfile
+from pathlib import Path
+from time import monotonic
+
+# 프로젝트 루트를 Python path에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+# 실제 DB를 건드리지 않도록 설정을 읽기 전에 임시 DB 지정
+TEST_DIR = Path(tempfile.mkdtemp(prefix='webhard_test_'))
+os.environ['DB_PATH'] = str(TEST_DIR / 'webhard.db')
+os.environ['UPLOAD_PATH'] = str(TEST_DIR / 'uploads')
+
+from database.models import db
+from modules.auth import rate_limiter as rate_limiter_module
+from modules.auth.rate_limiter import RateLimiter
+from modules.api.bandwidth import BandwidthScheduler
+
+class FakeClock:
+    """rate_limiter의 time.time()을 대신하는 시계 (advance()로만 흐름)"""
+    
+    def __init__(self):
+        self.now = 1000000.0
+    
+    def time(self):
+        return self.now
+    
+    def advance(self, seconds):
+        self.now += seconds
+
+def with_fake_clock(test):
+    def wrapper():
+        clock = FakeClock()
+        original = rate_limiter_module.time
+        rate_limiter_module.time = clock
+        try:
+            test(clock)
+        finally:
+            rate_limiter_module.time = original
+    wrapper.__name__ = test.__name__
+    wrapper.__doc__ = test.__doc__
+    return wrapper
+
+def bucket_tokens(key):
+    conn = db.get_connection()
+    try:
+        row = conn.execute('SELECT tokens FROM rate_limit_buckets WHERE key = ?', (key,)).fetchone()
+        return None if row is None else row['tokens']
+    finally:
+        conn.close()
+
+@with_fake_clock
+def test_token_bucket_refill(clock):
+    """버킷 크기만큼 몰아서 허용하고, 막히면 한 개가 찰 시간을 알려주고, 그만큼 지나면 다시 허용"""
+    limiter = RateLimiter(limits={'download': '3/60'}, shared=False, ip_multiplier=0)
+    user_id = uuid.uuid4().hex
+    
+    assert [limiter.hit('download', user_id) for _ in range(3)] == [0, 0, 0]
+    retry_after = limiter.hit('download', user_id)
+    assert abs(retry_after - 20) < 1e-6
+    
+    clock.advance(19)
+    assert limiter.hit('download', user_id) > 0
+    clock.advance(1)
+    assert limiter.hit('download', user_id) == 0
+    assert limiter.hit('download', user_id) > 0
+    
+    # 한도가 없는 동작과 다른 사용자는 영향 없음
+    assert limiter.hit('upload', user_id) == 0
+    assert limiter.hit('download', uuid.uuid4().hex) == 0
+
+@with_fake_clock
+def test_ip_bucket_refunds_user_tokens(clock):
+    """IP 버킷(한도 x 배수)에서 막히면 사용자 버킷에서 쓴 토큰은 돌려줌"""
+    limiter = RateLimiter(limits={'list': '2/60'}, shared=False, ip_multiplier=2)
+    ip = f"10.0.0.{uuid.uuid4().int % 250}-{uuid.uuid4().hex}"
+    first, second, third = (uuid.uuid4().hex for _ in range(3))
+    
+    for user_id in (first, first, second, second):
+        assert limiter.hit('list', user_id, ip) == 0
+    assert limiter.hit('list', third, ip) > 0
+    
+    # 막힌 요청이 쓴 토큰을 돌려받았으므로 다른 IP에서는 두 번 모두 허용
+    assert limiter.hit('list', third, 'other-ip') == 0
+    assert limiter.hit('list', third, 'other-ip') == 0
+
+@with_fake_clock
+def test_shared_bucket_lease(clock):
+    """레플리카마다 토큰을 미리 빌려 메모리에서 쓰고, 모두 합쳐도 버킷 크기를 넘지 않음"""
+    limits = {'list': '10/60'}
+    replicas = [RateLimiter(limits=limits, shared=True, ip_multiplier=0, lease_fraction=0.5) for _ in range(2)]
+    user_id = uuid.uuid4().hex
+    key = f'list:user:{user_id}'
+    
+    # 첫 요청에서 절반(5개)을 빌리고 나머지 4번은 DB를 읽지 않음
+    assert replicas[0].hit('list', user_id) == 0
+    assert bucket_tokens(key) == 5
+    assert [replicas[0].hit('list', user_id) for _ in range(4)] == [0] * 4
+    assert bucket_tokens(key) == 5
+    
+    # 다른 레플리카가 남은 5개를 빌리면 버킷이 비어 둘 다 막힘
+    assert [replicas[1].hit('list', user_id) for _ in range(5)] == [0] * 5
+    assert bucket_tokens(key) == 0
+    assert replicas[0].hit('list', user_id) > 0
+    assert replicas[1].hit('list', user_id) > 0
+    
+    # 30초 뒤에는 5개가 다시 참
+    clock.advance(30)
+    assert [replicas[0].hit('list', user_id) for _ in range(5)] == [0] * 5
+    assert replicas[0].hit('list', user_id) > 0
+
+@with_fake_clock
+def test_lease_expires(clock):
+    """빌린 토큰은 빌린 만큼 다시 차는 시간이 지나면 버려, 다시 찬 버킷과 함께 몰아 쓰지 못함"""
+    limiter = RateLimiter(limits={'list': '10/60'}, shared=True, ip_multiplier=0, lease_fraction=0.5)
+    user_id = uuid.uuid4().hex
+    key = f'list:user:{user_id}'
+    
+    # 5개를 빌려 1개만 쓰고 30초(5개가 다시 차는 시간)가 지나면 남은 4개는 버림
+    assert limiter.hit('list', user_id) == 0
+    assert bucket_tokens(key) == 5
+    clock.advance(30)
+    assert limiter.hit('list', user_id) == 0
+    assert bucket_tokens(key) == 5
+    
+    # 한 번에 쓸 수 있는 양은 버킷 크기를 넘지 않음
+    allowed = 1
+    while limiter.hit('list', user_id) == 0:
+        allowed += 1
+    assert allowed == 10
+
+async def _share_bandwidth(connections, quantum, duration):
+    """사용자별 연결 수대로 청크를 계속 요청하고 duration초 동안 사용자별로 받은 바이트"""
+    scheduler = BandwidthScheduler(global_mbps=2, connection_mbps=0, min_mb=0, quantum=quantum)
+    sent = {key: 0 for key in connections}
+    
+    async def download(key):
+        connection = scheduler.connect(key)
+        try:
+            while True:
+                await connection.acquire(quantum)
+                sent[key] += quantum
+        finally:
+            connection.close()
+    
+    tasks = [asyncio.ensure_future(download(key)) for key, count in connections.items() for _ in range(count)]
+    started = monotonic()
+    await asyncio.sleep(duration)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = monotonic() - started
+    await scheduler.close()
+    return sent, elapsed, scheduler
+
+def test_drr_fairness():
+    """연결을 여러 개 연 사용자도 한 사용자 몫만 받고, 전체는 한도(+버스트)를 넘지 않음"""
+    quantum = 16 * 1024
+    sent, elapsed, scheduler = asyncio.run(_share_bandwidth({'heavy': 4, 'light': 1}, quantum, 0.6))
+    
+    # 라운드마다 사용자별로 quantum씩 나가므로 차이는 진행 중인 라운드 하나 이내
+    assert sent['light'] > 0
+    assert abs(sent['heavy'] - sent['light']) <= 2 * quantum
+    assert sum(sent.values()) <= scheduler._capacity + scheduler.global_rate * elapsed + 2 * quantum
+
+if __name__ == "__main__":
+    try:
+        test_token_bucket_refill()
+        test_ip_bucket_refunds_user_tokens()
+        print("✅ 토큰 버킷 속도 제한 테스트 통과!")
+        test_shared_bucket_lease()
+        test_lease_expires()
+        print("✅ 레플리카 간 토큰 빌림 테스트 통과!")
+        test_drr_fairness()
+        print("✅ 사용자별 대역폭 공평 분배 테스트 통과!")
+        print("\n🎉 속도 제한 / 대역폭 조절 테스트 통과!")
+    except AssertionError:
+        import traceback
+        traceback.print_exc()
+        print("❌ 속도 제한 / 대역폭 조절 테스트 실패!")
+        sys.exit(1)